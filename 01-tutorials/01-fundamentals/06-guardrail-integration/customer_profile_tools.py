@@ -33,16 +33,20 @@ def get_customer_profile(customer_id: str = None, email: str = None) -> Dict:
 
 
 @tool
-def list_customer_purchases(customer_id: str = None, email: str = None) -> List[Dict]:
+def list_customer_purchases(
+    customer_id: str = None, email: str = None, page: int = 1, page_size: int = 20
+) -> Dict:
     """
-    Get a list of customer purchases by customer ID or email.
+    Get a page of customer purchases by customer ID or email, most recent first.
     
     Args:
         customer_id (str, optional): The customer ID to lookup
         email (str, optional): The customer email to lookup
+        page (int, optional): The page to return, starting at 1
+        page_size (int, optional): The number of purchases per page
         
     Returns:
-        list: List of customer purchases or error message
+        dict: Customer purchases with paging information or error message
     """
     if not customer_id and not email:
         return {"Either customer_id or email must be provided"}
@@ -57,7 +61,7 @@ def list_customer_purchases(customer_id: str = None, email: str = None) -> List[
     if not profile:
         return {"Customer profile not found"}
         
-    return profile.purchase_history
+    return profile_manager.get_purchases(profile.customer_id, page, min(page_size, 100))
 
 
 @tool
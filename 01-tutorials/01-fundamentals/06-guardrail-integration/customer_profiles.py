@@ -2,9 +2,12 @@
 Customer Profile Management for Solar KB Agent
 """
 
+import atexit
 import json
 import os
+import threading
 import uuid
+from contextlib import contextmanager
 from datetime import datetime
 from typing import Dict, List, Optional
 
@@ -58,35 +61,151 @@ class CustomerProfile:
 
 
 class CustomerProfileManager:
-    """Manager for customer profiles"""
+    """
+    Manager for customer profiles
 
-    def __init__(self, profiles_file: str = "customer_profiles.json"):
+    Profiles are kept in memory with an email index. Changes are appended to a
+    change log next to the profiles file instead of rewriting it, and the log is
+    compacted into the profiles file once it holds compact_after changes.
+    Changes are written every flush_every changes, or once at the end of a
+    batch() block.
+    """
+
+    def __init__(
+        self,
+        profiles_file: str = "customer_profiles.json",
+        flush_every: int = 1,
+        compact_after: int = 500,
+    ):
         self.profiles_file = profiles_file
+        self.log_file = f"{profiles_file}.log"
+        self.flush_every = flush_every
+        self.compact_after = compact_after
         self.profiles: Dict[str, CustomerProfile] = {}
+        self._email_index: Dict[str, str] = {}
+        self._pending: List[str] = []
+        self._log_entries = 0
+        self._batch_depth = 0
+        self._lock = threading.RLock()
         self._load_profiles()
+        # Write changes still pending when the process exits
+        atexit.register(self.flush)
 
     def _load_profiles(self):
-        """Load profiles from file"""
+        """Load profiles from file and replay the change log"""
         if os.path.exists(self.profiles_file):
             try:
                 with open(self.profiles_file, "r") as f:
                     profile_data = json.load(f)
                     for customer_id, data in profile_data.items():
-                        self.profiles[customer_id] = CustomerProfile.from_dict(data)
+                        self._put(CustomerProfile.from_dict(data))
             except Exception as e:
                 print(f"Error loading profiles: {str(e)}")
 
-    def _save_profiles(self):
-        """Save profiles to file"""
+        if os.path.exists(self.log_file):
+            damaged = False
+            with open(self.log_file, "r") as f:
+                for line in f:
+                    try:
+                        # A line without its newline was cut short too, appending would extend it
+                        change = json.loads(line) if line.endswith("\n") else None
+                    except ValueError:
+                        change = None
+                    if change is None:
+                        # A line cut short by a crash, the changes before it are kept
+                        damaged = True
+                        break
+                    self._apply(change)
+                    self._log_entries += 1
+            if damaged:
+                # Drop the partial line now, otherwise the next flush appends to it
+                self.compact()
+
+    def _put(self, profile: CustomerProfile):
+        previous = self.profiles.get(profile.customer_id)
+        if previous and previous.email:
+            self._email_index.pop(previous.email.lower(), None)
+        self.profiles[profile.customer_id] = profile
+        if profile.email:
+            self._email_index[profile.email.lower()] = profile.customer_id
+
+    def _apply(self, change: Dict):
+        """Apply a change log entry to the in-memory profiles"""
+        op = change["op"]
+        if op == "put":
+            self._put(CustomerProfile.from_dict(change["profile"]))
+            return
+        profile = self.profiles.get(change["customer_id"])
+        if not profile:
+            return
+        if op == "update":
+            profile_dict = profile.to_dict()
+            profile_dict.update(change["updates"])
+            profile_dict["updated_at"] = change["updated_at"]
+            self._put(CustomerProfile.from_dict(profile_dict))
+        elif op == "purchase":
+            profile.purchase_history.append(change["item"])
+            profile.updated_at = change["updated_at"]
+        elif op == "ticket":
+            profile.support_tickets.append(change["item"])
+            profile.updated_at = change["updated_at"]
+
+    def _record(self, change: Dict):
+        """Apply a change and queue it for the change log"""
+        with self._lock:
+            # Serialized now, later changes must not alter an entry waiting to be written
+            self._pending.append(json.dumps(change) + "\n")
+            self._apply(change)
+            if self._batch_depth == 0 and len(self._pending) >= self.flush_every:
+                self.flush()
+
+    @contextmanager
+    def batch(self):
+        """Write all the changes made inside the block at once"""
+        with self._lock:
+            self._batch_depth += 1
         try:
-            profile_data = {
-                customer_id: profile.to_dict()
-                for customer_id, profile in self.profiles.items()
-            }
-            with open(self.profiles_file, "w") as f:
-                json.dump(profile_data, f, indent=2)
-        except Exception as e:
-            print(f"Error saving profiles: {str(e)}")
+            yield self
+        finally:
+            with self._lock:
+                self._batch_depth -= 1
+                if self._batch_depth == 0:
+                    self.flush()
+
+    def flush(self):
+        """Append pending changes to the change log, compacting it when it grows too long"""
+        with self._lock:
+            if not self._pending:
+                return
+            try:
+                with open(self.log_file, "a") as f:
+                    f.write("".join(self._pending))
+                self._log_entries += len(self._pending)
+                self._pending = []
+            except Exception as e:
+                print(f"Error saving profiles: {str(e)}")
+                return
+            if self._log_entries >= self.compact_after or not os.path.exists(self.profiles_file):
+                self.compact()
+
+    def compact(self):
+        """Rewrite the profiles file with every change applied and empty the change log"""
+        with self._lock:
+            try:
+                profile_data = {
+                    customer_id: profile.to_dict()
+                    for customer_id, profile in self.profiles.items()
+                }
+                temp_file = f"{self.profiles_file}.tmp"
+                with open(temp_file, "w") as f:
+                    json.dump(profile_data, f, indent=2)
+                os.replace(temp_file, self.profiles_file)
+                # Changes still pending are not in the log yet, they are in the profiles file now
+                self._pending = []
+                open(self.log_file, "w").close()
+                self._log_entries = 0
+            except Exception as e:
+                print(f"Error saving profiles: {str(e)}")
 
     def create_profile(self, profile_data: Dict) -> CustomerProfile:
         """Create a new customer profile"""
@@ -94,9 +213,8 @@ class CustomerProfileManager:
             profile_data["customer_id"] = str(uuid.uuid4())
 
         profile = CustomerProfile.from_dict(profile_data)
-        self.profiles[profile.customer_id] = profile
-        self._save_profiles()
-        return profile
+        self._record({"op": "put", "profile": profile.to_dict()})
+        return self.profiles[profile.customer_id]
 
     def get_profile(self, customer_id: str) -> Optional[CustomerProfile]:
         """Get a customer profile by ID"""
@@ -104,32 +222,31 @@ class CustomerProfileManager:
 
     def get_profile_by_email(self, email: str) -> Optional[CustomerProfile]:
         """Get a customer profile by email"""
-        for profile in self.profiles.values():
-            if profile.email.lower() == email.lower():
-                return profile
-        return None
+        customer_id = self._email_index.get(email.lower())
+        return self.profiles.get(customer_id) if customer_id else None
 
     def update_profile(
         self, customer_id: str, updates: Dict
     ) -> Optional[CustomerProfile]:
         """Update a customer profile"""
-        profile = self.get_profile(customer_id)
-        if not profile:
+        if not self.get_profile(customer_id):
             return None
 
-        profile_dict = profile.to_dict()
-        profile_dict.update(updates)
-        profile_dict["updated_at"] = datetime.now().isoformat()
-
-        updated_profile = CustomerProfile.from_dict(profile_dict)
-        self.profiles[customer_id] = updated_profile
-        self._save_profiles()
-        return updated_profile
+        # The customer ID is the key of the profile and cannot be changed
+        updates = {k: v for k, v in updates.items() if k != "customer_id"}
+        self._record(
+            {
+                "op": "update",
+                "customer_id": customer_id,
+                "updates": updates,
+                "updated_at": datetime.now().isoformat(),
+            }
+        )
+        return self.profiles[customer_id]
 
     def add_purchase(self, customer_id: str, purchase: Dict) -> bool:
         """Add a purchase to customer history"""
-        profile = self.get_profile(customer_id)
-        if not profile:
+        if not self.get_profile(customer_id):
             return False
 
         if "purchase_id" not in purchase:
@@ -137,15 +254,42 @@ class CustomerProfileManager:
         if "purchase_date" not in purchase:
             purchase["purchase_date"] = datetime.now().isoformat()
 
-        profile.purchase_history.append(purchase)
-        profile.updated_at = datetime.now().isoformat()
-        self._save_profiles()
+        self._record(
+            {
+                "op": "purchase",
+                "customer_id": customer_id,
+                "item": purchase,
+                "updated_at": datetime.now().isoformat(),
+            }
+        )
         return True
 
-    def add_support_ticket(self, customer_id: str, ticket: Dict) -> bool:
-        """Add a support ticket to customer history"""
+    def get_purchases(
+        self, customer_id: str, page: int = 1, page_size: int = 20
+    ) -> Optional[Dict]:
+        """Get one page of a customer's purchase history, most recent first"""
         profile = self.get_profile(customer_id)
         if not profile:
+            return None
+
+        purchases = sorted(
+            profile.purchase_history,
+            key=lambda purchase: purchase.get("purchase_date", ""),
+            reverse=True,
+        )
+        page = max(page, 1)
+        start = (page - 1) * page_size
+        return {
+            "purchases": purchases[start : start + page_size],
+            "page": page,
+            "page_size": page_size,
+            "total": len(purchases),
+            "has_more": start + page_size < len(purchases),
+        }
+
+    def add_support_ticket(self, customer_id: str, ticket: Dict) -> bool:
+        """Add a support ticket to customer history"""
+        if not self.get_profile(customer_id):
             return False
 
         if "ticket_id" not in ticket:
@@ -153,9 +297,14 @@ class CustomerProfileManager:
         if "created_at" not in ticket:
             ticket["created_at"] = datetime.now().isoformat()
 
-        profile.support_tickets.append(ticket)
-        profile.updated_at = datetime.now().isoformat()
-        self._save_profiles()
+        self._record(
+            {
+                "op": "ticket",
+                "customer_id": customer_id,
+                "item": ticket,
+                "updated_at": datetime.now().isoformat(),
+            }
+        )
         return True
 
 
@@ -187,78 +336,80 @@ def generate_synthetic_profiles(count: int = 10) -> List[CustomerProfile]:
     manager = CustomerProfileManager()
     created_profiles = []
 
-    for i in range(count):
-        customer_id = f"CUST{100+i}"
-        name = f"Customer {i+1}"
-        email = f"customer{i+1}@example.com"
-        country = countries[i % len(countries)]
-        state = states[country][i % len(states[country])]
-
-        # Generate purchase history
-        purchase_count = (i % 3) + 1  # 1-3 purchases
-        purchases = []
-        for j in range(purchase_count):
-            product = products[(i + j) % len(products)]
-            purchase_date = (
-                datetime.now()
-                .replace(month=((i + j) % 12) + 1, day=((i * j) % 28) + 1)
-                .isoformat()
-            )
-
-            purchases.append(
-                {
-                    "purchase_id": f"PUR{100+i}{j}",
-                    "product_name": product["name"],
-                    "product_type": product["type"],
-                    "price": product["price"],
-                    "quantity": (j % 2) + 1,
-                    "purchase_date": purchase_date,
-                }
-            )
-
-        # Generate support tickets
-        ticket_count = i % 4  # 0-3 tickets
-        tickets = []
-        for j in range(ticket_count):
-            ticket_type = ticket_types[(i + j) % len(ticket_types)]
-            created_date = (
-                datetime.now()
-                .replace(month=((i + j) % 12) + 1, day=((i * j) % 28) + 1)
-                .isoformat()
-            )
-
-            tickets.append(
-                {
-                    "ticket_id": f"TKT{100+i}{j}",
-                    "type": ticket_type,
-                    "status": "closed" if j % 2 == 0 else "open",
-                    "subject": f"{ticket_type} issue with {products[(i+j) % len(products)]['name']}",
-                    "created_at": created_date,
-                    "last_updated": datetime.now().isoformat(),
-                }
-            )
-
-        # Generate preferences
-        preferences = {
-            "contact_preference": "email" if i % 2 == 0 else "phone",
-            "newsletter": i % 3 == 0,
-            "maintenance_reminder": i % 2 == 0,
-        }
+    # One write for all the generated profiles
+    with manager.batch():
+        for i in range(count):
+            customer_id = f"CUST{100+i}"
+            name = f"Customer {i+1}"
+            email = f"customer{i+1}@example.com"
+            country = countries[i % len(countries)]
+            state = states[country][i % len(states[country])]
+
+            # Generate purchase history
+            purchase_count = (i % 3) + 1  # 1-3 purchases
+            purchases = []
+            for j in range(purchase_count):
+                product = products[(i + j) % len(products)]
+                purchase_date = (
+                    datetime.now()
+                    .replace(month=((i + j) % 12) + 1, day=((i * j) % 28) + 1)
+                    .isoformat()
+                )
+
+                purchases.append(
+                    {
+                        "purchase_id": f"PUR{100+i}{j}",
+                        "product_name": product["name"],
+                        "product_type": product["type"],
+                        "price": product["price"],
+                        "quantity": (j % 2) + 1,
+                        "purchase_date": purchase_date,
+                    }
+                )
+
+            # Generate support tickets
+            ticket_count = i % 4  # 0-3 tickets
+            tickets = []
+            for j in range(ticket_count):
+                ticket_type = ticket_types[(i + j) % len(ticket_types)]
+                created_date = (
+                    datetime.now()
+                    .replace(month=((i + j) % 12) + 1, day=((i * j) % 28) + 1)
+                    .isoformat()
+                )
+
+                tickets.append(
+                    {
+                        "ticket_id": f"TKT{100+i}{j}",
+                        "type": ticket_type,
+                        "status": "closed" if j % 2 == 0 else "open",
+                        "subject": f"{ticket_type} issue with {products[(i+j) % len(products)]['name']}",
+                        "created_at": created_date,
+                        "last_updated": datetime.now().isoformat(),
+                    }
+                )
+
+            # Generate preferences
+            preferences = {
+                "contact_preference": "email" if i % 2 == 0 else "phone",
+                "newsletter": i % 3 == 0,
+                "maintenance_reminder": i % 2 == 0,
+            }
 
-        # Create profile
-        profile_data = {
-            "customer_id": customer_id,
-            "name": name,
-            "email": email,
-            "country": country,
-            "state": state,
-            "purchase_history": purchases,
-            "support_tickets": tickets,
-            "preferences": preferences,
-        }
+            # Create profile
+            profile_data = {
+                "customer_id": customer_id,
+                "name": name,
+                "email": email,
+                "country": country,
+                "state": state,
+                "purchase_history": purchases,
+                "support_tickets": tickets,
+                "preferences": preferences,
+            }
 
-        profile = manager.create_profile(profile_data)
-        created_profiles.append(profile)
+            profile = manager.create_profile(profile_data)
+            created_profiles.append(profile)
 
     return created_profiles
 
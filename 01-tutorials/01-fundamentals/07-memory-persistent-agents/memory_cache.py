@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+# 🗂️ Memory Cache
+
+A per-user cache in front of the agent's memory store.
+
+- Recently stored memories are pinned locally and returned with every retrieval
+- Retrieval results are memoized per normalized query until the next flush
+- Stores are buffered and written to the memory store in bulk
+- Listing is paginated
+
+Two backends are available:
+
+- **mem0** (default): the same Mem0 client as the `mem0_memory` tool (OpenSearch,
+  Mem0 Platform or FAISS, selected by environment variables)
+- **local**: an in-process NumPy vector store, using FAISS when it is installed,
+  to run memory-heavy sessions offline. Select it with `MEMORY_BACKEND=local`.
+
+Run `python memory_cache.py` to benchmark a session against the local backend.
+"""
+
+import argparse
+import hashlib
+import os
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import numpy as np
+
+try:
+    import faiss
+except ImportError:
+    faiss = None
+
+
+def normalize_text(text: str) -> str:
+    return " ".join(re.findall(r"\w+", text.lower()))
+
+
+def _results(response) -> List[Dict]:
+    # mem0 returns {"results": [...]} in recent versions and a plain list in older ones
+    return response.get("results", []) if isinstance(response, dict) else list(response or [])
+
+
+class Mem0Backend:
+    """Memory store backed by the Mem0 client used by the mem0_memory tool."""
+
+    def __init__(self):
+        from strands_tools.mem0_memory import Mem0ServiceClient
+
+        self.client = Mem0ServiceClient()
+
+    def add_many(self, contents: List[str], user_id: str) -> None:
+        # One add call, Mem0 extracts the facts of all buffered messages at once
+        messages = [{"role": "user", "content": content} for content in contents]
+        self.client.mem0.add(messages, user_id=user_id)
+
+    def search(self, query: str, user_id: str, limit: int) -> List[Dict]:
+        return _results(self.client.mem0.search(query=query, user_id=user_id, limit=limit))[:limit]
+
+    def list(self, user_id: str) -> List[Dict]:
+        return _results(self.client.list_memories(user_id=user_id))
+
+
+class HashingEmbedder:
+    """Offline embeddings from hashed word unigrams and bigrams, for benchmarks without a model."""
+
+    def __init__(self, dimensions: int = 512):
+        self.dimensions = dimensions
+
+    def __call__(self, texts: List[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for row, text in enumerate(texts):
+            words = normalize_text(text).split()
+            for feature in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+                digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+                value = int.from_bytes(digest, "little")
+                vectors[row, value % self.dimensions] += 1.0 if value >> 63 else -1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-9)
+
+
+class LocalVectorBackend:
+    """
+    In-process vector store with cosine similarity search.
+
+    Uses a FAISS inner product index when faiss is installed, NumPy otherwise.
+    Memories are kept in memory only.
+    """
+
+    def __init__(self, embedder=None):
+        self.embedder = embedder or HashingEmbedder()
+        self._memories: Dict[str, List[Dict]] = {}
+        self._vectors: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def add_many(self, contents: List[str], user_id: str) -> None:
+        vectors = self.embedder(contents)
+        now = datetime.now(timezone.utc).isoformat()
+        with self._lock:
+            memories = self._memories.setdefault(user_id, [])
+            memories.extend(
+                {"id": str(uuid.uuid4()), "memory": content, "user_id": user_id, "created_at": now}
+                for content in contents
+            )
+            if faiss:
+                index = self._vectors.setdefault(user_id, faiss.IndexFlatIP(vectors.shape[1]))
+                index.add(vectors)
+            else:
+                previous = self._vectors.get(user_id)
+                self._vectors[user_id] = vectors if previous is None else np.vstack([previous, vectors])
+
+    def search(self, query: str, user_id: str, limit: int) -> List[Dict]:
+        vector = self.embedder([query])
+        with self._lock:
+            memories = self._memories.get(user_id, [])
+            if not memories:
+                return []
+            if faiss:
+                scores, ids = self._vectors[user_id].search(vector, min(limit, len(memories)))
+                ranked = zip(ids[0], scores[0])
+            else:
+                scores = self._vectors[user_id] @ vector[0]
+                top = np.argsort(-scores)[:limit]
+                ranked = zip(top, scores[top])
+            return [dict(memories[i], score=float(score)) for i, score in ranked]
+
+    def list(self, user_id: str) -> List[Dict]:
+        with self._lock:
+            return list(self._memories.get(user_id, []))
+
+
+def create_backend(name: Optional[str] = None):
+    """Return the backend selected by name or the MEMORY_BACKEND environment variable."""
+    name = (name or os.environ.get("MEMORY_BACKEND", "mem0")).lower()
+    if name == "local":
+        return LocalVectorBackend()
+    return Mem0Backend()
+
+
+class _UserMemory:
+    def __init__(self, pin_size: int):
+        self.pinned = deque(maxlen=pin_size)
+        self.buffer: List[str] = []
+        self.searches: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self.listing: Optional[List[Dict]] = None
+
+
+class MemoryCache:
+    """
+    Per-user cache with pinned recent memories, memoized retrieval and buffered stores.
+
+    Args:
+        backend: Memory store with add_many, search and list methods
+        pin_size: Recent memories kept per user and returned with every retrieval,
+            raised to flush_size if smaller
+        flush_size: Buffered stores that trigger a bulk write
+        ttl: Seconds a memoized retrieval stays valid
+        max_searches: Memoized retrievals kept per user
+    """
+
+    def __init__(self, backend, pin_size: int = 10, flush_size: int = 5, ttl: float = 300, max_searches: int = 128):
+        self.backend = backend
+        # Unflushed memories are only found through the pins, so every buffered memory must stay pinned
+        self.pin_size = max(pin_size, flush_size)
+        self.flush_size = flush_size
+        self.ttl = ttl
+        self.max_searches = max_searches
+        self.stats = {"stores": 0, "flushes": 0, "searches": 0, "search_hits": 0, "lists": 0}
+        self._users: Dict[str, _UserMemory] = {}
+        self._lock = threading.RLock()
+
+    def _user(self, user_id: str) -> _UserMemory:
+        if user_id not in self._users:
+            self._users[user_id] = _UserMemory(self.pin_size)
+        return self._users[user_id]
+
+    def store(self, user_id: str, content: str) -> None:
+        """Pin the memory and buffer it, writing the buffer once it holds flush_size memories."""
+        with self._lock:
+            user = self._user(user_id)
+            user.pinned.appendleft(content)
+            user.buffer.append(content)
+            self.stats["stores"] += 1
+            if len(user.buffer) >= self.flush_size:
+                self.flush(user_id)
+
+    def flush(self, user_id: Optional[str] = None) -> None:
+        """Write buffered memories in one call per user."""
+        with self._lock:
+            user_ids = [user_id] if user_id else list(self._users)
+            for uid in user_ids:
+                user = self._user(uid)
+                if not user.buffer:
+                    continue
+                self.backend.add_many(user.buffer, uid)
+                user.buffer = []
+                # The stored memories can change any search result
+                user.searches.clear()
+                user.listing = None
+                self.stats["flushes"] += 1
+
+    def retrieve(self, user_id: str, query: str, limit: int = 5) -> Dict[str, List]:
+        """Return the pinned recent memories and the memories relevant to the query."""
+        key = (normalize_text(query), limit)
+        with self._lock:
+            user = self._user(user_id)
+            pinned = list(user.pinned)
+            cached = user.searches.get(key)
+            if cached and time.monotonic() - cached[0] < self.ttl:
+                user.searches.move_to_end(key)
+                self.stats["search_hits"] += 1
+                results = cached[1]
+            else:
+                results = None
+
+        if results is None:
+            results = self.backend.search(query, user_id, limit)
+            with self._lock:
+                self.stats["searches"] += 1
+                user.searches[key] = (time.monotonic(), results)
+                while len(user.searches) > self.max_searches:
+                    user.searches.popitem(last=False)
+
+        pinned_texts = {normalize_text(text) for text in pinned}
+        return {
+            "pinned": pinned,
+            "results": [r for r in results if normalize_text(r.get("memory", "")) not in pinned_texts],
+        }
+
+    def list(self, user_id: str, page: int = 1, page_size: int = 10) -> Dict:
+        """Return one page of the user's memories, newest first."""
+        with self._lock:
+            self.flush(user_id)
+            user = self._user(user_id)
+            if user.listing is None:
+                memories = self.backend.list(user_id)
+                # Reversed first so memories written in the same batch also come newest first
+                user.listing = sorted(reversed(memories), key=lambda m: m.get("created_at") or "", reverse=True)
+                self.stats["lists"] += 1
+            memories = user.listing
+        page = max(page, 1)
+        start = (page - 1) * page_size
+        return {
+            "page": page,
+            "pages": max((len(memories) + page_size - 1) // page_size, 1),
+            "total": len(memories),
+            "memories": memories[start : start + page_size],
+        }
+
+
+def run_benchmark(memories: int, turns: int, distinct_queries: int) -> None:
+    """Simulate a memory-heavy session on the local backend, with and without the cache."""
+    facts = [f"The user mentioned fact number {i} about topic {i % 50} and hobby {i % 7}." for i in range(memories)]
+    queries = [f"What do I know about topic {i % 50} and hobby {i % 7}?" for i in range(distinct_queries)]
+
+    # Without the cache: one write per store and one search per turn
+    backend = LocalVectorBackend()
+    start = time.perf_counter()
+    for fact in facts:
+        backend.add_many([fact], "bench")
+    for turn in range(turns):
+        backend.search(queries[turn % distinct_queries], "bench", 5)
+    uncached = time.perf_counter() - start
+
+    cache = MemoryCache(LocalVectorBackend())
+    start = time.perf_counter()
+    for fact in facts:
+        cache.store("bench", fact)
+    cache.flush()
+    for turn in range(turns):
+        cache.retrieve("bench", queries[turn % distinct_queries])
+    cached = time.perf_counter() - start
+
+    print(f"Backend: local ({'FAISS' if faiss else 'NumPy'}), {memories} memories, {turns} retrievals")
+    print(f"Without cache: {memories} writes, {turns} searches, {uncached:.3f}s")
+    print(
+        f"With cache:    {cache.stats['flushes']} writes, {cache.stats['searches']} searches, "
+        f"{cache.stats['search_hits']} memoized, {cached:.3f}s"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the memory cache on the local vector store")
+    parser.add_argument("--memories", type=int, default=2000)
+    parser.add_argument("--turns", type=int, default=500)
+    parser.add_argument("--distinct-queries", type=int, default=50)
+    args = parser.parse_args()
+    run_benchmark(args.memories, args.turns, args.distinct_queries)
@@ -16,20 +16,23 @@ This example demonstrates:
 
 - **store**: Save important information for later retrieval
 - **retrieve**: Access relevant memories based on queries
-- **list**: View all stored memories
+- **list**: View stored memories, one page at a time
 
 ## Usage Examples
 
 Storing memories: `Remember that I prefer tea over coffee`
 Retrieving memories: `What do I prefer to drink?`
 Listing all memories: `Show me everything you remember about me`
+
+Memories go through a local cache (see memory_cache.py): recent memories are
+pinned, retrievals are memoized and stores are written in bulk.
 """
 
 import os
 from strands import Agent, tool
-from strands_tools import mem0_memory, http_request
-from duckduckgo_search import DDGS
-from duckduckgo_search.exceptions import DuckDuckGoSearchException, RatelimitException
+from strands_tools import http_request
+from memory_cache import MemoryCache, create_backend
+from search_backend import RateLimited, SearchError, WebSearch, create_search_backend
 
 # Set up environment variables for AWS credentials and OpenSearch
 
@@ -47,12 +50,28 @@ from duckduckgo_search.exceptions import DuckDuckGoSearchException, RatelimitExc
 # User identifier
 USER_ID = "new_user" # In the real app, this would be set based on user authentication.
 
+# Memory cache in front of the memory store, MEMORY_BACKEND=local runs it offline
+memory_cache = MemoryCache(
+    create_backend(),
+    pin_size=int(os.environ.get("MEMORY_PIN_SIZE", "10")),
+    flush_size=int(os.environ.get("MEMORY_FLUSH_SIZE", "5")),
+    ttl=float(os.environ.get("MEMORY_CACHE_TTL_SECONDS", "300")),
+)
+
+# Shared web search, WEBSEARCH_BACKEND=fixture serves offline results
+web_search = WebSearch(
+    create_search_backend(),
+    ttl=float(os.environ.get("WEBSEARCH_CACHE_TTL_SECONDS", "600")),
+    rate=float(os.environ.get("WEBSEARCH_RATE_PER_SECOND", "0.5")),
+    burst=int(os.environ.get("WEBSEARCH_BURST", "3")),
+)
+
 # System prompt
 SYSTEM_PROMPT = """You are a helpful personal assistant that provides personalized responses based on user history.
 
 Capabilities:
-- Store information with mem0_memory (action="store")
-- Retrieve memories with mem0_memory (action="retrieve")
+- Store information with memory (action="store")
+- Retrieve memories with memory (action="retrieve")
 - Search the web with duckduckgo_search
 
 Key Rules:
@@ -76,17 +95,50 @@ def websearch(keywords: str, region: str = "us-en", max_results: int = 5) -> str
     
     """
     try:
-        results = DDGS().text(keywords, region=region, max_results=max_results)
+        results = web_search.search(keywords, region=region, max_results=max_results)
         return results if results else "No results found."
-    except RatelimitException:
+    except RateLimited:
         return "Rate limit reached. Please try again later."
-    except DuckDuckGoSearchException as e:
+    except SearchError as e:
         return f"Search error: {e}"
 
+@tool
+def memory(action: str, content: str = "", query: str = "", page: int = 1) -> str:
+    """Store, retrieve or list the memories of the current user.
+
+    Args:
+        action (str): "store", "retrieve" or "list".
+        content (str): The information to remember, for action="store".
+        query (str): What to look for, for action="retrieve".
+        page (int): The page of memories to show, for action="list".
+    Returns:
+        Confirmation, relevant memories or a page of memories.
+    """
+    if action == "store":
+        if not content:
+            return "Nothing to store, provide content."
+        memory_cache.store(USER_ID, content)
+        return f"Stored: {content}"
+    if action == "retrieve":
+        found = memory_cache.retrieve(USER_ID, query or content)
+        lines = [f"- {text} (recent)" for text in found["pinned"]]
+        lines += [f"- {item['memory']}" for item in found["results"]]
+        return "\n".join(lines) if lines else "No memories found."
+    if action == "list":
+        return format_memory_page(memory_cache.list(USER_ID, page=page))
+    return f"Unknown action: {action}. Use store, retrieve or list."
+
+
+def format_memory_page(listing: dict) -> str:
+    lines = [f"- {item['memory']}" for item in listing["memories"]]
+    lines.append(f"Page {listing['page']} of {listing['pages']} ({listing['total']} memories)")
+    return "\n".join(lines)
+
+
 # Initialize agent
 memory_agent = Agent(
     system_prompt=SYSTEM_PROMPT,
-    tools=[mem0_memory, websearch, http_request],
+    tools=[memory, websearch, http_request],
 )
 
 if __name__ == "__main__":
@@ -96,29 +148,28 @@ if __name__ == "__main__":
     print("You can ask me to remember things, retrieve memories, or search the web.")
 
     # Initialize user memory
-    memory_agent.tool.mem0_memory(
-        action="store", content=f"The user's name is {USER_ID}.", user_id=USER_ID
-    )
+    memory_cache.store(USER_ID, f"The user's name is {USER_ID}.")
 
     # Interactive loop
     while True:
         try:
-            print("\nWrite your question below or 'exit' to quit, or 'memory' to list all memories:")
+            print("\nWrite your question below or 'exit' to quit, or 'memory [page]' to list memories:")
             user_input = input("\n> ").strip().lower()
             
             if user_input.lower() == "exit":
+                memory_cache.flush()
                 print("\nGoodbye! 👋")
                 break
-            if user_input.lower() == "memory":
-                all_memories = memory_agent.tool.mem0_memory(
-                    action="list",
-                    user_id=USER_ID,
-                )
+            if user_input.lower().split()[:1] == ["memory"]:
+                page = user_input.split()[1] if len(user_input.split()) > 1 else "1"
+                listing = memory_cache.list(USER_ID, page=int(page) if page.isdigit() else 1)
+                print(format_memory_page(listing))
                 continue
             else:
                 memory_agent(user_input)
                 
         except KeyboardInterrupt:
+            memory_cache.flush()
             print("\n\nExecution interrupted. Exiting...")
             break
         except Exception as e:
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+# 🔎 Web Search Backend
+
+Shared web search used by the personal agent's `websearch` tool.
+
+- One DuckDuckGo client reused for every search
+- Results cached for a TTL, keyed by keywords, region and max_results
+- A token bucket spaces out requests, and rate limited requests are retried with backoff
+- Identical searches running at the same time share one request
+
+Set `WEBSEARCH_BACKEND=fixture` to serve results from a JSON file
+(`WEBSEARCH_FIXTURES`) or canned results, without network access.
+"""
+
+import json
+import os
+import random
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Dict, List, Optional
+
+
+class RateLimited(Exception):
+    """The search provider rejected the request because of its rate limit."""
+
+
+class SearchError(Exception):
+    """The search provider failed for a reason other than its rate limit."""
+
+
+class DuckDuckGoBackend:
+    """DuckDuckGo text search through a single DDGS client."""
+
+    def __init__(self):
+        from duckduckgo_search import DDGS
+
+        self.ddgs = DDGS()
+        # DDGS keeps per-client state between requests, one search at a time
+        self._lock = threading.Lock()
+
+    def search(self, keywords: str, region: str, max_results: int) -> List[Dict]:
+        from duckduckgo_search.exceptions import DuckDuckGoSearchException, RatelimitException
+
+        try:
+            with self._lock:
+                return self.ddgs.text(keywords, region=region, max_results=max_results) or []
+        except RatelimitException as e:
+            raise RateLimited(str(e)) from e
+        except DuckDuckGoSearchException as e:
+            raise SearchError(str(e)) from e
+
+
+class FixtureBackend:
+    """
+    Offline search results for tests and demos.
+
+    Results are read from a JSON file mapping keywords to lists of results
+    ({"title", "href", "body"}). Unknown keywords get a canned result.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        path = path or os.environ.get("WEBSEARCH_FIXTURES", "")
+        self.fixtures: Dict[str, List[Dict]] = {}
+        if path and os.path.isfile(path):
+            with open(path, encoding="utf-8") as f:
+                self.fixtures = {normalize_keywords(k): v for k, v in json.load(f).items()}
+        self.calls = 0
+
+    def search(self, keywords: str, region: str, max_results: int) -> List[Dict]:
+        self.calls += 1
+        results = self.fixtures.get(normalize_keywords(keywords))
+        if results is None:
+            results = [
+                {
+                    "title": f"Result {i + 1} for {keywords}",
+                    "href": f"https://example.com/{re.sub(r'[^a-z0-9]+', '-', keywords.lower())}/{i + 1}",
+                    "body": f"Fixture result {i + 1} about {keywords} ({region}).",
+                }
+                for i in range(max_results)
+            ]
+        return results[:max_results]
+
+
+def create_search_backend(name: Optional[str] = None):
+    """Return the backend selected by name or the WEBSEARCH_BACKEND environment variable."""
+    name = (name or os.environ.get("WEBSEARCH_BACKEND", "duckduckgo")).lower()
+    if name == "fixture":
+        return FixtureBackend()
+    return DuckDuckGoBackend()
+
+
+def normalize_keywords(keywords: str) -> str:
+    return " ".join(keywords.lower().split())
+
+
+class TokenBucket:
+    """Allows `rate` requests per second on average, with bursts of up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take a token, sleeping until one is available. Returns the time waited."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class WebSearch:
+    """
+    Cached, rate limited web search shared by every websearch call.
+
+    Args:
+        backend: Object with a search(keywords, region, max_results) method
+        ttl: Seconds a search result stays cached
+        max_entries: Maximum number of cached searches
+        rate: Requests per second allowed by the token bucket
+        burst: Requests allowed back to back
+        max_retries: Retries of a rate limited request
+        backoff: Delay before the first retry, doubled on every retry
+    """
+
+    def __init__(
+        self,
+        backend,
+        ttl: float = 600,
+        max_entries: int = 256,
+        rate: float = 0.5,
+        burst: int = 3,
+        max_retries: int = 3,
+        backoff: float = 2.0,
+    ):
+        self.backend = backend
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.bucket = TokenBucket(rate, burst)
+        self.stats = {"requests": 0, "cache_hits": 0, "shared": 0, "retries": 0}
+        self._cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._in_flight: Dict[tuple, Future] = {}
+        self._lock = threading.Lock()
+
+    def search(self, keywords: str, region: str = "us-en", max_results: int = 5) -> List[Dict]:
+        key = (normalize_keywords(keywords), region, max_results)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached and time.monotonic() - cached[0] < self.ttl:
+                self._cache.move_to_end(key)
+                self.stats["cache_hits"] += 1
+                return cached[1]
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = self._in_flight[key] = Future()
+            else:
+                self.stats["shared"] += 1
+
+        if not owner:
+            # Another thread is running the same search, wait for its result
+            return future.result()
+
+        try:
+            results = self._search_with_retry(keywords, region, max_results)
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(results)
+            with self._lock:
+                self._cache[key] = (time.monotonic(), results)
+                while len(self._cache) > self.max_entries:
+                    self._cache.popitem(last=False)
+            return results
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def _search_with_retry(self, keywords: str, region: str, max_results: int) -> List[Dict]:
+        delay = self.backoff
+        for attempt in range(self.max_retries + 1):
+            self.bucket.acquire()
+            with self._lock:
+                self.stats["requests"] += 1
+            try:
+                return self.backend.search(keywords, region, max_results)
+            except RateLimited:
+                if attempt == self.max_retries:
+                    raise
+                with self._lock:
+                    self.stats["retries"] += 1
+                # Jitter keeps concurrent retries from hitting the provider together
+                time.sleep(delay + random.uniform(0, delay / 2))
+                delay *= 2
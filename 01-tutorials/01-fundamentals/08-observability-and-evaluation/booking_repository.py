@@ -0,0 +1,290 @@
+"""
+Booking repository shared by the booking tools
+
+Keeps one boto3 session, SSM client and DynamoDB table handle per process, and
+resolves the table name from Parameter Store once, refreshing it after
+SSM_CACHE_TTL_SECONDS (default 300). Besides the single booking operations used
+by the tools, it offers multi-booking operations backed by BatchGetItem and
+BatchWriteItem.
+
+Run `python booking_repository.py` to measure throughput against a moto mock
+of DynamoDB and SSM (`pip install moto`), without AWS credentials.
+"""
+import argparse
+import os
+import random
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+import boto3
+from boto3.dynamodb.conditions import Attr
+from botocore.exceptions import ClientError
+
+KB_NAME = 'restaurant-assistant'
+SSM_CACHE_TTL_SECONDS = float(os.environ.get("SSM_CACHE_TTL_SECONDS", "300"))
+
+# DynamoDB limits per BatchGetItem call, BatchWriteItem batches are sized by batch_writer
+BATCH_GET_LIMIT = 100
+# Attempts of a new booking ID when the generated one is already taken
+ID_ATTEMPTS = 5
+
+BookingKey = Tuple[str, str]
+
+
+class BookingExists(Exception):
+    """A booking with the same booking_id and restaurant_name already exists."""
+
+
+class BookingRepository:
+    """
+    Bookings table access with cached parameters and reused boto3 handles.
+
+    Args:
+        kb_name: Prefix of the `<kb_name>-table-name` SSM parameter
+        ttl: Seconds an SSM parameter value stays cached
+        session: boto3 session the clients are created from
+    """
+
+    def __init__(self, kb_name: str = KB_NAME, ttl: float = SSM_CACHE_TTL_SECONDS, session=None):
+        self.kb_name = kb_name
+        self.ttl = ttl
+        self.session = session or boto3.session.Session()
+        self.ssm = self.session.client('ssm')
+        self.dynamodb = self.session.resource('dynamodb')
+        self.stats = {"ssm_lookups": 0, "unprocessed_retries": 0}
+        self._parameters: Dict[str, Tuple[float, str]] = {}
+        self._table = None
+        self._lock = threading.Lock()
+
+    def get_parameter(self, name: str) -> str:
+        """Return the value of an SSM parameter, looked up again once it is older than ttl."""
+        with self._lock:
+            cached = self._parameters.get(name)
+            if cached and time.monotonic() - cached[0] < self.ttl:
+                return cached[1]
+        value = self.ssm.get_parameter(Name=name, WithDecryption=False)["Parameter"]["Value"]
+        with self._lock:
+            self._parameters[name] = (time.monotonic(), value)
+            self.stats["ssm_lookups"] += 1
+        return value
+
+    @property
+    def table(self):
+        """The bookings table, rebuilt only when its SSM parameter changes."""
+        table_name = self.get_parameter(f'{self.kb_name}-table-name')
+        with self._lock:
+            if self._table is None or self._table.name != table_name:
+                self._table = self.dynamodb.Table(table_name)
+            return self._table
+
+    def get_booking(self, booking_id: str, restaurant_name: str) -> Optional[Dict[str, Any]]:
+        response = self.table.get_item(Key={'booking_id': booking_id, 'restaurant_name': restaurant_name})
+        return response.get('Item')
+
+    def create_booking(
+        self, date: str, hour: str, restaurant_name: str, guest_name: str, num_guests: int
+    ) -> str:
+        """
+        Store a new booking and return its ID.
+
+        The write is conditional, so a generated ID that is already taken at the
+        restaurant is replaced by a new one instead of overwriting that booking.
+        """
+        for _ in range(ID_ATTEMPTS):
+            item = _booking_item(date, hour, restaurant_name, guest_name, num_guests)
+            try:
+                self.table.put_item(Item=item, ConditionExpression=Attr('booking_id').not_exists())
+                return item['booking_id']
+            except ClientError as e:
+                if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                    raise
+        raise BookingExists(f'No free booking ID found at {restaurant_name} after {ID_ATTEMPTS} attempts')
+
+    def delete_booking(self, booking_id: str, restaurant_name: str) -> bool:
+        """Delete a booking, returning False when it doesn't exist."""
+        try:
+            self.table.delete_item(
+                Key={'booking_id': booking_id, 'restaurant_name': restaurant_name},
+                ConditionExpression=Attr('booking_id').exists(),
+            )
+            return True
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                return False
+            raise
+
+    def get_bookings(self, keys: List[BookingKey]) -> List[Dict[str, Any]]:
+        """
+        Fetch several bookings with BatchGetItem, 100 keys per call.
+
+        Keys DynamoDB leaves unprocessed are requested again with backoff.
+        Missing bookings are left out of the result, which is not in key order.
+        """
+        table = self.table
+        unique_keys = list(dict.fromkeys(keys))
+        items = []
+        for start in range(0, len(unique_keys), BATCH_GET_LIMIT):
+            request = {
+                table.name: {
+                    'Keys': [
+                        {'booking_id': booking_id, 'restaurant_name': restaurant_name}
+                        for booking_id, restaurant_name in unique_keys[start:start + BATCH_GET_LIMIT]
+                    ]
+                }
+            }
+            delay = 0.05
+            while request:
+                response = self.dynamodb.batch_get_item(RequestItems=request)
+                items.extend(response['Responses'].get(table.name, []))
+                request = response.get('UnprocessedKeys')
+                if request:
+                    self.stats["unprocessed_retries"] += 1
+                    time.sleep(delay + random.uniform(0, delay))
+                    delay = min(delay * 2, 2.0)
+        return items
+
+    def create_bookings(self, bookings: List[Dict[str, Any]]) -> List[str]:
+        """
+        Store several bookings with BatchWriteItem and return their IDs.
+
+        Each booking is a dict with date, hour, restaurant_name, guest_name and
+        num_guests. BatchWriteItem has no condition expressions, so unlike
+        create_booking these writes don't check for taken IDs; IDs are full UUIDs
+        here to keep collisions out of the question.
+        """
+        items = [
+            _booking_item(
+                booking['date'], booking['hour'], booking['restaurant_name'],
+                booking['guest_name'], booking['num_guests'], booking_id=str(uuid.uuid4()),
+            )
+            for booking in bookings
+        ]
+        # batch_writer sends 25 items per call and resends unprocessed items
+        with self.table.batch_writer() as batch:
+            for item in items:
+                batch.put_item(Item=item)
+        return [item['booking_id'] for item in items]
+
+    def delete_bookings(self, keys: List[BookingKey]) -> int:
+        """Delete several bookings with BatchWriteItem, returning the number of keys sent."""
+        unique_keys = list(dict.fromkeys(keys))
+        with self.table.batch_writer() as batch:
+            for booking_id, restaurant_name in unique_keys:
+                batch.delete_item(Key={'booking_id': booking_id, 'restaurant_name': restaurant_name})
+        return len(unique_keys)
+
+
+def _booking_item(
+    date: str, hour: str, restaurant_name: str, guest_name: str, num_guests: int,
+    booking_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    return {
+        'booking_id': booking_id or str(uuid.uuid4())[:8],
+        'restaurant_name': restaurant_name,
+        'date': date,
+        'name': guest_name,
+        'hour': hour,
+        'num_guests': num_guests,
+    }
+
+
+_repository: Optional[BookingRepository] = None
+_repository_lock = threading.Lock()
+
+
+def get_repository() -> BookingRepository:
+    """Return the repository shared by the booking tools, created on first use."""
+    global _repository
+    with _repository_lock:
+        if _repository is None:
+            _repository = BookingRepository()
+        return _repository
+
+
+def _uncached_get_booking(booking_id: str, restaurant_name: str) -> Optional[Dict[str, Any]]:
+    # What every tool call did before the repository: new handles and an SSM lookup per call
+    table_name = boto3.client('ssm').get_parameter(
+        Name=f'{KB_NAME}-table-name', WithDecryption=False
+    )["Parameter"]["Value"]
+    table = boto3.resource('dynamodb').Table(table_name)
+    return table.get_item(Key={'booking_id': booking_id, 'restaurant_name': restaurant_name}).get('Item')
+
+
+def run_benchmark(bookings: int) -> None:
+    """Compare per-call handles, the shared repository and batch operations on moto."""
+    from moto import mock_aws
+
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+    with mock_aws():
+        dynamodb = boto3.resource('dynamodb')
+        dynamodb.create_table(
+            TableName='restaurant-assistant-bookings',
+            KeySchema=[
+                {"AttributeName": "booking_id", "KeyType": "HASH"},
+                {"AttributeName": "restaurant_name", "KeyType": "RANGE"},
+            ],
+            AttributeDefinitions=[
+                {"AttributeName": "booking_id", "AttributeType": "S"},
+                {"AttributeName": "restaurant_name", "AttributeType": "S"},
+            ],
+            BillingMode="PAY_PER_REQUEST",
+        )
+        boto3.client('ssm').put_parameter(
+            Name=f'{KB_NAME}-table-name', Value='restaurant-assistant-bookings', Type='String'
+        )
+
+        requests = [
+            {'date': '2026-01-01', 'hour': '20:00', 'restaurant_name': f'Restaurant {i % 10}',
+             'guest_name': f'Guest {i}', 'num_guests': 2}
+            for i in range(bookings)
+        ]
+        repository = BookingRepository()
+
+        start = time.perf_counter()
+        keys = [
+            (repository.create_booking(**request), request['restaurant_name'])
+            for request in requests
+        ]
+        single_writes = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for key in keys:
+            _uncached_get_booking(*key)
+        uncached_reads = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for key in keys:
+            repository.get_booking(*key)
+        cached_reads = time.perf_counter() - start
+
+        start = time.perf_counter()
+        found = repository.get_bookings(keys)
+        batch_reads = time.perf_counter() - start
+
+        start = time.perf_counter()
+        batch_keys = list(zip(repository.create_bookings(requests), [r['restaurant_name'] for r in requests]))
+        batch_writes = time.perf_counter() - start
+
+        start = time.perf_counter()
+        repository.delete_bookings(keys + batch_keys)
+        batch_deletes = time.perf_counter() - start
+
+    def rate(seconds: float, operations: int = bookings) -> str:
+        return f"{operations / seconds:8.0f} bookings/s ({seconds:.3f}s)"
+
+    print(f"{bookings} bookings against moto, {repository.stats['ssm_lookups']} SSM lookup(s) by the repository")
+    print(f"Reads, new handles per call:  {rate(uncached_reads)}")
+    print(f"Reads, shared repository:     {rate(cached_reads)}")
+    print(f"Reads, BatchGetItem:          {rate(batch_reads, len(found))}")
+    print(f"Writes, conditional PutItem:  {rate(single_writes)}")
+    print(f"Writes, BatchWriteItem:       {rate(batch_writes)}")
+    print(f"Deletes, BatchWriteItem:      {rate(batch_deletes, 2 * bookings)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the booking repository against moto")
+    parser.add_argument("--bookings", type=int, default=500)
+    args = parser.parse_args()
+    run_benchmark(args.bookings)
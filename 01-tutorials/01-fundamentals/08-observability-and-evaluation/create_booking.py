@@ -1,7 +1,6 @@
 from typing import Any
 from strands.types.tools import ToolResult, ToolUse
-import boto3
-import uuid
+from booking_repository import get_repository
 
 TOOL_SPEC = {
     "name": "create_booking",
@@ -39,15 +38,6 @@ TOOL_SPEC = {
 }
 # Function name must match tool name
 def create_booking(tool: ToolUse, **kwargs: Any) -> ToolResult:
-    kb_name = 'restaurant-assistant'
-    dynamodb = boto3.resource('dynamodb')
-    smm_client = boto3.client('ssm')
-    table_name = smm_client.get_parameter(
-        Name=f'{kb_name}-table-name',
-        WithDecryption=False
-    )
-    table = dynamodb.Table(table_name["Parameter"]["Value"])
-    
     tool_use_id = tool["toolUseId"]
     date = tool["input"]["date"]
     hour = tool["input"]["hour"]
@@ -59,17 +49,7 @@ def create_booking(tool: ToolUse, **kwargs: Any) -> ToolResult:
               f"{date} at {hour} in the name of {guest_name}"
     print(results)
     try:
-        booking_id = str(uuid.uuid4())[:8]
-        table.put_item(
-            Item={
-                'booking_id': booking_id,
-                'restaurant_name': restaurant_name,
-                'date': date,
-                'name': guest_name,
-                'hour': hour,
-                'num_guests': num_guests
-            }
-        )
+        booking_id = get_repository().create_booking(date, hour, restaurant_name, guest_name, num_guests)
         return {
             "toolUseId": tool_use_id,
             "status": "success",
@@ -1,5 +1,6 @@
 from strands import tool
-import boto3 
+
+from booking_repository import get_repository
 
 @tool
 def delete_booking(booking_id: str, restaurant_name:str) -> str:
@@ -11,19 +12,10 @@ def delete_booking(booking_id: str, restaurant_name:str) -> str:
     Returns:
         confirmation_message: confirmation message
     """
-    kb_name = 'restaurant-assistant'
-    dynamodb = boto3.resource('dynamodb')
-    smm_client = boto3.client('ssm')
-    table_name = smm_client.get_parameter(
-        Name=f'{kb_name}-table-name',
-        WithDecryption=False
-    )
-    table = dynamodb.Table(table_name["Parameter"]["Value"])
     try:
-        response = table.delete_item(Key={'booking_id': booking_id, 'restaurant_name': restaurant_name})
-        if response['ResponseMetadata']['HTTPStatusCode'] == 200:
+        if get_repository().delete_booking(booking_id, restaurant_name):
             return f'Booking with ID {booking_id} deleted successfully'
         else:
-            return f'Failed to delete booking with ID {booking_id}'
+            return f'No booking found with ID {booking_id}'
     except Exception as e:
         return str(e)
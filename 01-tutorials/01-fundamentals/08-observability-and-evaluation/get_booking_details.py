@@ -1,5 +1,6 @@
 from strands import tool
-import boto3 
+
+from booking_repository import get_repository
 
 @tool
 def get_booking_details(booking_id:str, restaurant_name:str) -> dict:
@@ -11,23 +12,10 @@ def get_booking_details(booking_id:str, restaurant_name:str) -> dict:
     Returns:
         booking_details: the details of the booking in JSON format
     """
-    kb_name = 'restaurant-assistant'
-    dynamodb = boto3.resource('dynamodb')
-    smm_client = boto3.client('ssm')
-    table_name = smm_client.get_parameter(
-        Name=f'{kb_name}-table-name',
-        WithDecryption=False
-    )
-    table = dynamodb.Table(table_name["Parameter"]["Value"])
     try:
-        response = table.get_item(
-            Key={
-                'booking_id': booking_id, 
-                'restaurant_name': restaurant_name
-            }
-        )
-        if 'Item' in response:
-            return response['Item']
+        item = get_repository().get_booking(booking_id, restaurant_name)
+        if item is not None:
+            return item
         else:
             return f'No booking found with ID {booking_id}'
     except Exception as e:
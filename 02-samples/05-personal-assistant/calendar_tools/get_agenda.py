@@ -1,6 +1,6 @@
-import sqlite3
 from datetime import datetime
 from strands import tool
+from calendar_tools import appointments_db
 
 @tool
 def get_agenda(date: str) -> str:
@@ -22,30 +22,8 @@ def get_agenda(date: str) -> str:
     except ValueError:
         raise ValueError("Date must be in format 'YYYY-MM-DD'")
 
-    conn = sqlite3.connect("appointments.db")
-    cursor = conn.cursor()
-
-    # Create the appointments table if it doesn't exist
-    cursor.execute(
-        """
-    CREATE TABLE IF NOT EXISTS appointments (
-        id TEXT PRIMARY KEY,
-        date TEXT,
-        location TEXT,
-        title TEXT,
-        description TEXT
-    )
-    """
-    )
-
-    # Query appointments for the specific date (using LIKE to match the date part)
-    cursor.execute(
-        "SELECT id, date, location, title, description FROM appointments WHERE date LIKE ? ORDER BY date",
-        (f"{date}%",)
-    )
-
-    appointments = cursor.fetchall()
-    conn.close()
+    # Range query on the indexed date column
+    appointments = appointments_db.get_appointments_for_day(date)
 
     if not appointments:
         return f"No appointments scheduled for {date}"
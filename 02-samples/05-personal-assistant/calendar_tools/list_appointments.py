@@ -1,46 +1,41 @@
 import sqlite3
-import os
 from strands import tool
+from calendar_tools import appointments_db
 
 
 @tool
-def list_appointments() -> str:
+def list_appointments(page: int = 1, page_size: int = appointments_db.DEFAULT_PAGE_SIZE) -> str:
     """
-    List all available appointments from the database with nice formatting.
+    List appointments from the database with nice formatting, one page at a time, ordered by date.
+
+    Args:
+        page (int): Page number to return, starting at 1.
+        page_size (int): Number of appointments per page (maximum 100).
 
     Returns:
-        str: Formatted list of all appointments 
+        str: Formatted list of the appointments in the requested page
     """
-    # Check if database exists
-    if not os.path.exists('appointments.db'):
-        return "📅 No appointments found\n\nYour calendar is empty! Time to schedule something exciting! ✨"
-
-    conn = sqlite3.connect('appointments.db')
-    conn.row_factory = sqlite3.Row  # This enables column access by name
-    cursor = conn.cursor()
-
-    # Check if the appointments table exists
+    page = max(page, 1)
+    page_size = min(max(page_size, 1), appointments_db.MAX_PAGE_SIZE)
     try:
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='appointments'")
-        if not cursor.fetchone():
-            conn.close()
-            return "📅 No appointments found\n\nYour calendar is empty! Time to schedule something exciting! ✨"
+        rows, total = appointments_db.list_appointments(page, page_size)
 
-        cursor.execute("SELECT * FROM appointments ORDER BY date")
-        rows = cursor.fetchall()
+        if not total:
+            return "📅 No appointments found\n\nYour calendar is empty! Time to schedule something exciting! ✨"
 
+        total_pages = (total + page_size - 1) // page_size
         if not rows:
-            conn.close()
-            return "📅 No appointments found\n\nYour calendar is empty! Time to schedule something exciting! ✨"
+            return f"📅 No appointments on page {page}, there are {total_pages} page(s) of appointments."
 
         # Format the appointments list
         appointment_lines = [
-            "📋 All Your Appointments:",
+            f"📋 Your Appointments (page {page} of {total_pages}, {total} in total):",
             "=======================================",
             ""
         ]
 
-        for i, row in enumerate(rows, 1):
+        first = (page - 1) * page_size + 1
+        for i, row in enumerate(rows, first):
             # Extract date and time parts
             date_part = row['date'].split(" ")[0] if " " in row['date'] else row['date']
             time_part = row['date'].split(" ")[1] if " " in row['date'] else "No time specified"
@@ -55,9 +50,10 @@ def list_appointments() -> str:
                 ""  # Empty line for spacing
             ])
 
-        conn.close()
+        if page < total_pages:
+            appointment_lines.append(f"➡️ More appointments available, request page {page + 1} to see them.")
+
         return "\n".join(appointment_lines)
 
     except sqlite3.Error as e:
-        conn.close()
-        return f"❌ Error retrieving appointments: {str(e)}"
\ No newline at end of file
+        return f"❌ Error retrieving appointments: {str(e)}"
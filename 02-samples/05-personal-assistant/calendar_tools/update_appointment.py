@@ -1,8 +1,8 @@
 import sqlite3
 from datetime import datetime
-import os
 from strands.types.tools import ToolResult, ToolUse
 from typing import Any
+from calendar_tools import appointments_db
 
 TOOL_SPEC = {
     "name": "update_appointment",
@@ -48,33 +48,10 @@ def update_appointment(tool: ToolUse, **kwargs: Any) -> ToolResult:
     title = tool["input"].get("title")
     description = tool["input"].get("description")
 
-    # Check if database exists
-    if not os.path.exists('appointments.db'): 
-        return {
-            "toolUseId": tool_use_id,
-            "status": "error",
-            "content": [{"text": "❌ Error: No appointments database found."}]
-        }
-    # Check if appointment exists
-    conn = sqlite3.connect('appointments.db')
-    cursor = conn.cursor()
-
-    # Check if the appointments table exists
     try:
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='appointments'")
-        if not cursor.fetchone():
-            conn.close()
-            return {
-                "toolUseId": tool_use_id,
-                "status": "error",
-                "content": [{"text": "❌ Error: Appointments table does not exist."}]
-            }
-
-        cursor.execute("SELECT * FROM appointments WHERE id = ?", (appointment_id,))
-        appointment = cursor.fetchone()
+        appointment = appointments_db.get_appointment(appointment_id)
 
         if not appointment:
-            conn.close()
             return {
                 "toolUseId": tool_use_id,
                 "status": "error",
@@ -89,21 +66,18 @@ def update_appointment(tool: ToolUse, **kwargs: Any) -> ToolResult:
             try:
                 datetime.strptime(date, '%Y-%m-%d %H:%M')
             except ValueError:
-                conn.close()
                 return {
                     "toolUseId": tool_use_id,
                     "status": "error",
                     "content": [{"text": "❌ Error: Date must be in format 'YYYY-MM-DD HH:MM'"}]
                 }
 
-        # Build update query
-        update_fields = []
-        params = []
+        # Build update
+        update_fields = {}
         changes = []
 
         if date and date != original_date:
-            update_fields.append("date = ?")
-            params.append(date)
+            update_fields["date"] = date
             old_date_part = original_date.split(" ")[0] if " " in original_date else original_date
             old_time_part = original_date.split(" ")[1] if " " in original_date else "No time"
             new_date_part = date.split(" ")[0] if " " in date else date
@@ -111,36 +85,26 @@ def update_appointment(tool: ToolUse, **kwargs: Any) -> ToolResult:
             changes.append(f"📅 Date: {old_date_part} {old_time_part} → {new_date_part} {new_time_part}")
 
         if location and location != original_location:
-            update_fields.append("location = ?")
-            params.append(location)
+            update_fields["location"] = location
             changes.append(f"📍 Location: {original_location} → {location}")
 
         if title and title != original_title:
-            update_fields.append("title = ?")
-            params.append(title)
+            update_fields["title"] = title
             changes.append(f"📝 Title: {original_title} → {title}")
 
         if description and description != original_description:
-            update_fields.append("description = ?")
-            params.append(description)
+            update_fields["description"] = description
             changes.append(f"📄 Description: {original_description} → {description}")
 
         # If no fields to update
         if not update_fields:
-            conn.close()
             return {
                 "toolUseId": tool_use_id,
                 "status": "success",
                 "content": [{"text": "ℹ️ No changes needed - your appointment is already up to date! ✨"}]
             }
 
-        # Complete the query
-        query = f"UPDATE appointments SET {', '.join(update_fields)} WHERE id = ?"
-        params.append(appointment_id)
-
-        cursor.execute(query, params)
-        conn.commit()
-        conn.close()
+        appointments_db.update_appointment(appointment_id, update_fields)
 
         # Format the success message
         update_confirmation = [
@@ -165,7 +129,6 @@ def update_appointment(tool: ToolUse, **kwargs: Any) -> ToolResult:
             "content": [{"text": "\n".join(update_confirmation)}]
         }
     except sqlite3.Error as e:
-        conn.close()
         return {
             "toolUseId": tool_use_id,
             "status": "error",
@@ -7,6 +7,8 @@ from utils.tools import (
     code_writer_agent,
     code_execute,
     project_reader,
+    read_project_files,
+    sub_agents,
 )
 from utils.prompts import CODE_ASSISTANT_PROMPT
 
@@ -24,6 +26,7 @@ code_assistant = Agent(
     model=claude_sonnet_4,
     tools=[
         project_reader,
+        read_project_files,
         code_generator,
         code_reviewer,
         code_writer_agent,
@@ -42,6 +45,7 @@ if __name__ == "__main__":
     )
     print("  - Create a Python script that sorts a list")
     print("  - Read sample_ts_app directory and convert into python")
+    print("Type 'stats' to show sub-agent latency and token usage.")
 
     # Interactive loop
     while True:
@@ -50,6 +54,10 @@ if __name__ == "__main__":
             if user_input.lower() == "exit":
                 print("\nGoodbye! 👋")
                 break
+            if user_input.lower() == "stats":
+                for name, stats in sub_agents.stats().items():
+                    print(f"{name}: {stats}")
+                continue
 
             # Process the input as a coding question/task
             code_assistant(user_input)
@@ -0,0 +1,127 @@
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Iterator
+
+from strands import Agent
+
+
+@dataclass
+class SubAgentStats:
+    builds: int = 0
+    calls: int = 0
+    errors: int = 0
+    total_seconds: float = 0.0
+    input_tokens: int = 0
+    output_tokens: int = 0
+
+    def as_dict(self) -> dict:
+        return {
+            "builds": self.builds,
+            "calls": self.calls,
+            "errors": self.errors,
+            "avg_seconds": round(self.total_seconds / self.calls, 3) if self.calls else 0.0,
+            "total_seconds": round(self.total_seconds, 3),
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+        }
+
+
+class _SubAgentPool:
+    def __init__(self, factory: Callable[[], Agent], size: int):
+        self.factory = factory
+        self.size = size
+        self.idle: queue.Queue[Agent] = queue.Queue()
+        self.created = 0
+        self.lock = threading.Lock()
+        self.stats = SubAgentStats()
+
+
+class SubAgentRegistry:
+    """
+    Builds each specialized sub-agent once and reuses it across tool calls.
+
+    Every sub-agent has a pool of up to pool_size agents, so concurrent calls
+    don't share a conversation. An agent's messages are cleared before each call,
+    and the latency and token usage of every call are recorded per sub-agent.
+    """
+
+    def __init__(self):
+        self._pools: dict[str, _SubAgentPool] = {}
+
+    def register(self, name: str, factory: Callable[[], Agent], pool_size: int = 2) -> None:
+        self._pools[name] = _SubAgentPool(factory, pool_size)
+
+    @contextmanager
+    def acquire(self, name: str) -> Iterator[Agent]:
+        """Borrow an agent with a clean conversation, building it on first use."""
+        pool = self._pools[name]
+        while True:
+            try:
+                agent = pool.idle.get_nowait()
+                break
+            except queue.Empty:
+                pass
+            with pool.lock:
+                build = pool.created < pool.size
+                if build:
+                    pool.created += 1
+            if build:
+                try:
+                    agent = pool.factory()
+                except Exception:
+                    # Give the slot back, or a failed build would shrink the pool for good
+                    with pool.lock:
+                        pool.created -= 1
+                    raise
+                with pool.lock:
+                    pool.stats.builds += 1
+                break
+            # Wait for an agent to be released once the pool is full, checking again
+            # now and then in case a slot was freed by a failed build
+            try:
+                agent = pool.idle.get(timeout=1.0)
+                break
+            except queue.Empty:
+                pass
+        agent.messages = []
+        try:
+            yield agent
+        finally:
+            pool.idle.put(agent)
+
+    def record(self, name: str, seconds: float, input_tokens: int = 0, output_tokens: int = 0,
+               error: bool = False) -> None:
+        pool = self._pools[name]
+        with pool.lock:
+            pool.stats.calls += 1
+            pool.stats.errors += int(error)
+            pool.stats.total_seconds += seconds
+            pool.stats.input_tokens += input_tokens
+            pool.stats.output_tokens += output_tokens
+
+    def invoke(self, name: str, prompt: str):
+        """Run a prompt on a pooled sub-agent and return the agent result."""
+        with self.acquire(name) as agent:
+            # Usage accumulates over the agent's lifetime, the difference is this call's usage
+            before = dict(agent.event_loop_metrics.accumulated_usage)
+            start = time.perf_counter()
+            error = True
+            try:
+                result = agent(prompt)
+                error = False
+                return result
+            finally:
+                usage = agent.event_loop_metrics.accumulated_usage
+                self.record(
+                    name,
+                    time.perf_counter() - start,
+                    usage.get("inputTokens", 0) - before.get("inputTokens", 0),
+                    usage.get("outputTokens", 0) - before.get("outputTokens", 0),
+                    error,
+                )
+
+    def stats(self) -> dict[str, dict]:
+        return {name: pool.stats.as_dict() for name, pool in self._pools.items()}
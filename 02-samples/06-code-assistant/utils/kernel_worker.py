@@ -0,0 +1,122 @@
+"""
+Worker process of the Python kernel used by code_execute.
+
+Reads one JSON request per line on stdin and runs its code in a namespace that
+persists between requests. Output is streamed back as JSON lines while the code
+runs. Started by utils.python_kernel, not meant to be run by hand.
+"""
+import importlib
+import io
+import json
+import os
+import signal
+import sys
+import time
+import traceback
+
+try:
+    import resource
+except ImportError:  # Windows, no CPU or memory limits
+    resource = None
+
+
+class ExecutionTimeout(BaseException):
+    """Raised by the limit signals, a BaseException so `except Exception` in user code doesn't swallow it."""
+
+
+class StreamWriter(io.TextIOBase):
+    """File-like object forwarding everything written to it as protocol messages."""
+
+    def __init__(self, send, name: str):
+        self.send = send
+        self.name = name
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: str) -> int:
+        if data:
+            self.send({"type": self.name, "data": data})
+        return len(data)
+
+
+# Set when a limit fires, so a run whose code caught the exception is still reported as timed out
+_limit_hit = False
+
+
+def _on_timeout(signum, frame):
+    global _limit_hit
+    _limit_hit = True
+    raise ExecutionTimeout("Execution timed out")
+
+
+def _on_cpu_limit(signum, frame):
+    global _limit_hit
+    _limit_hit = True
+    raise ExecutionTimeout("CPU time limit exceeded")
+
+
+def main():
+    global _limit_hit
+    # Keep the real stdout for the protocol, anything written straight to file
+    # descriptor 1 (e.g. by subprocesses) goes to stderr instead
+    protocol = os.fdopen(os.dup(1), "w", encoding="utf-8")
+    os.dup2(2, 1)
+
+    def send(message: dict) -> None:
+        protocol.write(json.dumps(message) + "\n")
+        protocol.flush()
+
+    memory_mb = int(os.environ.get("KERNEL_MEMORY_MB", "0"))
+    if resource and memory_mb:
+        limit = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    if hasattr(signal, "SIGALRM"):
+        signal.signal(signal.SIGALRM, _on_timeout)
+    if hasattr(signal, "SIGXCPU"):
+        signal.signal(signal.SIGXCPU, _on_cpu_limit)
+
+    namespace = {"__name__": "__main__"}
+    preloaded = []
+    for module in filter(None, os.environ.get("KERNEL_PRELOAD", "").split(",")):
+        try:
+            namespace[module.split(".")[0]] = importlib.import_module(module)
+            preloaded.append(module)
+        except ImportError:
+            pass
+    send({"type": "ready", "preloaded": preloaded})
+
+    stdout, stderr = StreamWriter(send, "stdout"), StreamWriter(send, "stderr")
+    for line in sys.stdin:
+        request = json.loads(line)
+        timeout = request.get("timeout", 0)
+        cpu_seconds = request.get("cpu_seconds", 0)
+        if resource and cpu_seconds:
+            used = resource.getrusage(resource.RUSAGE_SELF)
+            soft = int(used.ru_utime + used.ru_stime) + cpu_seconds
+            _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+            resource.setrlimit(resource.RLIMIT_CPU, (soft if hard == resource.RLIM_INFINITY else min(soft, hard), hard))
+
+        sys.stdout, sys.stderr = stdout, stderr
+        status = "success"
+        _limit_hit = False
+        start = time.perf_counter()
+        try:
+            if timeout and hasattr(signal, "setitimer"):
+                signal.setitimer(signal.ITIMER_REAL, timeout)
+            exec(compile(request["code"], "<code_execute>", "exec"), namespace)
+        except BaseException as e:
+            status = "timeout" if isinstance(e, ExecutionTimeout) else "error"
+            # Leave the worker's own frame out of the traceback
+            traceback.print_exception(type(e), e, e.__traceback__.tb_next)
+        finally:
+            if hasattr(signal, "setitimer"):
+                signal.setitimer(signal.ITIMER_REAL, 0)
+            sys.stdout, sys.stderr = sys.__stdout__, sys.__stderr__
+        if _limit_hit:
+            status = "timeout"
+        send({"type": "done", "status": status, "seconds": time.perf_counter() - start})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+import fnmatch
+import hashlib
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+# Directories that are never worth indexing, on top of .gitignore rules
+SKIP_DIRS = {".git", "node_modules", "__pycache__", ".venv", "venv", "dist", "build", ".mypy_cache", ".pytest_cache"}
+
+# Text files the code assistant can work with
+TEXT_EXTENSIONS = {
+    ".py", ".ts", ".tsx", ".js", ".jsx", ".json", ".md", ".txt", ".toml", ".yaml", ".yml",
+    ".cfg", ".ini", ".html", ".css", ".sh", ".sql", ".java", ".go", ".rs", ".rb", ".c", ".h",
+    ".cpp", ".hpp", ".cs", ".kt", ".swift", ".xml",
+}
+TEXT_FILENAMES = {"Dockerfile", "Makefile", "README", "LICENSE", ".gitignore", ".env.example"}
+
+
+@dataclass
+class FileEntry:
+    path: str
+    size: int
+    mtime: float
+    lines: int
+    sha256: str
+
+
+class GitIgnore:
+    """Subset of .gitignore matching: globs, `**`, anchored patterns, directory-only patterns and `!` negation."""
+
+    def __init__(self, base: str, lines: list[str]):
+        self.base = base
+        self.rules = []
+        for line in lines:
+            line = line.rstrip("\n").rstrip()
+            if not line or line.startswith("#"):
+                continue
+            negate = line.startswith("!")
+            if negate:
+                line = line[1:]
+            dir_only = line.endswith("/")
+            line = line.strip("/") if dir_only else line
+            anchored = "/" in line.lstrip("/")
+            self.rules.append((line.lstrip("/"), negate, dir_only, anchored))
+
+    @classmethod
+    def load(cls, directory: str, base: str) -> "GitIgnore | None":
+        path = os.path.join(directory, ".gitignore")
+        if not os.path.isfile(path):
+            return None
+        with open(path, encoding="utf-8", errors="replace") as f:
+            return cls(base, f.readlines())
+
+    def match(self, rel_path: str, is_dir: bool) -> bool | None:
+        """Return True if ignored, False if re-included, None if no rule applies."""
+        if self.base:
+            if not rel_path.startswith(self.base + "/"):
+                return None
+            rel_path = rel_path[len(self.base) + 1:]
+        name = rel_path.rsplit("/", 1)[-1]
+        result = None
+        for pattern, negate, dir_only, anchored in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if anchored:
+                matched = fnmatch.fnmatchcase(rel_path, pattern) or (
+                    pattern.startswith("**/") and fnmatch.fnmatchcase(rel_path, pattern[3:])
+                )
+            else:
+                matched = fnmatch.fnmatchcase(name, pattern)
+            if matched:
+                result = not negate
+        return result
+
+
+def _is_ignored(rel_path: str, is_dir: bool, ignores: list[GitIgnore]) -> bool:
+    ignored = False
+    # Deeper .gitignore files take precedence, like git
+    for rules in ignores:
+        result = rules.match(rel_path, is_dir)
+        if result is not None:
+            ignored = result
+    return ignored
+
+
+def _is_text_name(name: str, extensions: set[str]) -> bool:
+    return name in TEXT_FILENAMES or os.path.splitext(name)[1].lower() in extensions
+
+
+def _looks_binary(data: bytes) -> bool:
+    return b"\0" in data[:8192]
+
+
+class ProjectIndex:
+    """
+    Index of the text files of a project directory.
+
+    The tree is walked concurrently, skipping ignored paths, binary files, unknown
+    extensions and files above max_file_bytes. Files are only re-hashed when their
+    size or modification time changed, and file bodies are read on demand.
+
+    Args:
+        root: Project directory
+        max_file_bytes: Larger files are listed as skipped
+        max_files: Maximum number of files in the index
+        extensions: File extensions to index
+        workers: Threads used to walk directories and hash files
+    """
+
+    def __init__(self, root: str, max_file_bytes: int = 200_000, max_files: int = 2000,
+                 extensions: set[str] | None = None, workers: int = 8):
+        self.root = os.path.abspath(root)
+        self.max_file_bytes = max_file_bytes
+        self.max_files = max_files
+        self.extensions = extensions or TEXT_EXTENSIONS
+        self.workers = workers
+        self.files: dict[str, FileEntry] = {}
+        self.skipped: dict[str, str] = {}
+        self.truncated = False
+        # Hash of each file as last returned by read(), to avoid sending it again
+        self._sent: dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def _scan_dir(self, rel_dir: str, ignores: list[GitIgnore]):
+        directory = os.path.join(self.root, rel_dir)
+        local = GitIgnore.load(directory, rel_dir)
+        if local:
+            ignores = ignores + [local]
+        files, subdirs = [], []
+        with os.scandir(directory) as it:
+            for entry in it:
+                rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+                if entry.is_symlink():
+                    continue
+                if entry.is_dir():
+                    if entry.name not in SKIP_DIRS and not _is_ignored(rel_path, True, ignores):
+                        subdirs.append(rel_path)
+                elif entry.is_file() and not _is_ignored(rel_path, False, ignores):
+                    files.append((rel_path, entry.stat()))
+        return files, subdirs, ignores
+
+    def _hash_file(self, rel_path: str, stat: os.stat_result) -> FileEntry | str:
+        with open(os.path.join(self.root, rel_path), "rb") as f:
+            data = f.read()
+        if _looks_binary(data):
+            return "binary"
+        return FileEntry(rel_path, stat.st_size, stat.st_mtime, len(data.splitlines()),
+                         hashlib.sha256(data).hexdigest())
+
+    def refresh(self) -> "ProjectIndex":
+        """Walk the tree and re-hash new or modified files."""
+        if not os.path.isdir(self.root):
+            raise FileNotFoundError(f"Project directory not found: {self.root}")
+
+        candidates: list[tuple[str, os.stat_result]] = []
+        skipped: dict[str, str] = {}
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            pending = [pool.submit(self._scan_dir, "", [])]
+            while pending:
+                files, subdirs, ignores = pending.pop(0).result()
+                for rel_path, stat in files:
+                    name = rel_path.rsplit("/", 1)[-1]
+                    if not _is_text_name(name, self.extensions):
+                        skipped[rel_path] = "extension"
+                    elif stat.st_size > self.max_file_bytes:
+                        skipped[rel_path] = f"larger than {self.max_file_bytes} bytes"
+                    else:
+                        candidates.append((rel_path, stat))
+                pending.extend(pool.submit(self._scan_dir, subdir, ignores) for subdir in subdirs)
+
+            candidates.sort(key=lambda candidate: candidate[0])
+            truncated = len(candidates) > self.max_files
+            candidates = candidates[: self.max_files]
+
+            with self._lock:
+                previous = self.files
+            files: dict[str, FileEntry] = {}
+            to_hash = []
+            for rel_path, stat in candidates:
+                known = previous.get(rel_path)
+                if known and known.size == stat.st_size and known.mtime == stat.st_mtime:
+                    files[rel_path] = known
+                else:
+                    to_hash.append((rel_path, stat))
+            for (rel_path, _), result in zip(to_hash, pool.map(lambda args: self._hash_file(*args), to_hash)):
+                if isinstance(result, FileEntry):
+                    files[rel_path] = result
+                else:
+                    skipped[rel_path] = result
+
+        with self._lock:
+            self.files = dict(sorted(files.items()))
+            self.skipped = skipped
+            self.truncated = truncated
+        return self
+
+    def manifest(self, max_entries: int = 300) -> dict:
+        """File list with sizes, line counts and short hashes, without file contents."""
+        with self._lock:
+            entries = list(self.files.values())
+            skipped = dict(self.skipped)
+            truncated = self.truncated
+        result = {
+            "root": self.root,
+            "file_count": len(entries),
+            "total_bytes": sum(entry.size for entry in entries),
+            "files": [
+                {"path": entry.path, "bytes": entry.size, "lines": entry.lines, "sha256": entry.sha256[:12]}
+                for entry in entries[:max_entries]
+            ],
+            "skipped_count": len(skipped),
+        }
+        if truncated or len(entries) > max_entries:
+            result["truncated"] = True
+            result["message"] = (
+                f"Only {min(len(entries), max_entries)} files are listed. "
+                "Call project_reader on a subdirectory to see more."
+            )
+        return result
+
+    def read(self, paths: list[str], max_bytes: int = 100_000, force: bool = False) -> dict:
+        """
+        Return the content of indexed files up to max_bytes in total.
+
+        Files returned earlier and unchanged since are reported as unchanged instead
+        of being sent again, unless force is set.
+        """
+        contents, unchanged, missing, over_budget = {}, [], [], []
+        budget = max_bytes
+        for path in paths:
+            path = os.path.normpath(path.strip()).replace(os.sep, "/")
+            with self._lock:
+                entry = self.files.get(path)
+                sent = self._sent.get(path)
+            if not entry:
+                missing.append(path)
+                continue
+            if not force and sent == entry.sha256:
+                unchanged.append(path)
+                continue
+            if entry.size > budget:
+                over_budget.append(path)
+                continue
+            with open(os.path.join(self.root, path), encoding="utf-8", errors="replace") as f:
+                contents[path] = f.read()
+            budget -= entry.size
+            with self._lock:
+                self._sent[path] = entry.sha256
+
+        result = {"files": contents}
+        if unchanged:
+            result["unchanged"] = unchanged
+        if missing:
+            result["not_indexed"] = missing
+        if over_budget:
+            result["over_budget"] = over_budget
+            result["message"] = f"Read limit of {max_bytes} bytes reached, request the remaining files separately."
+        return result
+
+
+_indexes: dict[str, ProjectIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_project_index(project_directory: str) -> ProjectIndex:
+    """Return the refreshed index of a project directory, reusing previous hashes."""
+    root = os.path.abspath(project_directory)
+    with _indexes_lock:
+        index = _indexes.get(root)
+        if index is None:
+            index = _indexes[root] = ProjectIndex(root)
+    return index.refresh()
@@ -0,0 +1,195 @@
+import json
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+WORKER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "kernel_worker.py")
+
+# Modules imported once when a kernel starts, available to executed code without an import
+DEFAULT_PRELOAD = "json,re,math,random,collections,itertools,functools,dataclasses,typing,datetime,pathlib"
+
+
+@dataclass
+class ExecutionResult:
+    status: str
+    stdout: str
+    stderr: str
+    exec_seconds: float
+    total_seconds: float
+    kernel_started: bool
+    output_truncated: bool = False
+
+    def __str__(self) -> str:
+        parts = []
+        if self.stdout:
+            parts.append(self.stdout.rstrip())
+        if self.stderr:
+            parts.append(f"stderr:\n{self.stderr.rstrip()}")
+        if self.output_truncated:
+            parts.append("[output truncated]")
+        startup = "new kernel" if self.kernel_started else "warm kernel"
+        parts.append(
+            f"[{self.status}, ran in {self.exec_seconds * 1000:.0f} ms, "
+            f"{self.total_seconds * 1000:.0f} ms total, {startup}]"
+        )
+        return "\n".join(parts)
+
+
+@dataclass
+class KernelLimits:
+    timeout_seconds: float = float(os.environ.get("CODE_KERNEL_TIMEOUT_SECONDS", "30"))
+    cpu_seconds: int = int(os.environ.get("CODE_KERNEL_CPU_SECONDS", "30"))
+    memory_mb: int = int(os.environ.get("CODE_KERNEL_MEMORY_MB", "1024"))
+    max_output_chars: int = int(os.environ.get("CODE_KERNEL_MAX_OUTPUT_CHARS", "20000"))
+    preload: list[str] = field(
+        default_factory=lambda: os.environ.get("CODE_KERNEL_PRELOAD", DEFAULT_PRELOAD).split(",")
+    )
+
+
+class PythonKernel:
+    """
+    Long-lived Python worker process that keeps its namespace between executions.
+
+    The worker imports the preloaded modules once, and every execution runs with
+    a time limit, a CPU time limit and a memory limit. Output is echoed to the
+    terminal as it is produced. A worker that stops responding is killed and a
+    fresh one is started on the next execution.
+    """
+
+    def __init__(self, cwd: str | None = None, limits: KernelLimits | None = None, echo: bool = True):
+        self.cwd = cwd
+        self.limits = limits or KernelLimits()
+        self.echo = echo
+        self._process: subprocess.Popen | None = None
+        self._messages: queue.Queue = queue.Queue()
+        self._lock = threading.Lock()
+
+    def _start(self) -> None:
+        env = dict(
+            os.environ,
+            KERNEL_PRELOAD=",".join(self.limits.preload),
+            KERNEL_MEMORY_MB=str(self.limits.memory_mb),
+            PYTHONUNBUFFERED="1",
+        )
+        self._process = subprocess.Popen(
+            [sys.executable, WORKER_PATH],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            cwd=self.cwd,
+            env=env,
+            text=True,
+            encoding="utf-8",
+        )
+        self._messages = queue.Queue()
+        threading.Thread(target=self._read, args=(self._process, self._messages), daemon=True).start()
+        message = self._messages.get(timeout=60)
+        if message is None or message["type"] != "ready":
+            self.close()
+            raise RuntimeError("Python kernel failed to start")
+
+    @staticmethod
+    def _read(process: subprocess.Popen, messages: queue.Queue) -> None:
+        for line in process.stdout:
+            messages.put(json.loads(line))
+        # The worker exited
+        messages.put(None)
+
+    def execute(self, code: str) -> ExecutionResult:
+        with self._lock:
+            start = time.perf_counter()
+            started = self._process is None or self._process.poll() is not None
+            if started:
+                self._start()
+
+            self._process.stdin.write(json.dumps({
+                "code": code,
+                "timeout": self.limits.timeout_seconds,
+                "cpu_seconds": self.limits.cpu_seconds,
+            }) + "\n")
+            self._process.stdin.flush()
+
+            output = {"stdout": [], "stderr": []}
+            size, truncated = 0, False
+            # The worker interrupts itself at the timeout, this is the fallback if it doesn't
+            deadline = time.monotonic() + self.limits.timeout_seconds + 5
+            while True:
+                try:
+                    message = self._messages.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    self.close()
+                    return self._result("timeout", output, None, start, started, truncated)
+                if message is None:
+                    self._process = None
+                    return self._result("crashed", output, None, start, started, truncated)
+                if message["type"] == "done":
+                    return self._result(message["status"], output, message["seconds"], start, started, truncated)
+
+                data = message["data"]
+                if self.echo:
+                    stream = sys.stdout if message["type"] == "stdout" else sys.stderr
+                    stream.write(data)
+                    stream.flush()
+                room = self.limits.max_output_chars - size
+                if len(data) > room:
+                    data = data[: max(room, 0)]
+                    truncated = True
+                if data:
+                    output[message["type"]].append(data)
+                    size += len(data)
+
+    def _result(self, status, output, exec_seconds, start, started, truncated) -> ExecutionResult:
+        total = time.perf_counter() - start
+        return ExecutionResult(
+            status=status,
+            stdout="".join(output["stdout"]),
+            stderr="".join(output["stderr"]),
+            exec_seconds=exec_seconds if exec_seconds is not None else total,
+            total_seconds=total,
+            kernel_started=started,
+            output_truncated=truncated,
+        )
+
+    def close(self) -> None:
+        if self._process and self._process.poll() is None:
+            self._process.kill()
+            self._process.wait()
+        self._process = None
+
+
+class KernelManager:
+    """One kernel per session, the least recently used kernel is closed above max_kernels."""
+
+    def __init__(self, max_kernels: int = 4):
+        self.max_kernels = max_kernels
+        self._kernels: OrderedDict[str, PythonKernel] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session: str) -> PythonKernel:
+        with self._lock:
+            kernel = self._kernels.pop(session, None)
+            if kernel is None:
+                cwd = os.path.join("session", session)
+                kernel = PythonKernel(cwd=cwd if os.path.isdir(cwd) else None)
+            self._kernels[session] = kernel
+            while len(self._kernels) > self.max_kernels:
+                _, oldest = self._kernels.popitem(last=False)
+                oldest.close()
+            return kernel
+
+    def reset(self, session: str) -> None:
+        with self._lock:
+            kernel = self._kernels.pop(session, None)
+        if kernel:
+            kernel.close()
+
+    def close_all(self) -> None:
+        with self._lock:
+            kernels = list(self._kernels.values())
+            self._kernels.clear()
+        for kernel in kernels:
+            kernel.close()
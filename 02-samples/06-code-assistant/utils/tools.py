@@ -1,36 +1,74 @@
 from strands import Agent, tool
 from strands.models import BedrockModel
-from strands_tools import editor, file_read, file_write, python_repl, shell
+from strands_tools import editor, file_write, shell
 import os
+from .agent_registry import SubAgentRegistry
+from .project_index import get_project_index
+from .python_kernel import KernelManager
 from .prompts import CODE_AGENT_PROMPT, WRITER_AGENT_PROMPT, REVIEWER_AGENT_PROMPT
 
 bedrock_model = BedrockModel(
     model_id="us.anthropic.claude-sonnet-4-20250514-v1:0",
 )
 
+# Sub-agents are built on first use and reused by every tool call
+sub_agents = SubAgentRegistry()
+sub_agents.register(
+    "generator", lambda: Agent(system_prompt=CODE_AGENT_PROMPT, model=bedrock_model)
+)
+sub_agents.register(
+    "reviewer", lambda: Agent(system_prompt=REVIEWER_AGENT_PROMPT, model=bedrock_model)
+)
+sub_agents.register(
+    "writer",
+    lambda: Agent(system_prompt=WRITER_AGENT_PROMPT, tools=[shell, file_write, editor]),
+)
+
+# Warm Python worker processes used by code_execute, one per session
+kernels = KernelManager()
+
 @tool
-def project_reader(project_directory: str) -> dict[str, str] | str:
+def project_reader(project_directory: str) -> dict | str:
     """
-    Read files in a project directory
+    List the files in a project directory, including subdirectories
+
+    Ignored, binary and very large files are left out. Use read_project_files
+    to get the content of the files you need.
 
     Args:
-        project_directory: Project directory to read files from
+        project_directory: Project directory to index
 
     Returns:
-        files content
+        Manifest with the path, size, line count and content hash of each file
     """
     try:
-        file_reader_agent = Agent(tools=[file_read])
-        return {
-            file_name: file_reader_agent.tool.file_read(
-                path=os.path.join(project_directory, file_name), mode="view"
-            )["content"][0]["text"]
-            for file_name in os.listdir(project_directory)
-        }
+        return get_project_index(project_directory).manifest()
     except Exception as e:
         return f"Error reading project {project_directory}: {e}"
 
 
+@tool
+def read_project_files(project_directory: str, paths: list[str], force: bool = False) -> dict | str:
+    """
+    Read files of a project directory listed by project_reader
+
+    Files already read and unchanged since are reported as unchanged instead of
+    being returned again.
+
+    Args:
+        project_directory: Project directory the files belong to
+        paths: File paths relative to the project directory
+        force: Return the content even if the file is unchanged
+
+    Returns:
+        files content
+    """
+    try:
+        return get_project_index(project_directory).read(paths, force=force)
+    except Exception as e:
+        return f"Error reading files from {project_directory}: {e}"
+
+
 @tool
 def code_generator(task: str) -> str:
     """
@@ -43,8 +81,7 @@ def code_generator(task: str) -> str:
         Generated Python code
     """
     try:
-        agent = Agent(system_prompt=CODE_AGENT_PROMPT, model=bedrock_model)
-        result = str(agent(f"Complete the task: {task}")).strip()
+        result = str(sub_agents.invoke("generator", f"Complete the task: {task}")).strip()
         return result or "Could not generate code. Please provide more context."
     except Exception as e:
         return f"Error generating code for task '{task}': {e}"
@@ -62,8 +99,7 @@ def code_reviewer(code: str) -> str:
         Improved Python code using best practices
     """
     try:
-        agent = Agent(system_prompt=REVIEWER_AGENT_PROMPT, model=bedrock_model)
-        result = str(agent(f"Optimize code:\n{code}")).strip()
+        result = str(sub_agents.invoke("reviewer", f"Optimize code:\n{code}")).strip()
         return result or "Code review did not return any result."
     except Exception as e:
         return f"Error reviewing code: {e}"
@@ -83,11 +119,9 @@ def code_writer_agent(code: str, project_name: str) -> str:
     """
     try:
         os.makedirs(f"session/{project_name}", exist_ok=True)
-        agent = Agent(
-            system_prompt=WRITER_AGENT_PROMPT, tools=[shell, file_write, editor]
-        )
-        agent(
-            f"Create the files in `session/{project_name}` directory. Write the following code:\n\n{code}"
+        sub_agents.invoke(
+            "writer",
+            f"Create the files in `session/{project_name}` directory. Write the following code:\n\n{code}",
         )
         return f"Files created in session/{project_name}/ directory."
     except Exception as e:
@@ -95,18 +129,25 @@ def code_writer_agent(code: str, project_name: str) -> str:
 
 
 @tool
-def code_execute(code: str) -> str:
+def code_execute(code: str, session: str = "default", reset: bool = False) -> str:
     """
     Executes a Python code string and returns the result.
 
+    Code runs in a long-lived Python process per session, so variables, functions
+    and imports from earlier executions are still available. Execution is limited
+    in time, CPU and memory.
+
     Args:
         code: Python code to execute.
+        session: Session name, use the project name to run inside session/<project_name>.
+        reset: Start from a fresh Python process before executing the code.
 
     Returns:
-        Output or error message.
+        Output or error message, with the execution status and timing.
     """
     try:
-        agent = Agent(tools=[python_repl])
-        return agent.tool.python_repl(code=code)
+        if reset:
+            kernels.reset(session)
+        return str(kernels.get(session).execute(code))
     except Exception as e:
         return f"Error executing code: {e}"
@@ -3,6 +3,11 @@ import json
 import logging
 import os
 import re
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import boto3
 
 from strands_agent import StrandsAgent
 from utils.dynamo import DynamoDB
@@ -18,80 +23,151 @@ logger.setLevel(logging.INFO)
 # DynamoDB table name
 user_history_table = os.environ["USER_HISTORY_TABLE"]
 locale = os.environ["LOCALE"]
+# Max phone numbers processed in parallel for one SNS batch
+max_concurrency = int(os.environ.get("MAX_CONCURRENCY", "4"))
+metrics_namespace = os.environ.get("METRICS_NAMESPACE", "WhatsAppAgent")
+
+# Clients are created once per Lambda container and reused across records and invocations
+# (boto3 clients and resources are thread safe)
+dynamo = DynamoDB()
+whatsapp_client = boto3.client("socialmessaging")
 
 
-def process_record(record):
+def parse_record(record):
     sns = record.get("Sns", {})
     sns_message = json.loads(sns.get("Message", "{}"), parse_float=decimal.Decimal)
     print(f"sns_message: {sns_message}")
-
-    whatsapp_info = WhatsappService(sns_message)
-    dynamo = DynamoDB()
-    bedrock = StrandsAgent()
-
-    for message in whatsapp_info.messages:
-        message_type = message.message.get("type")
-        print("type:", message_type)
-
-        if message_type == "text":
-            data = {
-                "message": message.message,
-                "id": message.message_id,
-                "phone_number": message.phone_number,
-                "phone_number_id": message.phone_number_id,
-                "metadata": message.metadata,
-            }
-        else:
-            data = {
-                "message": MESSAGES[locale]["error"],
-                "phone_number_id": message.phone_number_id,
-                "metadata": message.metadata,
-            }
-            logger.error("Error on input. Not text")
-            return {
-                "statusCode": 500,
-                "body": json.dumps(
-                    "Error processing input type. Video, audio, image not supported yet."
-                ),
-            }
-
-        # get history
-        history = dynamo.query_by_day(user_history_table, message.phone_number)
-        # print(f'History: {history}')
-        hist_build = (
-            history[0] if history != [] else None
-        ) 
-        print(f"History after Build: {hist_build}")
-
-        # invoking agent
-        llm_response, agent_messages, sys_prompt = bedrock.agent_invoke(
-            message.get_text(), hist_build
-        )
-        # logger.info(f'LLM answer: {llm_response}')
-
-        # Creating new row with bedrock response (for logging)
-        row = message.build_whatsapp_row(
-            phone_number=message.phone_number,
-            messages=agent_messages,
-            role="assistant",
-            meta_phone_number_id=message.meta_phone_number_id,
-            id=message.message_id,
-            phone_number_id=message.phone_number_id,
-            timestamp=message.timestamp,
-            system_prompt=sys_prompt,
-        )
-
-        # Insert Log on Dynamo (LLM answer)
-        ret = dynamo.insert_user_message(user_history_table, row)
-
-        data["message"] = remove_thinking_tags(
-            llm_response.message["content"][0]["text"]
-        )
-        logger.info(f"Data after processing: {data}")
-
-        whatsapp_info.text_reply(
-            data["phone_number"], data["id"], data["phone_number_id"], data["message"]
-        )
+    return WhatsappService(sns_message, client=whatsapp_client)
+
+
+def emit_timing_metrics(timings):
+    # CloudWatch Embedded Metric Format: printed to the Lambda log, extracted as metrics
+    metric_names = [name for name in timings if name.endswith("_ms")]
+    print(json.dumps({
+        "_aws": {
+            "Timestamp": int(time.time() * 1000),
+            "CloudWatchMetrics": [{
+                "Namespace": metrics_namespace,
+                "Dimensions": [[]],
+                "Metrics": [{"Name": name, "Unit": "Milliseconds"} for name in metric_names],
+            }],
+        },
+        **timings,
+    }))
+
+
+def process_message(whatsapp_info, message):
+    start = time.perf_counter()
+    timings = {"message_id": message.message_id}
+
+    message_type = message.message.get("type")
+    print("type:", message_type)
+
+    if message_type != "text":
+        data = {
+            "message": MESSAGES[locale]["error"],
+            "phone_number_id": message.phone_number_id,
+            "metadata": message.metadata,
+        }
+        logger.error("Error on input. Not text")
+        return {
+            "statusCode": 500,
+            "body": json.dumps(
+                "Error processing input type. Video, audio, image not supported yet."
+            ),
+        }
+
+    data = {
+        "message": message.message,
+        "id": message.message_id,
+        "phone_number": message.phone_number,
+        "phone_number_id": message.phone_number_id,
+        "metadata": message.metadata,
+    }
+
+    # get history
+    step = time.perf_counter()
+    history = dynamo.query_by_day(user_history_table, message.phone_number)
+    timings["history_ms"] = round((time.perf_counter() - step) * 1000, 2)
+    hist_build = (
+        history[0] if history != [] else None
+    ) 
+    print(f"History after Build: {hist_build}")
+
+    # invoking agent, a new agent per message since it holds this user's conversation
+    step = time.perf_counter()
+    agent = StrandsAgent()
+    llm_response, agent_messages, sys_prompt, summary = agent.agent_invoke(
+        message.get_text(), hist_build
+    )
+    timings["agent_ms"] = round((time.perf_counter() - step) * 1000, 2)
+
+    data["message"] = remove_thinking_tags(
+        llm_response.message["content"][0]["text"]
+    )
+    logger.info(f"Data after processing: {data}")
+
+    # Reply before compacting, so an occasional summary call doesn't delay the answer
+    step = time.perf_counter()
+    whatsapp_info.text_reply(
+        data["phone_number"], data["id"], data["phone_number_id"], data["message"]
+    )
+    timings["reply_ms"] = round((time.perf_counter() - step) * 1000, 2)
+
+    # Keep the last turns verbatim and fold older ones into the rolling summary
+    step = time.perf_counter()
+    agent_messages, summary = agent.compact_history(agent_messages, summary)
+    timings["compact_ms"] = round((time.perf_counter() - step) * 1000, 2)
+
+    # Creating new row with bedrock response (for logging)
+    row = message.build_whatsapp_row(
+        phone_number=message.phone_number,
+        messages=agent_messages,
+        role="assistant",
+        meta_phone_number_id=message.meta_phone_number_id,
+        id=message.message_id,
+        phone_number_id=message.phone_number_id,
+        timestamp=message.timestamp,
+        system_prompt=sys_prompt,
+        summary=summary,
+    )
+
+    # Insert Log on Dynamo (LLM answer)
+    step = time.perf_counter()
+    dynamo.insert_user_message(user_history_table, row)
+    timings["save_ms"] = round((time.perf_counter() - step) * 1000, 2)
+    timings["total_ms"] = round((time.perf_counter() - start) * 1000, 2)
+    emit_timing_metrics(timings)
+    return {"statusCode": 200}
+
+
+def process_phone_messages(items):
+    # Messages from one phone number run in arrival order, each turn builds on the previous one
+    ok = True
+    for whatsapp_info, message in items:
+        try:
+            process_message(whatsapp_info, message)
+        except Exception as e:
+            logger.error(f"Error processing message {message.message_id}: {str(e)}")
+            ok = False
+    return ok
+
+
+def process_records(records):
+    # Group by phone number, keeping the order of messages for each number
+    by_phone = OrderedDict()
+    for record in records:
+        whatsapp_info = parse_record(record)
+        for message in whatsapp_info.messages:
+            by_phone.setdefault(message.phone_number, []).append((whatsapp_info, message))
+
+    if not by_phone:
+        return True
+    if len(by_phone) == 1:
+        return process_phone_messages(next(iter(by_phone.values())))
+
+    with ThreadPoolExecutor(max_workers=min(max_concurrency, len(by_phone))) as executor:
+        return all(executor.map(process_phone_messages, by_phone.values()))
 
 
 def remove_thinking_tags(text):
@@ -109,8 +185,8 @@ def remove_thinking_tags(text):
 def lambda_handler(event, context):
     try:
         records = event.get("Records", [])
-        for record in records:
-            process_record(record)
+        if not process_records(records):
+            return {"statusCode": 500, "body": json.dumps("Error processing request")}
         return {"statusCode": 200, "body": json.dumps("Success")}
     except Exception as e:
         logger.error(f"Error processing event: {str(e)}")
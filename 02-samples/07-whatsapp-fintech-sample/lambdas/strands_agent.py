@@ -2,10 +2,12 @@ import os
 import logging
 
 from strands import Agent
+from strands.models import BedrockModel
 
 from tools.cards import get_transactions, put_payment
 from tools.promo import get_promotions, get_day_of_week
 from utils.locales import MESSAGES
+from utils.history import compact, decode_history, with_summary
 
 
 STARTUP_LOCALE=os.environ['LOCALE']
@@ -13,31 +15,59 @@ DEFAULT_MODEL=os.environ['DEFAULT_MODEL']
 # Logger configuration
 logger = logging.getLogger()
 
+# Shared by every agent in the container, so the Bedrock client is created once.
+# Agents themselves are per conversation since they hold the message history.
+model = BedrockModel(model_id=DEFAULT_MODEL)
+
+SUMMARY_PROMPT = """
+    You maintain a short summary of a conversation between a customer and a financial assistant.
+    Update the current summary with the new conversation excerpt. Keep facts the assistant may
+    need later (customer name, requests, amounts, dates, scheduled payments) and drop small talk.
+    Answer only with the updated summary, in the language of the conversation, in at most 150 words.
+"""
+
+
+def summarize_history(summary, transcript):
+    summarizer = Agent(system_prompt=SUMMARY_PROMPT, model=model, callback_handler=None)
+    result = summarizer(f"Current summary:\n{summary or '(empty)'}\n\nNew conversation excerpt:\n{transcript}")
+    return str(result).strip()
+
 
 class StrandsAgent():
     def __init__(self):
+        self.agent = None
+
+    def get_agent(self):
         self.agent = Agent(
             system_prompt=MESSAGES[STARTUP_LOCALE]["system"],
             tools=[get_transactions, put_payment, get_promotions, get_day_of_week],
-            model=DEFAULT_MODEL,
+            model=model,
         )
+
     def get_agent_with_history(self, messages, system_prompt):
         self.agent = Agent(
             messages=messages,
             system_prompt=system_prompt,
             tools=[get_transactions, put_payment, get_promotions, get_day_of_week],
-            model=DEFAULT_MODEL,
+            model=model,
         )
 
     def agent_invoke(self, user_prompt, history=None):
         try:
+            system_prompt = MESSAGES[STARTUP_LOCALE]["system"]
+            summary = ""
             if history is not None:
-                self.get_agent_with_history(messages=history["messages"], system_prompt=history["system_prompt"])
-                result = self.agent(user_prompt)
+                messages, summary, system_prompt = decode_history(history, system_prompt)
+                self.get_agent_with_history(messages=messages, system_prompt=with_summary(system_prompt, summary))
             else:
-                result = self.agent(user_prompt)
+                self.get_agent()
+            result = self.agent(user_prompt)
             logger.info(f"Agent result: {result}")
-            return result, self.agent.messages, self.agent.system_prompt
+            # The base system prompt is returned (stored by hash), the summary is kept separately
+            return result, self.agent.messages, system_prompt, summary
         except Exception as e:
             logger.info(f"Error during agent invocation: {e}")
-            raise
\ No newline at end of file
+            raise
+
+    def compact_history(self, messages, summary):
+        return compact(messages, summary, summarize_history)
@@ -1,5 +1,7 @@
 import boto3
 import os
+import threading
+import time
 
 from strands import tool
 from boto3.dynamodb.conditions import Key
@@ -10,6 +12,13 @@ DEFAULT_LOCALE=os.environ['LOCALE']
 dynamodb_resource=boto3.resource('dynamodb')
 dynamodb_table=os.getenv('PROMO_TABLE')
 
+# Promotions change at most daily, so they are cached per container and only
+# revalidated against the version item once the TTL expires
+PROMO_CACHE_TTL_SECONDS = int(os.environ.get('PROMO_CACHE_TTL_SECONDS', '900'))
+# week_day of the item holding the promotions version, bump its "version"
+# attribute after changing promotions to invalidate every container's cache
+VERSION_WEEK_DAY = -1
+
 translations = {
     "pt_BR": {
         "promo1_platinum": "Anuidade gratuita para o cartão Platinum",
@@ -35,8 +44,28 @@ translations = {
     }
 }
 
+# Strings without placeholders are used as is, only messages with arguments are formatted per call
+locale_translations = translations[DEFAULT_LOCALE]
+
 def get_translation(key, **kwargs):
-    return translations[DEFAULT_LOCALE][key].format(**kwargs)
+    if not kwargs:
+        return locale_translations[key]
+    return locale_translations[key].format(**kwargs)
+
+# Seed promotions, translated once when the container starts
+PROMOTIONS = [
+    {"week_day": 0, "promo1": get_translation("promo1_platinum"), "promo2": get_translation("promo2_diamond")},
+    {"week_day": 1, "promo1": get_translation("promo1_gold"), "promo2": get_translation("promo2_brinde")},
+    {"week_day": 2, "promo1": get_translation("promo1_platinum"), "promo2": get_translation("promo2_brinde")},
+    {"week_day": 3, "promo1": get_translation("promo1_marketplace")},
+    {"week_day": 4, "promo1": get_translation("promo1_seguro"), "promo2": get_translation("promo1_platinum")},
+    {"week_day": 5, "promo1": get_translation("promo2_brinde")},
+    {"week_day": 6, "promo1": get_translation("promo2_diamond"), "promo2": get_translation("promo2_brinde")}
+]
+
+# (week_day, locale) -> {"items": [...], "version": str, "expires_at": float}
+promo_cache = {}
+promo_cache_lock = threading.Lock()
 
 def read_dynamodb(table_name: str, pk_value: str):
     try:
@@ -49,26 +78,61 @@ def read_dynamodb(table_name: str, pk_value: str):
         print(f'Error querying table: {table_name}.')
         print(f'Exception: {err}')
 
+def read_version(table_name: str):
+    try:
+        table = dynamodb_resource.Table(table_name)
+        response = table.get_item(Key={'week_day': VERSION_WEEK_DAY}, ProjectionExpression='version')
+        return str(response.get('Item', {}).get('version', ''))
+    except Exception as err:
+        print(f'Error reading promotions version: {table_name}.')
+        print(f'Exception: {err}')
+
 def load_data(week_day):
     try:
-        promotions = [
-            {"week_day": 0, "promo1": get_translation("promo1_platinum"), "promo2": get_translation("promo2_diamond")},
-            {"week_day": 1, "promo1": get_translation("promo1_gold"), "promo2": get_translation("promo2_brinde")},
-            {"week_day": 2, "promo1": get_translation("promo1_platinum"), "promo2": get_translation("promo2_brinde")},
-            {"week_day": 3, "promo1": get_translation("promo1_marketplace")},
-            {"week_day": 4, "promo1": get_translation("promo1_seguro"), "promo2": get_translation("promo1_platinum")},
-            {"week_day": 5, "promo1": get_translation("promo2_brinde")},
-            {"week_day": 6, "promo1": get_translation("promo2_diamond"), "promo2": get_translation("promo2_brinde")}
-        ]
-        
         table = dynamodb_resource.Table(dynamodb_table)
 
-        for promo in promotions:
-            response = table.put_item(Item=promo)
+        with table.batch_writer() as batch:
+            for promo in PROMOTIONS:
+                batch.put_item(Item=promo)
+            batch.put_item(Item={"week_day": VERSION_WEEK_DAY, "version": str(int(time.time()))})
     except Exception as err:
         print(f'Error inserting on table: {dynamodb_table}.')
         print(f'Exception: {err}')
 
+def fetch_promotions(week_day, version=None):
+    if version is None:
+        version = read_version(dynamodb_table)
+    response = read_dynamodb(dynamodb_table, week_day)
+    if not response:
+        load_data(week_day)
+        version = read_version(dynamodb_table)
+        response = read_dynamodb(dynamodb_table, week_day)
+    return response, version
+
+def get_cached_promotions(week_day):
+    key = (week_day, DEFAULT_LOCALE)
+    now = time.monotonic()
+    with promo_cache_lock:
+        entry = promo_cache.get(key)
+        if entry and now < entry["expires_at"]:
+            return entry["items"]
+
+    # Expired entry: a single GetItem on the version item decides if the query is needed
+    version = None
+    if entry and entry["version"]:
+        version = read_version(dynamodb_table)
+        if version == entry["version"]:
+            with promo_cache_lock:
+                entry["expires_at"] = now + PROMO_CACHE_TTL_SECONDS
+            return entry["items"]
+
+    items, version = fetch_promotions(week_day, version)
+    # Errors and empty results aren't cached so the next call retries
+    if items:
+        with promo_cache_lock:
+            promo_cache[key] = {"items": items, "version": version, "expires_at": now + PROMO_CACHE_TTL_SECONDS}
+    return items
+
 @tool
 def get_promotions() -> str:
     """
@@ -80,11 +144,7 @@ def get_promotions() -> str:
     # Day of the week
     week_day = get_day_of_week()
     
-    response = read_dynamodb(dynamodb_table, week_day)
-    if not response:
-        load_data(week_day)
-        response = read_dynamodb(dynamodb_table, week_day)
-    return response
+    return get_cached_promotions(week_day)
 
 @tool
 def get_day_of_week() -> str:
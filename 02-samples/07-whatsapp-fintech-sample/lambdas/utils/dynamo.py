@@ -33,14 +33,27 @@ class DynamoDB:
             raise
 
     def query_by_day(self, table, phone_number):
+        # The table key is phone_number + day, so the current conversation is a key
+        # lookup on a single partition instead of a scan over the whole history table.
+        # Only the attributes needed to rebuild the agent are read.
         try:
             dynamo_table = self.client.Table(table)
             current_day = datetime.now().strftime("%Y/%m/%d")
-            response = dynamo_table.scan(
-                FilterExpression=Key('phone_number').eq(phone_number) & Key('day').eq(current_day)
+            response = dynamo_table.query(
+                KeyConditionExpression=Key('phone_number').eq(phone_number) & Key('day').eq(current_day),
+                ProjectionExpression="#messages_z, #summary, #system_prompt_hash, #messages, #system_prompt",
+                ExpressionAttributeNames={
+                    "#messages_z": "messages_z",
+                    "#summary": "summary",
+                    "#system_prompt_hash": "system_prompt_hash",
+                    # rows written before history compaction
+                    "#messages": "messages",
+                    "#system_prompt": "system_prompt"
+                },
+                ScanIndexForward=False,
+                Limit=1
             )
-            logger.info("Query by day successful: %s", response)
-            #print("Query by day successful: %s", response)
+            logger.info("Query by day successful: %s item(s)", response['Count'])
             return response['Items']
         except Exception as e:
             logger.error("Error querying by day from DynamoDB: %s", e)
@@ -0,0 +1,118 @@
+import hashlib
+import json
+import logging
+import os
+import zlib
+
+from utils.locales import MESSAGES
+
+
+logger = logging.getLogger(__name__)
+
+# Turns kept verbatim after a compaction, older turns are folded into the rolling summary
+KEEP_TURNS = int(os.environ.get("HISTORY_KEEP_TURNS", "6"))
+# Compaction runs once the history grows past this many turns, so the summary is
+# refreshed every few turns instead of on every message
+COMPACT_AFTER_TURNS = int(os.environ.get("HISTORY_COMPACT_AFTER_TURNS", "10"))
+# Cap for the compressed messages payload, well below the 400 KB DynamoDB item limit
+MAX_MESSAGES_BYTES = int(os.environ.get("HISTORY_MAX_BYTES", "300000"))
+# Characters of each message passed to the summarizer
+SUMMARY_INPUT_CHARS = 2000
+
+
+def prompt_hash(prompt):
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:16]
+
+
+# System prompts are stored by hash, resolved against the prompts shipped with the code
+SYSTEM_PROMPTS = {prompt_hash(locale["system"]): locale["system"] for locale in MESSAGES.values()}
+
+
+def encode_messages(messages):
+    return zlib.compress(json.dumps(messages, separators=(",", ":"), default=str).encode("utf-8"))
+
+
+def decode_history(row, default_system_prompt):
+    """Return (messages, summary, system_prompt) from a stored history row."""
+    if "messages_z" in row:
+        payload = row["messages_z"]
+        # boto3 returns Binary attributes wrapped, .value holds the bytes
+        payload = getattr(payload, "value", payload)
+        messages = json.loads(zlib.decompress(payload))
+    else:
+        # rows written before compaction stored the messages inline
+        messages = row.get("messages", [])
+
+    system_prompt = row.get("system_prompt") or SYSTEM_PROMPTS.get(row.get("system_prompt_hash"))
+    if system_prompt is None:
+        logger.info("Unknown system prompt hash, using current prompt")
+        system_prompt = default_system_prompt
+
+    return messages, row.get("summary", ""), system_prompt
+
+
+def is_user_text(message):
+    # A turn starts at a user message with text, tool results are also sent with the user role
+    return message.get("role") == "user" and any("text" in block for block in message.get("content", []))
+
+
+def split_turns(messages):
+    turns = []
+    for message in messages:
+        if is_user_text(message) or not turns:
+            turns.append([])
+        turns[-1].append(message)
+    return turns
+
+
+def message_text(message):
+    parts = []
+    for block in message.get("content", []):
+        if "text" in block:
+            parts.append(block["text"])
+        elif "toolUse" in block:
+            parts.append(f"[called tool {block['toolUse'].get('name', '')}]")
+        elif "toolResult" in block:
+            for result in block["toolResult"].get("content", []):
+                if "text" in result:
+                    parts.append(f"[tool result: {result['text']}]")
+    return " ".join(parts)[:SUMMARY_INPUT_CHARS]
+
+
+def compact(messages, summary, summarize):
+    """
+    Keep the last KEEP_TURNS turns verbatim and fold older ones into the summary.
+
+    Args:
+        messages: Agent messages after the current turn
+        summary: Rolling summary of the turns compacted so far
+        summarize: Callable (summary, transcript) -> new summary
+
+    Returns:
+        (messages, summary) to store
+    """
+    turns = split_turns(messages)
+    keep = len(turns) if len(turns) <= COMPACT_AFTER_TURNS else KEEP_TURNS
+
+    # Drop more turns if the compressed payload would still be too large
+    while keep > 1 and len(encode_messages([m for turn in turns[-keep:] for m in turn])) > MAX_MESSAGES_BYTES:
+        keep -= 1
+
+    if keep >= len(turns):
+        return messages, summary
+
+    older = [m for turn in turns[:-keep] for m in turn]
+    transcript = "\n".join(f"{m.get('role')}: {message_text(m)}" for m in older)
+    try:
+        summary = summarize(summary, transcript)
+    except Exception as e:
+        # Losing detail from old turns is better than failing the reply
+        logger.error(f"Error summarizing history: {str(e)}")
+
+    return [m for turn in turns[-keep:] for m in turn], summary
+
+
+def with_summary(system_prompt, summary):
+    if not summary:
+        return system_prompt
+    return f"{system_prompt}\n\nSummary of the earlier conversation with this customer:\n{summary}"
@@ -5,6 +5,8 @@ import time
 from typing import Dict, Optional
 from datetime import datetime
 
+from utils.history import encode_messages, prompt_hash
+
 logger = logging.getLogger()
 
 
@@ -34,7 +36,9 @@ class WhatsappMessage:
         return self.message.get("text", {}).get("body", "")
     
     def build_whatsapp_row(self, phone_number, messages, role, meta_phone_number_id, 
-                           id, phone_number_id, timestamp, system_prompt):
+                           id, phone_number_id, timestamp, system_prompt, summary=""):
+        # Messages are stored compressed and the system prompt by hash, so the item stays
+        # small; older turns live in the summary (see utils/history.py)
         try:
             current_day = datetime.now().strftime("%Y/%m/%d")
             return {
@@ -45,8 +49,9 @@ class WhatsappMessage:
                     "id": id,
                     "phone_number_id": phone_number_id,
                     "timestamp": timestamp,
-                    "messages": messages,
-                    "system_prompt": system_prompt
+                    "messages_z": encode_messages(messages),
+                    "summary": summary,
+                    "system_prompt_hash": prompt_hash(system_prompt)
             }
         except Exception as e:
             logger.error(f"Error building WhatsApp row: {str(e)}")
@@ -0,0 +1,168 @@
+"""
+Benchmark the conversation history lookup against DynamoDB Local.
+
+Loads a WhatsAppUserHistory-shaped table (phone_number + day key) with N rows and
+compares the previous scan + FilterExpression lookup with the key-based Query used by
+DynamoDB.query_by_day.
+
+Start DynamoDB Local first, e.g.:
+    docker run -p 8000:8000 amazon/dynamodb-local
+
+Usage:
+    python scripts/benchmark_history_lookup.py --rows 1000000 --lookups 50
+    python scripts/benchmark_history_lookup.py --skip-load --lookups 50
+"""
+
+import argparse
+import json
+import random
+import time
+import zlib
+from datetime import datetime, timedelta
+
+import boto3
+from boto3.dynamodb.conditions import Key
+
+
+TABLE_NAME = "WhatsAppUserHistoryBenchmark"
+DAYS = 30
+
+
+def get_resource(endpoint_url):
+    # DynamoDB Local accepts any credentials
+    return boto3.resource(
+        "dynamodb",
+        endpoint_url=endpoint_url,
+        region_name="us-east-1",
+        aws_access_key_id="local",
+        aws_secret_access_key="local",
+    )
+
+
+def create_table(resource):
+    existing = [table.name for table in resource.tables.all()]
+    if TABLE_NAME in existing:
+        resource.Table(TABLE_NAME).delete()
+        resource.meta.client.get_waiter("table_not_exists").wait(TableName=TABLE_NAME)
+
+    table = resource.create_table(
+        TableName=TABLE_NAME,
+        BillingMode="PAY_PER_REQUEST",
+        KeySchema=[
+            {"AttributeName": "phone_number", "KeyType": "HASH"},
+            {"AttributeName": "day", "KeyType": "RANGE"},
+        ],
+        AttributeDefinitions=[
+            {"AttributeName": "phone_number", "AttributeType": "S"},
+            {"AttributeName": "day", "AttributeType": "S"},
+        ],
+    )
+    table.wait_until_exists()
+    return table
+
+
+def day_string(offset):
+    return (datetime.now() - timedelta(days=offset)).strftime("%Y/%m/%d")
+
+
+def load_rows(table, rows):
+    phones = max(rows // DAYS, 1)
+    messages = zlib.compress(json.dumps([
+        {"role": "user", "content": [{"text": "What are my last transactions?"}]},
+        {"role": "assistant", "content": [{"text": "Here are your transactions for the last 5 days."}]},
+    ]).encode("utf-8"))
+    start = time.perf_counter()
+    with table.batch_writer() as batch:
+        for i in range(rows):
+            batch.put_item(Item={
+                "phone_number": f"55119{i % phones:08d}",
+                "day": day_string(i // phones),
+                "session_time": int(time.time()),
+                "messages_z": messages,
+                "summary": "",
+                "system_prompt_hash": "0123456789abcdef",
+            })
+            if i and i % 100000 == 0:
+                print(f"  loaded {i} rows ({time.perf_counter() - start:.0f}s)")
+    print(f"Loaded {rows} rows across {phones} phone numbers in {time.perf_counter() - start:.0f}s")
+    return phones
+
+
+def scan_lookup(table, phone_number, day):
+    """Previous implementation: one scan call filtered on phone_number and day."""
+    response = table.scan(
+        FilterExpression=Key("phone_number").eq(phone_number) & Key("day").eq(day)
+    )
+    return response["Items"], response["ScannedCount"]
+
+
+def full_scan_lookup(table, phone_number, day):
+    """The scan paginated to completion, which is what a correct scan lookup costs."""
+    items, scanned = [], 0
+    kwargs = {"FilterExpression": Key("phone_number").eq(phone_number) & Key("day").eq(day)}
+    while True:
+        response = table.scan(**kwargs)
+        items.extend(response["Items"])
+        scanned += response["ScannedCount"]
+        if "LastEvaluatedKey" not in response:
+            return items, scanned
+        kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
+def query_lookup(table, phone_number, day):
+    """Current implementation in DynamoDB.query_by_day."""
+    response = table.query(
+        KeyConditionExpression=Key("phone_number").eq(phone_number) & Key("day").eq(day),
+        ProjectionExpression="#messages_z, #summary, #system_prompt_hash",
+        ExpressionAttributeNames={
+            "#messages_z": "messages_z",
+            "#summary": "summary",
+            "#system_prompt_hash": "system_prompt_hash",
+        },
+        ScanIndexForward=False,
+        Limit=1,
+    )
+    return response["Items"], response["ScannedCount"]
+
+
+def benchmark(name, lookup, table, phones, lookups):
+    latencies, scanned, found = [], 0, 0
+    for _ in range(lookups):
+        phone_number = f"55119{random.randrange(phones):08d}"
+        start = time.perf_counter()
+        items, count = lookup(table, phone_number, day_string(0))
+        latencies.append((time.perf_counter() - start) * 1000)
+        scanned += count
+        found += bool(items)
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2]
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(f"{name:<16} p50={p50:9.1f} ms  p99={p99:9.1f} ms  "
+          f"items read/lookup={scanned / lookups:10.0f}  found={found}/{lookups}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--endpoint-url", default="http://localhost:8000")
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--lookups", type=int, default=50)
+    parser.add_argument("--skip-load", action="store_true", help="Reuse the table from a previous run")
+    parser.add_argument("--skip-full-scan", action="store_true", help="Don't run the paginated scan")
+    args = parser.parse_args()
+
+    resource = get_resource(args.endpoint_url)
+    if args.skip_load:
+        table = resource.Table(TABLE_NAME)
+        phones = max(args.rows // DAYS, 1)
+    else:
+        table = create_table(resource)
+        phones = load_rows(table, args.rows)
+
+    benchmark("query", query_lookup, table, phones, args.lookups)
+    benchmark("scan (1 page)", scan_lookup, table, phones, args.lookups)
+    if not args.skip_full_scan:
+        benchmark("scan (all pages)", full_scan_lookup, table, phones, max(args.lookups // 10, 1))
+
+
+if __name__ == "__main__":
+    main()
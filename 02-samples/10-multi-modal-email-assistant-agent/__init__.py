@@ -13,7 +13,12 @@ from .email_assistant import (
 )
 
 # Re-export components from kb_rag
-from kb_rag import retrieve_from_kb, create_analyzer_agent, run_kb_rag
+from kb_rag import (
+    retrieve_from_kb,
+    retrieve_many_from_kb,
+    create_analyzer_agent,
+    run_kb_rag,
+)
 
 # Re-export components from image_generation_agent
 from image_generation_agent import (
@@ -29,6 +34,7 @@ __all__ = [
     "run_email_assistant",
     # KB RAG components
     "retrieve_from_kb",
+    "retrieve_many_from_kb",
     "create_analyzer_agent",
     "run_kb_rag",
     # Image generation components
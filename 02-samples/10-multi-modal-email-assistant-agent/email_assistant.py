@@ -19,7 +19,14 @@ from strands_tools import editor, think
 # Import your existing 02-agents
 # Assuming these are in the same directory or in your Python path
 from kb_rag import retrieve_from_kb as kb_retrieve
+from kb_rag import retrieve_many_from_kb as kb_retrieve_many
 from image_generation_agent import generate_image_nova
+from gather_stage import (
+    create_planner_agent,
+    format_gathered,
+    gather_resources,
+    plan_resources,
+)
 
 
 @tool
@@ -41,6 +48,24 @@ def retrieve_from_kb(query: str) -> Dict[str, Any]:
     return kb_retrieve(query, kb_id, min_score, region)
 
 
+@tool
+def retrieve_many_from_kb(queries: List[str]) -> Dict[str, Any]:
+    """
+    Retrieve information from a knowledge base for several queries at once.
+
+    Args:
+        queries: The search queries
+
+    Returns:
+        Dictionary containing the merged retrieval results
+    """
+    kb_id = os.environ.get("KNOWLEDGE_BASE_ID", "")
+    region = os.environ.get("AWS_REGION", "us-west-2")
+    min_score = float(os.environ.get("MIN_SCORE", "0.4"))
+
+    return kb_retrieve_many(queries, kb_id, min_score, region)
+
+
 def create_email_assistant(kb_id: str = None, region: str = "us-west-2") -> Agent:
     """Create the main email assistant agent that orchestrates the workflow."""
     return Agent(
@@ -50,6 +75,7 @@ You have access to three main tools:
 1. Research tools:
    - http_request for general web search
    - retrieve_from_kb for retrieving relevant context from the knowledge base
+   - retrieve_many_from_kb for several knowledge base queries in one call
    
 2. Creative tools:
    - generate_image_nova for generating relevant images
@@ -63,7 +89,8 @@ STEP 1 - ANALYZE REQUEST:
 - Plan web research needs -> Use http_request
 
 STEP 2 - GATHER ALL RESOURCES:
-- Execute knowledge base queries if context needed
+- If the request already includes gathered resources, use them and only call tools for what is missing
+- Execute knowledge base queries if context needed, batching them with retrieve_many_from_kb
 - Request images generation if visuals needed
 - Perform web research for additional context
 
@@ -83,6 +110,7 @@ STEP 4 - FORMATTING AND REVIEW:
             editor,
             #           http_request,
             retrieve_from_kb,
+            retrieve_many_from_kb,
             generate_image_nova,
             think,
         ],
@@ -122,6 +150,11 @@ def main():
     parser.add_argument(
         "--min-score", type=float, default=0.4, help="Minimum relevance score (0-1)"
     )
+    parser.add_argument(
+        "--no-gather",
+        action="store_true",
+        help="Let the assistant call each tool itself instead of gathering resources concurrently first",
+    )
 
     args = parser.parse_args()
 
@@ -145,6 +178,9 @@ def main():
     # Initialize messages
     email_assistant.messages = create_initial_messages()
 
+    # Plans the resources of each request for the concurrent gather stage
+    planner = None if args.no_gather else create_planner_agent(args.region)
+
     # Interactive mode
     print("\n✉️ Enhanced Email Assistant with RAG and Image Generation ✉️\n")
     print("This assistant can:")
@@ -164,6 +200,21 @@ def main():
         print("\nGenerating email with all available resources... Please wait.\n")
 
         try:
+            if planner:
+                # Gather KB context and images concurrently before drafting
+                plan = plan_resources(planner, query)
+                gathered = gather_resources(plan, kb_id, args.min_score, args.region)
+                for task in gathered.tasks:
+                    print(f"- {task.name}: {task.status} in {task.seconds:.1f}s")
+                print(
+                    f"Planned and gathered in {gathered.total_seconds:.1f}s "
+                    f"({gathered.planner_seconds:.1f}s planning) instead of "
+                    f"{gathered.sequential_seconds:.1f}s sequentially "
+                    f"({gathered.saved_seconds:.1f}s saved)\n"
+                )
+                if gathered.tasks:
+                    query = f"{query}\n\nGathered resources:\n{format_gathered(gathered)}"
+
             # Create the user message with proper Nova format
             user_message = {"role": "user", "content": [{"text": query}]}
 
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Gather stage of the email assistant
+
+Plans the resources an email request needs, then retrieves knowledge base
+context and generates the image concurrently, each with its own timeout, before
+the email is drafted.
+"""
+
+import json
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from strands import Agent
+from strands.handlers.callback_handler import null_callback_handler
+from strands.models import BedrockModel
+
+from kb_rag import retrieve_many_from_kb
+from image_generation_agent import generate_image_nova
+
+KB_TIMEOUT_SECONDS = float(os.environ.get("GATHER_KB_TIMEOUT_SECONDS", "20"))
+IMAGE_TIMEOUT_SECONDS = float(os.environ.get("GATHER_IMAGE_TIMEOUT_SECONDS", "60"))
+
+PLANNER_PROMPT = """You plan the resources needed to write an email.
+Reply with a JSON object only, no other text:
+{"kb_queries": [up to 3 short knowledge base search queries, or an empty list],
+ "image_prompt": "description of one image for the email, or null if no image is needed"}
+Only request an image when the user asks for one or the email clearly benefits from a visual."""
+
+
+@dataclass
+class GatherPlan:
+    kb_queries: List[str] = field(default_factory=list)
+    image_prompt: Optional[str] = None
+    planner_seconds: float = 0.0
+
+
+@dataclass
+class TaskResult:
+    name: str
+    status: str
+    seconds: float
+    result: Any = None
+
+
+@dataclass
+class GatherResult:
+    tasks: List[TaskResult]
+    wall_seconds: float
+    planner_seconds: float = 0.0
+
+    @property
+    def sequential_seconds(self) -> float:
+        """Time the same tasks take when run one after the other."""
+        return sum(task.seconds for task in self.tasks)
+
+    @property
+    def total_seconds(self) -> float:
+        """Planning plus gathering, the planner call is latency the sequential flow doesn't have."""
+        return self.planner_seconds + self.wall_seconds
+
+    @property
+    def saved_seconds(self) -> float:
+        return max(self.sequential_seconds - self.total_seconds, 0.0)
+
+
+def create_planner_agent(region: str) -> Agent:
+    """Create the small agent that decides which resources an email needs."""
+    return Agent(
+        system_prompt=PLANNER_PROMPT,
+        model=BedrockModel(model_id="us.amazon.nova-lite-v1:0", region=region),
+        callback_handler=null_callback_handler,
+    )
+
+
+def plan_resources(planner: Agent, request: str) -> GatherPlan:
+    """
+    Ask the planner for the resources of a request.
+
+    When the planner fails or its reply is not usable, the KB is searched for
+    the request itself so the email is still drafted.
+    """
+    start = time.perf_counter()
+    planner.messages = []
+    try:
+        reply = str(planner(request))
+    except Exception as e:
+        print(f"Planner failed, searching the knowledge base for the request: {str(e)}")
+        reply = ""
+    seconds = time.perf_counter() - start
+    match = re.search(r"\{.*\}", reply, re.DOTALL)
+    try:
+        data = json.loads(match.group(0)) if match else {}
+    except ValueError:
+        data = {}
+    if not isinstance(data, dict) or "kb_queries" not in data:
+        return GatherPlan(kb_queries=[request], planner_seconds=seconds)
+    queries = [str(query) for query in data.get("kb_queries") or [] if str(query).strip()]
+    return GatherPlan(
+        kb_queries=queries[:3],
+        image_prompt=data.get("image_prompt") or None,
+        planner_seconds=seconds,
+    )
+
+
+def _timed(name: str, function: Callable[[], Dict[str, Any]]) -> TaskResult:
+    start = time.perf_counter()
+    try:
+        result = function()
+        status = result.get("status", "success") if isinstance(result, dict) else "success"
+    except Exception as e:
+        result, status = {"status": "error", "message": str(e)}, "error"
+    return TaskResult(name, status, time.perf_counter() - start, result)
+
+
+def gather_resources(
+    plan: GatherPlan,
+    kb_id: str,
+    min_score: float,
+    region: str,
+    kb_timeout: float = KB_TIMEOUT_SECONDS,
+    image_timeout: float = IMAGE_TIMEOUT_SECONDS,
+) -> GatherResult:
+    """
+    Run the planned knowledge base queries and image generation concurrently.
+
+    A task that doesn't finish within its timeout is reported as timed out and
+    the draft goes ahead without it.
+    """
+    tasks = {}
+    if plan.kb_queries:
+        tasks["knowledge_base"] = (
+            lambda: retrieve_many_from_kb(plan.kb_queries, kb_id, min_score, region),
+            kb_timeout,
+        )
+    if plan.image_prompt:
+        tasks["image"] = (lambda: generate_image_nova(plan.image_prompt), image_timeout)
+
+    start = time.perf_counter()
+    results = []
+    # Not used as a context manager, exiting it would wait for timed out tasks
+    pool = ThreadPoolExecutor(max_workers=max(len(tasks), 1))
+    futures = {name: pool.submit(_timed, name, function) for name, (function, _) in tasks.items()}
+    for name, future in futures.items():
+        remaining = tasks[name][1] - (time.perf_counter() - start)
+        try:
+            results.append(future.result(timeout=max(remaining, 0)))
+        except FutureTimeoutError:
+            results.append(TaskResult(name, "timeout", tasks[name][1]))
+    pool.shutdown(wait=False)
+    return GatherResult(results, time.perf_counter() - start, plan.planner_seconds)
+
+
+def format_gathered(result: GatherResult) -> str:
+    """Describe the gathered resources for the drafting step."""
+    sections = []
+    for task in result.tasks:
+        if task.name == "knowledge_base":
+            if task.status == "success":
+                sections.append(f"Knowledge base context:\n{task.result['content'][0]['text']}")
+            else:
+                sections.append(f"Knowledge base context: not available ({task.status}).")
+        elif task.name == "image":
+            if task.status == "success":
+                sections.append(f"Generated image: {task.result['image_path']}")
+            else:
+                sections.append(f"Generated image: not available ({task.status}).")
+    return "\n\n".join(sections)
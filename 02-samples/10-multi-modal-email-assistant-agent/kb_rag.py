@@ -6,58 +6,102 @@ A tool for retrieving and analyzing information from Amazon Bedrock Knowledge Ba
 """
 
 import os
-import uuid
 import argparse
-from typing import Dict, Any
+from typing import Dict, Any, List
 
 from strands import Agent
 from strands.models import BedrockModel
 from strands_tools import retrieve, think
 
+from kb_retriever import format_results, get_retriever
+
 # ======== DEFAULT CONFIGURATION ========
 # Default values (will be used if not provided as command-line arguments)
 DEFAULT_KB_ID = "<YOUR_KB_ID>"  # Replace with your actual KB ID
 DEFAULT_REGION = "us-east-1"  # Set to the region where your KB is located
 DEFAULT_MIN_SCORE = 0.4
+DEFAULT_NUMBER_OF_RESULTS = int(os.environ.get("KB_NUMBER_OF_RESULTS", "5"))
+DEFAULT_MAX_TOKENS = int(os.environ.get("KB_MAX_CONTEXT_TOKENS", "2000"))
 # ======================================
 
 
+def _format_response(results: List[Dict[str, Any]], max_tokens: int) -> Dict[str, Any]:
+    if not results:
+        return {"status": "error", "message": "No results above the minimum score."}
+    return {
+        "status": "success",
+        "content": [{"text": format_results(results, max_tokens)}],
+    }
+
+
 def retrieve_from_kb(
-    query: str, kb_id: str, min_score: float, region: str
+    query: str,
+    kb_id: str,
+    min_score: float,
+    region: str,
+    number_of_results: int = DEFAULT_NUMBER_OF_RESULTS,
+    max_tokens: int = DEFAULT_MAX_TOKENS,
 ) -> Dict[str, Any]:
     """
     Retrieve information from a knowledge base based on a query.
 
+    Results are cached per normalized query, so repeated or reworded queries
+    don't call the Knowledge Base again.
+
     Args:
         query: The search query
         kb_id: Knowledge Base ID
         min_score: Minimum relevance score
         region: AWS region
+        number_of_results: Results requested from the Knowledge Base
+        max_tokens: Approximate token budget of the returned text
 
     Returns:
         Dictionary containing retrieval results
     """
-    # Set environment variables for the retrieve tool
-    os.environ["KNOWLEDGE_BASE_ID"] = kb_id
-    os.environ["MIN_SCORE"] = str(min_score)
-    os.environ["AWS_REGION"] = region
-
     try:
-        # Call the retrieve tool directly
-        retrieve_response = retrieve.retrieve(
-            {
-                "toolUseId": str(uuid.uuid4()),
-                "input": {
-                    "text": query,
-                    "score": min_score,
-                    "numberOfResults": 5,
-                    "knowledgeBaseId": kb_id,
-                    "region": region,
-                },
-            }
+        results = get_retriever(kb_id, region).retrieve(
+            query, min_score, number_of_results
         )
+        return _format_response(results, max_tokens)
+    except Exception as e:
+        print(f"Error details: {str(e)}")
+        return {
+            "status": "error",
+            "message": f"Error retrieving from knowledge base: {str(e)}",
+        }
+
+
+def retrieve_many_from_kb(
+    queries: List[str],
+    kb_id: str,
+    min_score: float,
+    region: str,
+    number_of_results: int = DEFAULT_NUMBER_OF_RESULTS,
+    max_tokens: int = DEFAULT_MAX_TOKENS,
+) -> Dict[str, Any]:
+    """
+    Retrieve information for several queries at once.
 
-        return retrieve_response
+    Queries run concurrently, passages returned by more than one query appear
+    once, and the merged results share a single token budget.
+
+    Args:
+        queries: The search queries
+        kb_id: Knowledge Base ID
+        min_score: Minimum relevance score
+        region: AWS region
+        number_of_results: Results requested from the Knowledge Base per query
+        max_tokens: Approximate token budget of the returned text
+
+    Returns:
+        Dictionary containing retrieval results
+    """
+    try:
+        results = get_retriever(kb_id, region).retrieve_many(
+            queries, min_score, number_of_results
+        )
+        return _format_response(results, max_tokens)
     except Exception as e:
         print(f"Error details: {str(e)}")
         return {
@@ -158,9 +202,9 @@ Please analyze this information and provide insights about: {query}"""
                 print("\nDebug Information:")
                 print(f"KB ID: {kb_id}")
                 print(f"Region: {region}")
-                print(
-                    f"Environment variables: KNOWLEDGE_BASE_ID={os.environ.get('KNOWLEDGE_BASE_ID')}, AWS_REGION={os.environ.get('AWS_REGION')}"
-                )
+                print(f"Minimum score: {min_score}")
+                retriever = get_retriever(kb_id, region)
+                print(f"Cache: {retriever.hits} hits, {retriever.misses} misses")
 
         except Exception as e:
             print(f"Error: {str(e)}\n")
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Knowledge Base retrieval layer
+
+Queries an Amazon Bedrock Knowledge Base with a reused client, caches results
+per query, runs several queries concurrently, and returns deduplicated results
+trimmed to a token budget.
+"""
+
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+# Rough token estimate used for the context budget
+CHARS_PER_TOKEN = 4
+
+_clients: Dict[str, Any] = {}
+_clients_lock = threading.Lock()
+
+
+def get_kb_client(region: str):
+    """Return the bedrock-agent-runtime client of a region, created once per process."""
+    with _clients_lock:
+        if region not in _clients:
+            import boto3
+
+            _clients[region] = boto3.client("bedrock-agent-runtime", region_name=region)
+        return _clients[region]
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(re.findall(r"\w+", query.lower()))
+
+
+class StubRetriever:
+    """
+    Offline stand-in for the Knowledge Base, selected with KB_BACKEND=stub.
+
+    Scores documents by the share of query words they contain. Documents are
+    the .txt and .md files of KB_STUB_DIR, or the documents passed in.
+    """
+
+    def __init__(self, documents: Optional[Dict[str, str]] = None):
+        if documents is None:
+            documents = {}
+            directory = os.environ.get("KB_STUB_DIR", "")
+            if directory and os.path.isdir(directory):
+                for name in sorted(os.listdir(directory)):
+                    if name.endswith((".txt", ".md")):
+                        with open(os.path.join(directory, name), encoding="utf-8") as f:
+                            documents[name] = f.read()
+        self.documents = documents
+
+    def retrieve(self, query: str, number_of_results: int) -> List[Dict[str, Any]]:
+        words = set(normalize_query(query).split())
+        results = []
+        for source, text in self.documents.items():
+            document_words = set(normalize_query(text).split())
+            score = len(words & document_words) / len(words) if words else 0.0
+            results.append({"text": text, "score": score, "source": source})
+        results.sort(key=lambda result: result["score"], reverse=True)
+        return results[:number_of_results]
+
+
+class BedrockRetriever:
+    """Retrieves from a Bedrock Knowledge Base with the Retrieve API."""
+
+    def __init__(self, kb_id: str, region: str):
+        self.kb_id = kb_id
+        self.client = get_kb_client(region)
+
+    def retrieve(self, query: str, number_of_results: int) -> List[Dict[str, Any]]:
+        response = self.client.retrieve(
+            knowledgeBaseId=self.kb_id,
+            retrievalQuery={"text": query},
+            retrievalConfiguration={
+                "vectorSearchConfiguration": {"numberOfResults": number_of_results}
+            },
+        )
+        results = []
+        for result in response.get("retrievalResults", []):
+            location = result.get("location", {})
+            source = (
+                location.get("s3Location", {}).get("uri")
+                or result.get("metadata", {}).get("x-amz-bedrock-kb-source-uri")
+                or location.get("type", "")
+            )
+            results.append(
+                {
+                    "text": result.get("content", {}).get("text", ""),
+                    "score": result.get("score", 0.0),
+                    "source": source,
+                }
+            )
+        return results
+
+
+class KBRetriever:
+    """
+    Cached, batched retrieval from one Knowledge Base.
+
+    Results are cached by normalized query, Knowledge Base ID, minimum score and
+    number of results, for ttl seconds and up to cache_size queries.
+
+    Args:
+        kb_id: Knowledge Base ID
+        region: AWS region of the Knowledge Base
+        backend: Object with a retrieve(query, number_of_results) method
+        cache_size: Maximum number of cached queries
+        ttl: Seconds a cached result stays valid
+        max_workers: Queries run at the same time by retrieve_many
+    """
+
+    def __init__(
+        self,
+        kb_id: str,
+        region: str,
+        backend=None,
+        cache_size: int = 256,
+        ttl: float = 600,
+        max_workers: int = 4,
+    ):
+        self.kb_id = kb_id
+        self.region = region
+        if backend is None:
+            if os.environ.get("KB_BACKEND", "bedrock").lower() == "stub":
+                backend = StubRetriever()
+            else:
+                backend = BedrockRetriever(kb_id, region)
+        self.backend = backend
+        self.cache_size = cache_size
+        self.ttl = ttl
+        self.max_workers = max_workers
+        self.hits = 0
+        self.misses = 0
+        self._cache: "OrderedDict[Tuple, Tuple[float, List[Dict[str, Any]]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def retrieve(
+        self, query: str, min_score: float, number_of_results: int = 5
+    ) -> List[Dict[str, Any]]:
+        """Return the results scoring at least min_score without duplicates, best first."""
+        key = (normalize_query(query), self.kb_id, min_score, number_of_results)
+        now = time.monotonic()
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached and now - cached[0] < self.ttl:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return cached[1]
+            self.misses += 1
+
+        results = deduplicate(
+            [
+                result
+                for result in self.backend.retrieve(query, number_of_results)
+                if result["score"] >= min_score
+            ]
+        )
+
+        with self._lock:
+            self._cache[key] = (now, results)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return results
+
+    def retrieve_many(
+        self, queries: List[str], min_score: float, number_of_results: int = 5
+    ) -> List[Dict[str, Any]]:
+        """Run the queries concurrently and merge their results without duplicates."""
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            batches = list(
+                pool.map(
+                    lambda query: self.retrieve(query, min_score, number_of_results),
+                    queries,
+                )
+            )
+        return deduplicate([result for batch in batches for result in batch])
+
+
+def deduplicate(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Keep the best scoring copy of each passage, best first."""
+    best: Dict[str, Dict[str, Any]] = {}
+    for result in results:
+        key = " ".join(result["text"].split()).lower()
+        if key not in best or result["score"] > best[key]["score"]:
+            best[key] = result
+    return sorted(best.values(), key=lambda result: result["score"], reverse=True)
+
+
+def format_results(results: List[Dict[str, Any]], max_tokens: int) -> str:
+    """Render results best first, stopping when the token budget is used up."""
+    budget = max_tokens * CHARS_PER_TOKEN
+    blocks = []
+    for result in results:
+        header = f"Score: {result['score']:.4f} | Source: {result['source']}\n"
+        text = result["text"].strip()
+        if len(header) + len(text) > budget:
+            # Keep a partial passage only when a meaningful part of it fits
+            if budget - len(header) < 200:
+                break
+            text = text[: budget - len(header)].rsplit(" ", 1)[0] + " ..."
+        blocks.append(header + text)
+        budget -= len(header) + len(text)
+    omitted = len(results) - len(blocks)
+    if omitted:
+        blocks.append(f"({omitted} lower scoring results omitted to stay within {max_tokens} tokens)")
+    return "\n\n".join(blocks)
+
+
+_retrievers: Dict[Tuple[str, str], KBRetriever] = {}
+_retrievers_lock = threading.Lock()
+
+
+def get_retriever(kb_id: str, region: str) -> KBRetriever:
+    """Return the retriever of a Knowledge Base, shared so its cache is reused."""
+    with _retrievers_lock:
+        key = (kb_id, region)
+        if key not in _retrievers:
+            _retrievers[key] = KBRetriever(
+                kb_id,
+                region,
+                cache_size=int(os.environ.get("KB_CACHE_SIZE", "256")),
+                ttl=float(os.environ.get("KB_CACHE_TTL_SECONDS", "600")),
+            )
+        return _retrievers[key]
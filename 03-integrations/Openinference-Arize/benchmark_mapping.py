@@ -0,0 +1,138 @@
+"""
+Micro-benchmark for the Strands to OpenInference attribute transform.
+
+Builds spans shaped like the ones Strands emits for an agent invocation (agent,
+cycle, model invoke and tool spans) with a growing conversation history, then
+times StrandsToOpenInferenceProcessor._transform_attributes on each of them and
+measures how much JSON is encoded/decoded per invocation relative to the size of
+the conversation history. "cold" disables the message cache, "warm" uses it (the
+cycle and model spans of one invocation carry the same history).
+
+Usage:
+    python benchmark_mapping.py [--turns 10 50 200] [--iterations 200]
+"""
+
+import argparse
+import json
+import time
+import types
+
+import strands_to_openinference_mapping as mapping
+from strands_to_openinference_mapping import StrandsToOpenInferenceProcessor
+
+
+class _FakeSpanContext:
+    def __init__(self, span_id):
+        self.span_id = span_id
+        self.trace_id = 1
+
+
+class _FakeSpan:
+    def __init__(self, name, span_id):
+        self.name = name
+        self._context = _FakeSpanContext(span_id)
+
+    def get_span_context(self):
+        return self._context
+
+
+def build_conversation(turns):
+    """Strands message list with user text, tool use and tool result blocks."""
+    messages = []
+    for i in range(turns):
+        messages.append({"role": "user", "content": [{"text": f"Question {i}: " + "lorem ipsum dolor " * 20}]})
+        messages.append({"role": "assistant", "content": [
+            {"text": "Let me look that up."},
+            {"toolUse": {"toolUseId": f"tooluse_{i}", "name": "retrieve", "input": {"text": f"query {i}"}}}
+        ]})
+        messages.append({"role": "user", "content": [
+            {"toolResult": {"toolUseId": f"tooluse_{i}", "status": "success",
+                            "content": [{"text": "result text " * 60}]}}
+        ]})
+    return messages
+
+
+def build_spans(turns):
+    """Return (span, attributes) pairs for one agent invocation."""
+    history = json.dumps(build_conversation(turns))
+    completion = json.dumps([{"role": "assistant", "content": [{"text": "Here is the answer. " * 30}]}])
+    common = {"session.id": "abc-1234", "user.id": "user@example.com", "gen_ai.system": "strands-agents"}
+    tools = json.dumps([{"name": f"tool_{i}", "description": "does things " * 10,
+                         "input_schema": {"type": "object"}} for i in range(5)])
+
+    return [
+        (_FakeSpan("invoke_agent Restaurant Helper", 1), {
+            **common, "gen_ai.agent.name": "Restaurant Helper", "gen_ai.prompt": "Where can I eat?",
+            "gen_ai.completion": "Try Rice & Spice.", "gen_ai.agent.tools": tools,
+            "gen_ai.usage.prompt_tokens": 1200, "gen_ai.usage.completion_tokens": 80,
+            "gen_ai.usage.total_tokens": 1280,
+        }),
+        (_FakeSpan("Cycle 1", 2), {
+            **common, "event_loop.cycle_id": "c1", "gen_ai.prompt": history, "gen_ai.completion": completion,
+        }),
+        (_FakeSpan("Model invoke", 3), {
+            **common, "gen_ai.request.model": "us.anthropic.claude-3-7-sonnet-20250219-v1:0",
+            "gen_ai.prompt": history, "gen_ai.completion": completion, "gen_ai.response.id": "resp-1",
+            "max_tokens": 4096, "temperature": 0.3, "gen_ai.usage.prompt_tokens": 1200,
+            "gen_ai.usage.completion_tokens": 80, "gen_ai.usage.total_tokens": 1280,
+        }),
+        (_FakeSpan("Tool: retrieve", 4), {
+            **common, "tool.name": "retrieve", "tool.id": "tooluse_1", "tool.status": "success",
+            "tool.parameters": json.dumps({"text": "restaurants in New York"}),
+            "tool.result": json.dumps({"content": [{"text": "result text " * 200}]}),
+        }),
+    ]
+
+
+def measure_json_bytes(processor, spans):
+    counts = {"encoded": 0, "decoded": 0}
+
+    def dumps(*args, **kwargs):
+        encoded = json.dumps(*args, **kwargs)
+        counts["encoded"] += len(encoded)
+        return encoded
+
+    def loads(text, *args, **kwargs):
+        counts["decoded"] += len(text)
+        return json.loads(text, *args, **kwargs)
+
+    mapping.json = types.SimpleNamespace(dumps=dumps, loads=loads, JSONDecodeError=json.JSONDecodeError)
+    try:
+        for span, attrs in spans:
+            processor._transform_attributes(dict(attrs), span)
+    finally:
+        mapping.json = json
+    return counts
+
+
+def time_invocations(spans, iterations, **processor_kwargs):
+    elapsed = 0.0
+    for _ in range(iterations):
+        # New processor per invocation so the warm case only reuses work within one invocation
+        processor = StrandsToOpenInferenceProcessor(**processor_kwargs)
+        start = time.perf_counter()
+        for span, attrs in spans:
+            processor._transform_attributes(dict(attrs), span)
+        elapsed += time.perf_counter() - start
+    return elapsed / iterations * 1e6
+
+
+def run(turns_list, iterations):
+    print(f"{'turns':>6} {'history KB':>10} {'cold us':>10} {'warm us':>10} {'encoded KB':>11} {'decoded KB':>11}")
+    for turns in turns_list:
+        spans = build_spans(turns)
+        history_kb = len(spans[1][1]["gen_ai.prompt"]) / 1024
+        counts = measure_json_bytes(StrandsToOpenInferenceProcessor(message_cache_size=0), spans)
+        cold_us = time_invocations(spans, iterations, message_cache_size=0)
+        warm_us = time_invocations(spans, iterations)
+
+        print(f"{turns:>6} {history_kb:>10.1f} {cold_us:>10.1f} {warm_us:>10.1f} "
+              f"{counts['encoded'] / 1024:>11.1f} {counts['decoded'] / 1024:>11.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+    run(args.turns, args.iterations)
@@ -7,89 +7,250 @@ to OpenInference format for compatibility with Arize AI.
 
 import json
 import logging
+import queue
+import threading
+import time
+from collections import OrderedDict
 from typing import Any, Dict, List, Optional, Set
-from datetime import datetime
 
 from opentelemetry.sdk.trace import SpanProcessor
 from opentelemetry.trace import Span
 
 logger = logging.getLogger(__name__)
 
+_SHUTDOWN = object()
+
+_COMPACT = (",", ":")
+
+# Attributes holding full prompts/completions, subject to payload truncation
+_PAYLOAD_KEYS = ("input.value", "output.value", "llm.input_messages", "llm.output_messages")
+_UNSAMPLED_PAYLOAD_CHARS = 256
+
+
+def _json_member(key: str, encoded_value: str) -> str:
+    """Return '"key":value' for splicing already-encoded values into a JSON object."""
+    return f"{json.dumps(key)}:{encoded_value}"
+
 class StrandsToOpenInferenceProcessor(SpanProcessor):
     """
     SpanProcessor that converts Strands telemetry attributes to OpenInference format
     for compatibility with Arize AI.
+
+    Span hierarchy is only tracked while spans are open and is bounded by size and age,
+    so long-running agent services don't accumulate state. When a downstream processor
+    (e.g. a BatchSpanProcessor wrapping the exporter) is given, spans are forwarded to it
+    after transformation, optionally from a background worker so the JSON work stays off
+    the agent's hot path.
     """
 
-    def __init__(self, debug: bool = False):
+    def __init__(
+        self,
+        debug: bool = False,
+        downstream_processor: Optional[SpanProcessor] = None,
+        async_transform: bool = False,
+        max_queue_size: int = 2048,
+        max_tracked_spans: int = 10000,
+        span_ttl_seconds: float = 3600.0,
+        max_payload_chars: Optional[int] = None,
+        payload_sample_rate: float = 1.0,
+        message_cache_size: int = 16,
+    ):
         """
         Initialize the processor.
         
         Args:
             debug: Whether to log debug information
+            downstream_processor: Processor that receives spans after transformation
+            async_transform: Transform and forward spans from a background worker.
+                Requires downstream_processor.
+            max_queue_size: Spans waiting for the worker before new ones are dropped
+            max_tracked_spans: Open spans tracked for the hierarchy before the oldest are evicted
+            span_ttl_seconds: Age after which an open span that never ended is evicted
+            max_payload_chars: Truncate prompt/completion payload attributes longer than this
+            payload_sample_rate: Fraction of traces that keep full payloads. Payloads of the
+                other traces are cut to a short preview.
+            message_cache_size: Recently mapped message lists kept, so cycle and model spans
+                carrying the same conversation history only parse and encode it once
         """
         super().__init__()
+        if async_transform and downstream_processor is None:
+            raise ValueError("async_transform requires a downstream_processor")
+
         self.debug = debug
-        self.processed_spans = set()
         self.current_cycle_id = None
-        self.span_hierarchy = {}
+        self.span_hierarchy = OrderedDict()
+        self.max_tracked_spans = max_tracked_spans
+        self.span_ttl_seconds = span_ttl_seconds
+        self._trace_spans: Dict[int, Set[int]] = {}
+        self._hierarchy_lock = threading.Lock()
+
+        self.max_payload_chars = max_payload_chars
+        self.payload_sample_rate = payload_sample_rate
+        self.message_cache_size = message_cache_size
+        self._message_cache = OrderedDict()
+        self._message_cache_lock = threading.Lock()
+
+        self.downstream_processor = downstream_processor
+        self.spans_processed = 0
+        self.spans_dropped = 0
+        self.spans_failed = 0
+        self._stats_lock = threading.Lock()
+
+        self._queue = None
+        self._worker = None
+        if async_transform:
+            self._queue = queue.Queue(maxsize=max_queue_size)
+            self._worker = threading.Thread(
+                target=self._worker_loop, name="openinference-transform", daemon=True
+            )
+            self._worker.start()
 
     def on_start(self, span, parent_context=None):
         """Called when a span is started. Track span hierarchy."""
-        span_id = span.get_span_context().span_id
+        span_context = span.get_span_context()
+        span_id = span_context.span_id
+        trace_id = span_context.trace_id
         parent_id = None
         
         if parent_context and hasattr(parent_context, 'span_id'):
             parent_id = parent_context.span_id
         elif span.parent and hasattr(span.parent, 'span_id'):
             parent_id = span.parent.span_id
-            
-        self.span_hierarchy[span_id] = {
-            'name': span.name,
-            'span_id': span_id,
-            'parent_id': parent_id,
-            'start_time': datetime.now().isoformat()
-        }
+
+        with self._hierarchy_lock:
+            # Parents start before their children, so the parent name is resolved now and
+            # the span's own entry is enough to build graph attributes when it ends
+            parent_info = self.span_hierarchy.get(parent_id, {}) if parent_id else {}
+            self.span_hierarchy[span_id] = {
+                'name': span.name,
+                'span_id': span_id,
+                'trace_id': trace_id,
+                'parent_id': parent_id,
+                'parent_name': parent_info.get('name', ''),
+                'started': time.monotonic()
+            }
+            self._trace_spans.setdefault(trace_id, set()).add(span_id)
+            self._evict_stale_spans()
+
+        if self.downstream_processor is not None:
+            self.downstream_processor.on_start(span, parent_context=parent_context)
+
+    def _evict_stale_spans(self):
+        """Drop the oldest tracked spans beyond the size bound or TTL. Caller holds the lock."""
+        cutoff = time.monotonic() - self.span_ttl_seconds
+        while self.span_hierarchy:
+            oldest = next(iter(self.span_hierarchy.values()))
+            if len(self.span_hierarchy) <= self.max_tracked_spans and oldest['started'] >= cutoff:
+                break
+            self._forget_span(oldest['span_id'])
+
+    def _forget_span(self, span_id: int) -> Dict[str, Any]:
+        """Remove a span from the hierarchy. Caller holds the lock."""
+        span_info = self.span_hierarchy.pop(span_id, None) or {}
+        trace_spans = self._trace_spans.get(span_info.get('trace_id'))
+        if trace_spans is not None:
+            trace_spans.discard(span_id)
+            if not trace_spans:
+                del self._trace_spans[span_info['trace_id']]
+        return span_info
+
+    def _release_span(self, span: Span) -> Dict[str, Any]:
+        """Stop tracking an ended span, and its whole trace once the root span ends."""
+        span_id = span.get_span_context().span_id
+        with self._hierarchy_lock:
+            span_info = self._forget_span(span_id)
+            if span_info and span_info['parent_id'] is None:
+                for orphan_id in list(self._trace_spans.pop(span_info['trace_id'], ())):
+                    self.span_hierarchy.pop(orphan_id, None)
+        return span_info
 
     def on_end(self, span: Span):
         """
         Called when a span ends. Transform the span attributes from Strands format
-        to OpenInference format.
+        to OpenInference format, inline or on the background worker.
         """
-        if not hasattr(span, '_attributes') or not span._attributes:
+        span_info = self._release_span(span)
+
+        if self._queue is None:
+            self._process_span(span, span_info)
             return
 
+        try:
+            self._queue.put_nowait((span, span_info))
+        except queue.Full:
+            with self._stats_lock:
+                self.spans_dropped += 1
+            if self.debug:
+                logger.warning(f"Transform queue full, dropped span '{span.name}'")
+
+    def _worker_loop(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is _SHUTDOWN:
+                    return
+                self._process_span(*item)
+            finally:
+                self._queue.task_done()
+
+    def _process_span(self, span: Span, span_info: Dict[str, Any]):
+        """Transform the span attributes in place and forward the span downstream."""
+        if hasattr(span, '_attributes') and span._attributes:
+            self._transform_span(span, span_info)
+
+        if self.downstream_processor is not None:
+            try:
+                self.downstream_processor.on_end(span)
+            except Exception as e:
+                logger.error(f"Downstream processor failed for span '{span.name}': {e}", exc_info=True)
+
+    def _transform_span(self, span: Span, span_info: Dict[str, Any]):
         original_attrs = dict(span._attributes)
-        span_id = span.get_span_context().span_id
-        
-        if span_id in self.span_hierarchy:
-            self.span_hierarchy[span_id]['attributes'] = original_attrs
         
         try:
             if "event_loop.cycle_id" in original_attrs:
                 self.current_cycle_id = original_attrs.get("event_loop.cycle_id")
             
-            transformed_attrs = self._transform_attributes(original_attrs, span)
-            span._attributes.clear()
-            span._attributes.update(transformed_attrs)
-            self.processed_spans.add(span_id)
+            transformed_attrs = self._transform_attributes(original_attrs, span, span_info)
+            # Ended spans hold immutable attributes on recent SDKs, so swap the mapping
+            # instead of mutating it. Later processors receive this same span object.
+            span._attributes = transformed_attrs
+            with self._stats_lock:
+                self.spans_processed += 1
             
             if self.debug:
                 logger.info(f"Transformed span '{span.name}': {len(original_attrs)} -> {len(transformed_attrs)} attributes")
                 
         except Exception as e:
             logger.error(f"Failed to transform span '{span.name}': {e}", exc_info=True)
-            span._attributes.clear()
-            span._attributes.update(original_attrs)
+            with self._stats_lock:
+                self.spans_failed += 1
 
-    def _transform_attributes(self, attrs: Dict[str, Any], span: Span) -> Dict[str, Any]:
+    def get_stats(self) -> Dict[str, int]:
+        """Return pipeline counters for monitoring the processor itself."""
+        with self._stats_lock:
+            stats = {
+                "spans_processed": self.spans_processed,
+                "spans_dropped": self.spans_dropped,
+                "spans_failed": self.spans_failed,
+            }
+        stats["queue_depth"] = self._queue.qsize() if self._queue is not None else 0
+        stats["tracked_spans"] = len(self.span_hierarchy)
+        stats["tracked_traces"] = len(self._trace_spans)
+        return stats
+
+    def _transform_attributes(self, attrs: Dict[str, Any], span: Span, span_info: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Transform Strands attributes to OpenInference format.
+
+        Intermediate structures (parsed messages, invocation parameters) are kept in
+        `payloads` while building the result, so each output attribute is encoded once.
         """
         result = {}
+        payloads = {}
         span_kind = self._determine_span_kind(span, attrs)
         result["openinference.span.kind"] = span_kind
-        self._set_graph_node_attributes(span, attrs, result)
+        self._set_graph_node_attributes(span, attrs, result, span_info or {})
         prompt = attrs.get("gen_ai.prompt")
         completion = attrs.get("gen_ai.completion")
         model_id = attrs.get("gen_ai.request.model")
@@ -112,18 +273,18 @@ class StrandsToOpenInferenceProcessor(SpanProcessor):
             elif isinstance(tags, str):
                 result[f"tag.{tags}"] = str(tags)
         
+        # Token usage first, the LLM output.value structure reports it
+        self._map_token_usage(attrs, result)
+
         # Handle different span types
         if span_kind == "LLM":
-            self._handle_chain_and_llm_span(attrs, result, prompt, completion)
+            self._handle_chain_and_llm_span(attrs, result, payloads, prompt, completion)
         elif span_kind == "TOOL":
-            self._handle_tool_span(attrs, result)
+            self._handle_tool_span(attrs, result, payloads)
         elif span_kind == "AGENT":
-            self._handle_agent_span(attrs, result, prompt)
+            self._handle_agent_span(attrs, result, payloads, prompt)
         elif span_kind == "CHAIN":
-            self._handle_chain_and_llm_span(attrs, result, prompt, completion)
-        
-        # Handle token usage
-        self._map_token_usage(attrs, result)
+            self._handle_chain_and_llm_span(attrs, result, payloads, prompt, completion)
         
         important_attrs = [
             "session.id", "user.id", "llm.prompt_template.template",
@@ -135,7 +296,8 @@ class StrandsToOpenInferenceProcessor(SpanProcessor):
             if key in attrs:
                 result[key] = attrs[key]
         
-        self._add_metadata(attrs, result)    
+        self._add_metadata(attrs, result)
+        self._limit_payloads(span, result)
         return result
     
     def _determine_span_kind(self, span: Span, attrs: Dict[str, Any]) -> str:
@@ -152,7 +314,7 @@ class StrandsToOpenInferenceProcessor(SpanProcessor):
             return "CHAIN"
         return "CHAIN"
     
-    def _set_graph_node_attributes(self, span: Span, attrs: Dict[str, Any], result: Dict[str, Any]):
+    def _set_graph_node_attributes(self, span: Span, attrs: Dict[str, Any], result: Dict[str, Any], span_info: Dict[str, Any]):
         """
         Set graph node attributes for Arize visualization.
         Hierarchy: Agent -> Cycles -> (LLMs and/or Tools)
@@ -161,11 +323,9 @@ class StrandsToOpenInferenceProcessor(SpanProcessor):
         span_kind = result["openinference.span.kind"]        
         span_id = span.get_span_context().span_id
         
-        # Get parent information from span hierarchy
-        span_info = self.span_hierarchy.get(span_id, {})
+        # Parent information captured from the span hierarchy when the span started
         parent_id = span_info.get('parent_id')
-        parent_info = self.span_hierarchy.get(parent_id, {}) if parent_id else {}
-        parent_name = parent_info.get('name', '')
+        parent_name = span_info.get('parent_name', '')
         
         if span_kind == "AGENT":
             result["graph.node.id"] = "strands_agent"
@@ -199,25 +359,24 @@ class StrandsToOpenInferenceProcessor(SpanProcessor):
             logger.info(f"span_id: {span_id}")
             logger.info(f"span_info: {span_info}")
             logger.info(f"parent_id: {parent_id}")
-            logger.info(f"parent_info: {parent_info}")
             logger.info(f"parent_name: {parent_name}")
             logger.info("==========================")
             logger.info(f"Span: {span_name} || (ID: {span_id})")
             logger.info(f"  Parent: {parent_name} || (ID: {parent_id})")
             logger.info(f"  Graph Node: {result.get('graph.node.id')} -> Parent: {result.get('graph.node.parent_id')}")
 
-    def _handle_chain_and_llm_span(self, attrs: Dict[str, Any], result: Dict[str, Any], prompt: Any, completion: Any):
+    def _handle_chain_and_llm_span(self, attrs: Dict[str, Any], result: Dict[str, Any], payloads: Dict[str, Any], prompt: Any, completion: Any):
         """Handle LLM-specific attributes."""
         if prompt:
-            self._map_messages(prompt, result, is_input=True)
+            self._map_messages(prompt, result, payloads, is_input=True)
         
         if completion:
-            self._map_messages(completion, result, is_input=False)
+            self._map_messages(completion, result, payloads, is_input=False)
         
-        self._add_input_output_values(attrs, result)
-        self._map_invocation_parameters(attrs, result)
+        self._map_invocation_parameters(attrs, result, payloads)
+        self._add_input_output_values(attrs, result, payloads)
     
-    def _handle_tool_span(self, attrs: Dict[str, Any], result: Dict[str, Any]):
+    def _handle_tool_span(self, attrs: Dict[str, Any], result: Dict[str, Any], payloads: Dict[str, Any]):
         """Handle tool-specific attributes."""
         if tool_name := attrs.get("tool.name"):
             result["tool.name"] = tool_name
@@ -232,46 +391,50 @@ class StrandsToOpenInferenceProcessor(SpanProcessor):
             result["tool.description"] = tool_description
         
         if tool_params := attrs.get("tool.parameters"):
-            result["tool.parameters"] = self._serialize_value(tool_params)
+            serialized_params = self._serialize_value(tool_params)
+            payloads["tool.parameters"] = serialized_params
+            result["tool.parameters"] = serialized_params
             tool_call = {
                 "tool_call.id": attrs.get("tool.id", ""),
                 "tool_call.function.name": attrs.get("tool.name", ""),
-                "tool_call.function.arguments": self._serialize_value(tool_params)
+                "tool_call.function.arguments": serialized_params
             }
             
             input_message = {
                 "message.role": "assistant",
                 "message.tool_calls": [tool_call]
             }
-            result["llm.input_messages"] = json.dumps([input_message], separators=(",", ":"))
+            result["llm.input_messages"] = json.dumps([input_message], separators=_COMPACT)
             result["llm.input_messages.0.message.role"] = "assistant"
             result["tool_call.id"] = attrs.get("tool.id", "")
             result["tool_call.function.name"] = attrs.get("tool.name", "")
-            result["tool_call.function.arguments"] = self._serialize_value(tool_params)
+            result["tool_call.function.arguments"] = serialized_params
         
             for key, value in tool_call.items():
                 result[f"llm.input_messages.0.message.tool_calls.0.{key}"] = value
         
         # Map tool result
         if tool_result := attrs.get("tool.result"):
-            result["tool.result"] = self._serialize_value(tool_result)
-            tool_result_content = tool_result
+            serialized_result = self._serialize_value(tool_result)
+            payloads["tool.result"] = serialized_result
+            result["tool.result"] = serialized_result
+            serialized_content = serialized_result
             if isinstance(tool_result, dict):
-                tool_result_content = tool_result.get("content", tool_result)
+                serialized_content = self._serialize_value(tool_result.get("content", tool_result))
                 if "error" in tool_result:
                     result["tool.error"] = self._serialize_value(tool_result.get("error"))
 
             output_message = {
                 "message.role": "tool",
-                "message.content": self._serialize_value(tool_result_content),
+                "message.content": serialized_content,
                 "message.tool_call_id": attrs.get("tool.id", "")
             }
 
             if tool_name := attrs.get("tool.name"):
                 output_message["message.name"] = tool_name
-            result["llm.output_messages"] = json.dumps([output_message], separators=(",", ":"))
+            result["llm.output_messages"] = json.dumps([output_message], separators=_COMPACT)
             result["llm.output_messages.0.message.role"] = "tool"
-            result["llm.output_messages.0.message.content"] = self._serialize_value(tool_result_content)
+            result["llm.output_messages.0.message.content"] = serialized_content
             result["llm.output_messages.0.message.tool_call_id"] = attrs.get("tool.id", "")
             
             if tool_name:
@@ -289,9 +452,9 @@ class StrandsToOpenInferenceProcessor(SpanProcessor):
                 tool_metadata[key] = self._serialize_value(value)
         
         if tool_metadata:
-            result["tool.metadata"] = json.dumps(tool_metadata, separators=(",", ":"))
+            result["tool.metadata"] = json.dumps(tool_metadata, separators=_COMPACT)
     
-    def _handle_agent_span(self, attrs: Dict[str, Any], result: Dict[str, Any], prompt: Any):
+    def _handle_agent_span(self, attrs: Dict[str, Any], result: Dict[str, Any], payloads: Dict[str, Any], prompt: Any):
         """Handle agent-specific attributes."""
         result["llm.system"] = "strands-agents"
         result["llm.provider"] = "strands-agents"
@@ -304,16 +467,35 @@ class StrandsToOpenInferenceProcessor(SpanProcessor):
                 "message.role": "user",
                 "message.content": str(prompt)
             }
-            result["llm.input_messages"] = json.dumps([input_message], separators=(",", ":"))
+            result["llm.input_messages"] = json.dumps([input_message], separators=_COMPACT)
             result["input.value"] = str(prompt)
             result["llm.input_messages.0.message.role"] = "user"
             result["llm.input_messages.0.message.content"] = str(prompt)
-        self._add_input_output_values(attrs, result)  
+        self._add_input_output_values(attrs, result, payloads)
     
-    def _map_messages(self, messages_data: Any, result: Dict[str, Any], is_input: bool):
+    def _map_messages(self, messages_data: Any, result: Dict[str, Any], payloads: Dict[str, Any], is_input: bool):
         """Map Strands messages to OpenInference message format."""
         key_prefix = "llm.input_messages" if is_input else "llm.output_messages"
-        
+
+        cache_key = (key_prefix, messages_data) if isinstance(messages_data, str) else None
+        mapped = self._get_cached_messages(cache_key)
+        if mapped is None:
+            mapped = self._encode_messages(messages_data, key_prefix, is_input)
+            self._put_cached_messages(cache_key, mapped)
+
+        messages_list, messages_json, dotted_attrs = mapped
+        payloads[key_prefix] = messages_list
+        payloads[key_prefix + ".json"] = messages_json
+        result[key_prefix] = messages_json
+        result.update(dotted_attrs)
+
+    def _encode_messages(self, messages_data: Any, key_prefix: str, is_input: bool):
+        """
+        Parse and normalize messages, then encode them in one pass.
+
+        Each message field is encoded once; the encoded piece is used both for its
+        dotted attribute and, spliced, for the full message list JSON.
+        """
         if isinstance(messages_data, str):
             try:
                 messages_data = json.loads(messages_data)
@@ -321,15 +503,13 @@ class StrandsToOpenInferenceProcessor(SpanProcessor):
                 messages_data = [{"role": "user" if is_input else "assistant", "content": messages_data}]
         
         messages_list = self._normalize_messages(messages_data)
-        result[key_prefix] = json.dumps(messages_list, separators=(",", ":"))
+        dotted_attrs = {}
+        encoded_messages = []
 
         for idx, msg in enumerate(messages_list):
-            if not isinstance(msg, dict):
-                continue
-                
+            members = []
             for sub_key, sub_val in msg.items():
                 clean_key = sub_key.replace("message.", "") if sub_key.startswith("message.") else sub_key
-                dotted_key = f"{key_prefix}.{idx}.message.{clean_key}"
                 
                 if clean_key == "tool_calls" and isinstance(sub_val, list):
                     # Handle tool calls with proper structure
@@ -337,9 +517,33 @@ class StrandsToOpenInferenceProcessor(SpanProcessor):
                         if isinstance(tool_call, dict):
                             for tool_key, tool_val in tool_call.items():
                                 tool_dotted_key = f"{key_prefix}.{idx}.message.tool_calls.{tool_idx}.{tool_key}"
-                                result[tool_dotted_key] = self._serialize_value(tool_val)
+                                dotted_attrs[tool_dotted_key] = self._serialize_value(tool_val)
+                    members.append(_json_member(sub_key, json.dumps(sub_val, separators=_COMPACT)))
                 else:
-                    result[dotted_key] = self._serialize_value(sub_val)
+                    attr_value, encoded = self._encode_value(sub_val)
+                    dotted_attrs[f"{key_prefix}.{idx}.message.{clean_key}"] = attr_value
+                    members.append(_json_member(sub_key, encoded))
+            encoded_messages.append("{" + ",".join(members) + "}")
+
+        messages_json = "[" + ",".join(encoded_messages) + "]"
+        return messages_list, messages_json, dotted_attrs
+
+    def _get_cached_messages(self, cache_key):
+        if cache_key is None or self.message_cache_size <= 0:
+            return None
+        with self._message_cache_lock:
+            mapped = self._message_cache.get(cache_key)
+            if mapped is not None:
+                self._message_cache.move_to_end(cache_key)
+            return mapped
+
+    def _put_cached_messages(self, cache_key, mapped):
+        if cache_key is None or self.message_cache_size <= 0:
+            return
+        with self._message_cache_lock:
+            self._message_cache[cache_key] = mapped
+            while len(self._message_cache) > self.message_cache_size:
+                self._message_cache.popitem(last=False)
     
     def _normalize_messages(self, data: Any) -> List[Dict[str, Any]]:
         """Normalize messages data to a consistent list format."""
@@ -421,7 +625,7 @@ class StrandsToOpenInferenceProcessor(SpanProcessor):
             if value := attrs.get(strands_key):
                 result[openinf_key] = value
     
-    def _map_invocation_parameters(self, attrs: Dict[str, Any], result: Dict[str, Any]):
+    def _map_invocation_parameters(self, attrs: Dict[str, Any], result: Dict[str, Any], payloads: Dict[str, Any]):
         """Map invocation parameters."""
         params = {}
         
@@ -435,71 +639,57 @@ class StrandsToOpenInferenceProcessor(SpanProcessor):
             if key in attrs:
                 params[param_key] = attrs[key]
         
+        payloads["llm.invocation_parameters"] = params
         if params:
-            result["llm.invocation_parameters"] = json.dumps(params, separators=(",", ":"))
+            result["llm.invocation_parameters"] = json.dumps(params, separators=_COMPACT)
     
-    def _add_input_output_values(self, attrs: Dict[str, Any], result: Dict[str, Any]):
+    def _add_input_output_values(self, attrs: Dict[str, Any], result: Dict[str, Any], payloads: Dict[str, Any]):
         """Add input.value and output.value for Arize compatibility."""
         span_kind = result.get("openinference.span.kind")
         model_name = result.get("llm.model_name") or attrs.get("gen_ai.request.model") or "unknown"
-        invocation_params = {}
-        if "llm.invocation_parameters" in result:
-            try:
-                invocation_params = json.loads(result["llm.invocation_parameters"])
-            except:
-                pass
+        invocation_params = payloads.get("llm.invocation_parameters", {})
         
         if span_kind == "LLM":
-            if "llm.input_messages" in result:
-                try:
-                    input_messages = json.loads(result["llm.input_messages"])
-                    if input_messages:
-                        input_structure = {
-                            "messages": input_messages,
-                            "model": model_name
+            if payloads.get("llm.input_messages"):
+                # Splice the already encoded message list instead of decoding and re-encoding it
+                members = [
+                    _json_member("messages", payloads["llm.input_messages.json"]),
+                    _json_member("model", json.dumps(model_name))
+                ]
+                if max_tokens := invocation_params.get("max_tokens"):
+                    members.append(_json_member("max_tokens", json.dumps(max_tokens)))
+                result["input.value"] = "{" + ",".join(members) + "}"
+                result["input.mime_type"] = "application/json"
+
+            if output_messages := payloads.get("llm.output_messages"):
+                first_msg = output_messages[0]
+                content = first_msg.get("message.content", "")
+                role = first_msg.get("message.role", "assistant")
+                finish_reason = first_msg.get("message.finish_reason", "stop")
+                output_structure = {
+                    "id": attrs.get("gen_ai.response.id"),
+                    "choices": [{
+                        "finish_reason": finish_reason,
+                        "index": 0,
+                        "logprobs": None,
+                        "message": {
+                            "content": content,
+                            "role": role,
+                            "refusal": None,
+                            "annotations": []
                         }
-                        if max_tokens := invocation_params.get("max_tokens"):
-                            input_structure["max_tokens"] = max_tokens
-                        
-                        result["input.value"] = json.dumps(input_structure, separators=(",", ":"))
-                        result["input.mime_type"] = "application/json"
-                except:
-                    if prompt_content := result.get("llm.input_messages.0.message.content"):
-                        result["input.value"] = prompt_content
-                        result["input.mime_type"] = "application/json"
-
-            if "llm.output_messages" in result:
+                    }],
+                    "model": model_name,
+                    "usage": {
+                        "completion_tokens": result.get("llm.token_count.completion"),
+                        "prompt_tokens": result.get("llm.token_count.prompt"),
+                        "total_tokens": result.get("llm.token_count.total")
+                    }
+                }
                 try:
-                    output_messages = json.loads(result["llm.output_messages"])
-                    if output_messages and len(output_messages) > 0:
-                        first_msg = output_messages[0]
-                        content = first_msg.get("message.content", "")
-                        role = first_msg.get("message.role", "assistant")
-                        finish_reason = first_msg.get("message.finish_reason", "stop")
-                        output_structure = {
-                            "id": attrs.get("gen_ai.response.id"),
-                            "choices": [{
-                                "finish_reason": finish_reason,
-                                "index": 0,
-                                "logprobs": None,
-                                "message": {
-                                    "content": content,
-                                    "role": role,
-                                    "refusal": None,
-                                    "annotations": []
-                                }
-                            }],
-                            "model": model_name,
-                            "usage": {
-                                "completion_tokens": result.get("llm.token_count.completion"),
-                                "prompt_tokens": result.get("llm.token_count.prompt"),
-                                "total_tokens": result.get("llm.token_count.total")
-                            }
-                        }
-                        
-                        result["output.value"] = json.dumps(output_structure, separators=(",", ":"))
-                        result["output.mime_type"] = "application/json"
-                except:
+                    result["output.value"] = json.dumps(output_structure, separators=_COMPACT)
+                    result["output.mime_type"] = "application/json"
+                except (TypeError, ValueError):
                     if completion_content := result.get("llm.output_messages.0.message.content"):
                         result["output.value"] = completion_content
                         result["output.mime_type"] = "application/json"
@@ -514,18 +704,12 @@ class StrandsToOpenInferenceProcessor(SpanProcessor):
                 result["output.mime_type"] = "text/plain"
                 
         elif span_kind == "TOOL":
-            if tool_params := attrs.get("tool.parameters"):
-                if isinstance(tool_params, str):
-                    result["input.value"] = tool_params
-                else:
-                    result["input.value"] = json.dumps(tool_params, separators=(",", ":"))
+            if "tool.parameters" in payloads:
+                result["input.value"] = str(payloads["tool.parameters"])
                 result["input.mime_type"] = "application/json"
             
-            if tool_result := attrs.get("tool.result"):
-                if isinstance(tool_result, str):
-                    result["output.value"] = tool_result
-                else:
-                    result["output.value"] = json.dumps(tool_result, separators=(",", ":"))
+            if "tool.result" in payloads:
+                result["output.value"] = str(payloads["tool.result"])
                 result["output.mime_type"] = "application/json"
                 
         elif span_kind == "CHAIN":
@@ -533,14 +717,14 @@ class StrandsToOpenInferenceProcessor(SpanProcessor):
                 if isinstance(prompt, str):
                     result["input.value"] = prompt
                 else:
-                    result["input.value"] = json.dumps(prompt, separators=(",", ":"))
+                    result["input.value"] = json.dumps(prompt, separators=_COMPACT)
                 result["input.mime_type"] = "text/plain" if isinstance(prompt, str) else "application/json"
             
             if completion := attrs.get("gen_ai.completion"):
                 if isinstance(completion, str):
                     result["output.value"] = completion  
                 else:
-                    result["output.value"] = json.dumps(completion, separators=(",", ":"))
+                    result["output.value"] = json.dumps(completion, separators=_COMPACT)
                 result["output.mime_type"] = "text/plain" if isinstance(completion, str) else "application/json"
     
     def _add_metadata(self, attrs: Dict[str, Any], result: Dict[str, Any]):
@@ -550,25 +734,80 @@ class StrandsToOpenInferenceProcessor(SpanProcessor):
         
         for key, value in attrs.items():
             if key not in skip_keys and key not in result:
-                metadata[key] = self._serialize_value(value)
+                metadata[key] = value
         
         if metadata:
-            result["metadata"] = json.dumps(metadata, separators=(",", ":"))
-    
+            # Encoded once as a whole; values that aren't JSON types fall back to str
+            result["metadata"] = json.dumps(metadata, separators=_COMPACT, default=str)
+
+    def _limit_payloads(self, span: Span, result: Dict[str, Any]):
+        """Truncate large payload attributes, and cut payloads of unsampled traces to a preview."""
+        limit = self.max_payload_chars
+        if self.payload_sample_rate < 1.0:
+            trace_id = span.get_span_context().trace_id
+            # Sampling by trace id keeps the decision consistent for all spans of a trace
+            if (trace_id % 10000) >= self.payload_sample_rate * 10000:
+                limit = min(limit, _UNSAMPLED_PAYLOAD_CHARS) if limit else _UNSAMPLED_PAYLOAD_CHARS
+        if not limit:
+            return
+
+        for key, value in list(result.items()):
+            if not isinstance(value, str) or len(value) <= limit:
+                continue
+            if key in _PAYLOAD_KEYS or ".message.content" in key:
+                result[key] = f"{value[:limit]}... [truncated {len(value) - limit} chars]"
+                if key in ("input.value", "output.value"):
+                    result[key.replace(".value", ".mime_type")] = "text/plain"
+
     def _serialize_value(self, value: Any) -> Any:
         """Ensure a value is serializable."""
         if isinstance(value, (str, int, float, bool)) or value is None:
             return value
         
         try:
-            return json.dumps(value, separators=(",", ":"))
+            return json.dumps(value, separators=_COMPACT)
         except (TypeError, OverflowError):
             return str(value)
 
+    def _encode_value(self, value: Any):
+        """Return (attribute value, JSON encoding) for a value, encoding it only once."""
+        if isinstance(value, (str, int, float, bool)) or value is None:
+            return value, json.dumps(value)
+        try:
+            encoded = json.dumps(value, separators=_COMPACT)
+        except (TypeError, OverflowError):
+            value = str(value)
+            return value, json.dumps(value)
+        return encoded, encoded
+
+    def _drain_queue(self, timeout_seconds: Optional[float]) -> bool:
+        """Wait for queued spans to be processed, up to the timeout."""
+        if self._queue is None:
+            return True
+        deadline = None if timeout_seconds is None else time.monotonic() + timeout_seconds
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
     def shutdown(self):
         """Called when the processor is shutdown."""
-        pass
+        if self._worker is not None:
+            self._drain_queue(timeout_seconds=30)
+            self._queue.put(_SHUTDOWN)
+            self._worker.join(timeout=5)
+            self._worker = None
+        if self.downstream_processor is not None:
+            self.downstream_processor.shutdown()
 
     def force_flush(self, timeout_millis=None):
         """Called to force flush."""
-        return True
\ No newline at end of file
+        timeout_seconds = timeout_millis / 1000 if timeout_millis is not None else None
+        flushed = self._drain_queue(timeout_seconds)
+        if self.downstream_processor is not None:
+            if timeout_millis is not None:
+                flushed = self.downstream_processor.force_flush(timeout_millis) and flushed
+            else:
+                flushed = self.downstream_processor.force_flush() and flushed
+        return flushed
@@ -1,7 +1,10 @@
 #!/usr/bin/env python3
 import argparse
 import os
-from strands import Agent
+import re
+import time
+import uuid
+from strands import Agent, tool
 from strands.tools.mcp import MCPClient
 from strands_tools import file_read, file_write
 from mcp import StdioServerParameters, stdio_client
@@ -33,20 +36,8 @@ def get_environment_variables():
     }
 
 
-def main():
-    # Set up argument parser
-    parser = argparse.ArgumentParser(description="DSQL client using strands Agent")
-    parser.add_argument("prompt", help="Prompt to send to the agent")
-    parser.add_argument(
-        "--ro", action="store_true", help="Run in read-only mode (no writes allowed)"
-    )
-
-    # Parse arguments
-    args = parser.parse_args()
-
-    # Get environment variables with defaults and error handling
-    env_vars = get_environment_variables()
-    
+def create_dsql_client(env_vars, read_only: bool) -> MCPClient:
+    """Create the DSQL MCP client, the server starts when the client is entered."""
     mcp_args = [
         "awslabs.aurora-dsql-mcp-server@latest",
         "--cluster_endpoint",
@@ -59,11 +50,11 @@ def main():
     ]
 
     # Add --allow-writes flag if not in read-only mode
-    if not args.ro:
+    if not read_only:
         mcp_args.append("--allow-writes")
 
     # Create the DSQL MCP client with NPX, the cluster name, and the AWS region
-    dsql_client = MCPClient(
+    return MCPClient(
             lambda: stdio_client(
                 StdioServerParameters(
                     command="uvx", args=mcp_args
@@ -71,16 +62,185 @@ def main():
             )
         )
 
-    # Execute the prompt
-    with dsql_client:
-        tools = dsql_client.list_tools_sync()
-        tools.extend([file_read, file_write])
-        agent = Agent(tools=tools)
+
+# Statements that change table definitions and invalidate cached schemas
+DDL_PATTERN = re.compile(r"^\s*(CREATE|ALTER|DROP)\b", re.IGNORECASE)
+
+
+def _tool_text(result) -> str:
+    return "\n".join(item["text"] for item in result.get("content", []) if "text" in item)
+
+
+class SchemaCache:
+    """Table schemas fetched through the MCP server's get_schema tool, kept for ttl seconds."""
+
+    def __init__(self, dsql_client: MCPClient, ttl: float):
+        self.dsql_client = dsql_client
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._schemas = {}
+
+    def get(self, table_name: str, refresh: bool = False) -> str:
+        key = table_name.strip().lower()
+        cached = self._schemas.get(key)
+        if cached and not refresh and time.monotonic() - cached[0] < self.ttl:
+            self.hits += 1
+            return cached[1]
+
+        self.misses += 1
+        result = self.dsql_client.call_tool_sync(
+            f"get_schema-{uuid.uuid4()}", "get_schema", {"table_name": table_name}
+        )
+        text = _tool_text(result)
+        if result.get("status") != "success":
+            return f"Error getting schema of {table_name}: {text}"
+        self._schemas[key] = (time.monotonic(), text)
+        return text
+
+    def clear(self):
+        self._schemas = {}
+
+
+def create_agent(dsql_client: MCPClient, schema_cache: SchemaCache) -> Agent:
+    """
+    Build the agent with the MCP tools, get_schema going through the schema cache.
+
+    transact is wrapped too, so statements that change a table clear the cache.
+    """
+
+    @tool
+    def get_schema(table_name: str, refresh: bool = False) -> str:
+        """
+        Get the schema of the given table.
+
+        Schemas are cached, pass refresh=True after changing the table.
+
+        Args:
+            table_name: Name of the table, optionally prefixed with its schema
+            refresh: Fetch the schema again instead of using the cached one
+        """
+        return schema_cache.get(table_name, refresh=refresh)
+
+    @tool
+    def transact(sql_list: list[str], params_list: list | None = None) -> str:
+        """
+        Execute one or more SQL statements in a transaction.
+
+        Args:
+            sql_list: SQL statements to execute in one transaction
+            params_list: Optional list of parameter lists, one per statement, for %s placeholders
+        """
+        arguments = {"sql_list": sql_list}
+        if params_list is not None:
+            arguments["params_list"] = params_list
+        result = dsql_client.call_tool_sync(f"transact-{uuid.uuid4()}", "transact", arguments)
+        text = _tool_text(result)
+        if result.get("status") != "success":
+            return f"Error executing transaction: {text}"
+        if any(DDL_PATTERN.match(sql) for sql in sql_list):
+            schema_cache.clear()
+        return text
+
+    mcp_tools = dsql_client.list_tools_sync()
+    wrapped = [get_schema]
+    if any(t.tool_name == "transact" for t in mcp_tools):
+        wrapped.append(transact)
+    wrapped_names = {t.tool_name for t in wrapped}
+    tools = [t for t in mcp_tools if t.tool_name not in wrapped_names]
+    tools.extend(wrapped + [file_read, file_write])
+    return Agent(tools=tools)
+
+
+def run_prompt(agent: Agent, prompt: str) -> float:
+    """Run a prompt and return how long it took."""
+    start = time.perf_counter()
+    try:
+        response = agent(prompt)
+        print(response)
+    except Exception as e:
+        print(f"Error executing prompt: {e}")
+    return time.perf_counter() - start
+
+
+def repl(agent: Agent, schema_cache: SchemaCache, startup_seconds: float):
+    """Answer prompts with the same MCP server and agent until 'exit'."""
+    print("\nAurora DSQL agent ready. Type a prompt, 'reset' to clear the conversation,")
+    print("'stats' to show timings, or 'exit' to quit.")
+    query_times = []
+
+    while True:
         try:
-            response = agent(args.prompt)
-            print(response)
-        except Exception as e:
-            print(f"Error executing prompt: {e}")
+            prompt = input("\n> ").strip()
+        except (EOFError, KeyboardInterrupt):
+            break
+        if not prompt:
+            continue
+        if prompt.lower() == "exit":
+            break
+        if prompt.lower() == "reset":
+            agent.messages = []
+            schema_cache.clear()
+            print("Conversation and schema cache cleared.")
+            continue
+        if prompt.lower() == "stats":
+            print_stats(startup_seconds, query_times, schema_cache)
+            continue
+
+        query_times.append(run_prompt(agent, prompt))
+        print(f"\n[query {query_times[-1]:.1f}s, startup {startup_seconds:.1f}s paid once]")
+
+    print_stats(startup_seconds, query_times, schema_cache)
+
+
+def print_stats(startup_seconds: float, query_times: list, schema_cache: SchemaCache):
+    average = sum(query_times) / len(query_times) if query_times else 0.0
+    print(
+        f"Startup: {startup_seconds:.1f}s | Prompts: {len(query_times)}, "
+        f"average {average:.1f}s | Schema cache: {schema_cache.hits} hits, "
+        f"{schema_cache.misses} misses"
+    )
+
+
+def main():
+    # Set up argument parser
+    parser = argparse.ArgumentParser(description="DSQL client using strands Agent")
+    parser.add_argument(
+        "prompt",
+        nargs="?",
+        help="Prompt to send to the agent, starts an interactive session when omitted",
+    )
+    parser.add_argument(
+        "--ro", action="store_true", help="Run in read-only mode (no writes allowed)"
+    )
+    parser.add_argument(
+        "--repl",
+        action="store_true",
+        help="Keep the MCP server and agent running and read prompts interactively",
+    )
+
+    # Parse arguments
+    args = parser.parse_args()
+
+    # Get environment variables with defaults and error handling
+    env_vars = get_environment_variables()
+
+    start = time.perf_counter()
+    dsql_client = create_dsql_client(env_vars, args.ro)
+
+    with dsql_client:
+        schema_cache = SchemaCache(
+            dsql_client, float(os.getenv("DSQL_SCHEMA_CACHE_TTL_SECONDS", "600"))
+        )
+        agent = create_agent(dsql_client, schema_cache)
+        # MCP server start, tool listing and agent setup
+        startup_seconds = time.perf_counter() - start
+
+        if args.prompt:
+            query_seconds = run_prompt(agent, args.prompt)
+            print(f"\n[startup {startup_seconds:.1f}s, query {query_seconds:.1f}s]")
+        if args.repl or not args.prompt:
+            repl(agent, schema_cache, startup_seconds)
 
 
 if __name__ == "__main__":
@@ -4,8 +4,9 @@ from typing import Optional
 from dotenv import load_dotenv
 from strands import Agent, tool
 from strands.models import BedrockModel
-from tavily import TavilyClient
+from utils.formatter import ResearchFormatter
 from utils.prompts import RESEARCH_FORMATTER_PROMPT, SYSTEM_PROMPT
+from utils.tavily_cache import CachedTavily, create_tavily_client
 from utils.utils import (
     format_crawl_results_for_agent,
     format_extract_results_for_agent,
@@ -20,12 +21,20 @@ load_dotenv()
 # OR define it here
 # os.environ["TAVILY_API_KEY"] = "<YOUR_TAVILY_API_KEY>"
 
-if not os.getenv("TAVILY_API_KEY"):
-    raise ValueError(
-        "TAVILY_API_KEY environment variable is not set. Please add it to your .env file."
-    )
-
-tavily_client = TavilyClient(api_key=os.getenv("TAVILY_API_KEY"))
+# Set TAVILY_BACKEND=stub to run offline without an API key
+tavily_client = create_tavily_client()
+# Search results and extracted pages are reused across follow-up questions
+tavily_cache = CachedTavily(tavily_client)
+
+# Created once and reused by every format_research_response call
+research_formatter = ResearchFormatter(
+    model=BedrockModel(
+        model_id="anthropic.claude-3-5-haiku-20241022-v1:0",
+        region_name="us-east-1",
+    ),
+    system_prompt=RESEARCH_FORMATTER_PROMPT,
+    research_dir=RESEARCH_DIR,
+)
 
 
 @tool
@@ -50,9 +59,8 @@ def web_search(
     Returns:
         str: The formatted web search results
     """
-    client = TavilyClient(api_key=os.getenv("TAVILY_API_KEY"))
     formatted_results = format_search_results_for_agent(
-        client.search(
+        tavily_cache.search(
             query=query,  # The search query to execute with Tavily.
             max_results=max_results,
             time_range=time_range,
@@ -104,8 +112,8 @@ def web_extract(
 
             cleaned_urls.append(url)
 
-        # Call Tavily extract API
-        api_response = tavily_client.extract(
+        # Call Tavily extract API for the URLs not cached yet, in concurrent batches
+        api_response = tavily_cache.extract(
             urls=cleaned_urls,  # List of URLs to extract content from
             include_images=include_images,  # Whether to include image extraction
             extract_depth=extract_depth,  # Depth of extraction (basic or advanced)
@@ -127,6 +135,7 @@ def format_research_response(
 ) -> str:
     """Format research content into a well-structured, properly cited response.
     The response will clearly address the user's query and present the research results in markdown format.
+    The formatted report is streamed to the user and saved to a markdown file in the research directory.
 
     Args:
         research_content (str): The raw research content to be formatted
@@ -135,34 +144,10 @@ def format_research_response(
         user_query (Optional[str]): Original user question to help determine appropriate format
 
     Returns:
-        str: Professionally formatted research response with proper citations,
-             clear structure, and appropriate style for the intended audience
+        str: The path of the saved report and a short preview of it
     """
     try:
-        bedrock_model = BedrockModel(
-            model_id="anthropic.claude-3-5-haiku-20241022-v1:0",
-            region_name="us-east-1",
-        )
-        # Strands Agents SDK makes it easy to create a specialized agent
-        formatter_agent = Agent(
-            model=bedrock_model,
-            system_prompt=RESEARCH_FORMATTER_PROMPT,
-        )
-
-        # Prepare the input for the formatter
-        format_input = f"Research Content:\n{research_content}\n\n"
-
-        if format_style:
-            format_input += f"Requested Format Style: {format_style}\n\n"
-
-        if user_query:
-            format_input += f"Original User Query: {user_query}\n\n"
-
-        format_input += "Please format this research content according to the guidelines and appropriate style."
-
-        # Call the agent and return its response
-        response = formatter_agent(format_input)
-        return str(response)
+        return research_formatter.format(research_content, format_style, user_query)
     except Exception as e:
         return f"Error in research formatting: {str(e)}"
 
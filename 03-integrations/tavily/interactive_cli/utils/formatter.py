@@ -0,0 +1,97 @@
+import os
+import sys
+import threading
+from typing import Optional
+
+from strands import Agent
+from strands.handlers.callback_handler import null_callback_handler
+from utils.utils import generate_filename
+
+
+class ReportWriter:
+    """Callback handler that writes streamed report tokens to a file and echoes them to the terminal."""
+
+    def __init__(self, file, echo: bool = True):
+        self.file = file
+        self.echo = echo
+        self.chars = 0
+
+    def __call__(self, **kwargs):
+        data = kwargs.get("data")
+        if not data:
+            return
+        self.file.write(data)
+        self.file.flush()
+        self.chars += len(data)
+        if self.echo:
+            sys.stdout.write(data)
+            sys.stdout.flush()
+
+
+class ResearchFormatter:
+    """
+    Long-lived formatter agent that streams reports to the research directory.
+
+    The model and agent are created once and reused. Each report is written to
+    a markdown file as tokens arrive, and the caller gets back the file path and
+    a short preview instead of the full report, so the outer agent doesn't
+    re-ingest the whole text on every following turn.
+
+    Args:
+        model: Model used by the formatter agent
+        system_prompt: Formatter system prompt
+        research_dir: Directory the reports are written to
+        preview_chars: Characters of the report returned to the caller
+    """
+
+    def __init__(self, model, system_prompt: str, research_dir: str, preview_chars: int = 600):
+        self.research_dir = research_dir
+        self.preview_chars = preview_chars
+        self.agent = Agent(model=model, system_prompt=system_prompt, callback_handler=null_callback_handler)
+        # The agent keeps conversation state, so reports are formatted one at a time
+        self._lock = threading.Lock()
+
+    def format(
+        self,
+        research_content: str,
+        format_style: Optional[str] = None,
+        user_query: Optional[str] = None,
+        echo: bool = True,
+    ) -> str:
+        # Prepare the input for the formatter
+        format_input = f"Research Content:\n{research_content}\n\n"
+
+        if format_style:
+            format_input += f"Requested Format Style: {format_style}\n\n"
+
+        if user_query:
+            format_input += f"Original User Query: {user_query}\n\n"
+
+        format_input += "Please format this research content according to the guidelines and appropriate style."
+
+        os.makedirs(self.research_dir, exist_ok=True)
+        filename = generate_filename(self.research_dir, user_query or format_style or "research_report")
+
+        with self._lock:
+            # Every report starts from a clean conversation
+            self.agent.messages = []
+            with open(filename, "w", encoding="utf-8") as f:
+                writer = ReportWriter(f, echo=echo)
+                self.agent.callback_handler = writer
+                try:
+                    self.agent(format_input)
+                finally:
+                    self.agent.callback_handler = null_callback_handler
+            if echo:
+                print()
+
+        with open(filename, "r", encoding="utf-8") as f:
+            preview = f.read(self.preview_chars + 1)
+        if len(preview) > self.preview_chars:
+            preview = preview[: self.preview_chars].rsplit(" ", 1)[0] + " ..."
+
+        return (
+            f"The formatted report ({writer.chars} characters) was streamed to the user and saved to {filename}.\n"
+            f"Report preview:\n{preview}\n\n"
+            "Do not repeat the report. Tell the user where it was saved, and use read_file if you need its full text."
+        )
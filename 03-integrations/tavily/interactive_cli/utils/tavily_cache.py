@@ -0,0 +1,211 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+
+# Extracted page content rarely changes within a research session, search results do
+EXTRACT_CACHE_TTL_SECONDS = int(os.getenv("TAVILY_EXTRACT_CACHE_TTL_SECONDS", "86400"))
+SEARCH_CACHE_TTL_SECONDS = int(os.getenv("TAVILY_SEARCH_CACHE_TTL_SECONDS", "3600"))
+CACHE_PATH = os.getenv("TAVILY_CACHE_PATH", ".tavily_cache.sqlite")
+# URLs per extract call, and how many calls run at once
+EXTRACT_BATCH_SIZE = int(os.getenv("TAVILY_EXTRACT_BATCH_SIZE", "5"))
+EXTRACT_MAX_WORKERS = int(os.getenv("TAVILY_EXTRACT_MAX_WORKERS", "4"))
+
+
+class StubTavilyClient:
+    """
+    Offline stand-in for TavilyClient, selected with TAVILY_BACKEND=stub.
+
+    Returns deterministic results shaped like the Tavily API responses, so the
+    agent and the formatting helpers can be exercised without an API key.
+    """
+
+    def search(self, query: str, max_results: int = 5, **kwargs) -> Dict:
+        max_results = max_results or 5
+        return {
+            "query": query,
+            "results": [
+                {
+                    "title": f"Stub result {i} for {query}",
+                    "url": f"https://example.com/{i}?q={hashlib.md5(query.encode()).hexdigest()[:8]}",
+                    "content": f"Stub content {i} about {query}.",
+                    "score": 1 - i / 10,
+                }
+                for i in range(1, max_results + 1)
+            ],
+            "response_time": 0.0,
+        }
+
+    def extract(self, urls: List[str], include_images: bool = False, **kwargs) -> Dict:
+        return {
+            "results": [
+                {
+                    "url": url,
+                    "raw_content": f"Stub content extracted from {url}.",
+                    "images": [f"{url}/image.png"] if include_images else [],
+                }
+                for url in urls
+            ],
+            "failed_results": [],
+            "response_time": 0.0,
+        }
+
+    def crawl(self, url: str, limit: int = 20, **kwargs) -> Dict:
+        return {
+            "base_url": url,
+            "results": [
+                {"url": f"{url.rstrip('/')}/page-{i}", "raw_content": f"Stub page {i}\nCrawled from {url}."}
+                for i in range(1, min(limit, 3) + 1)
+            ],
+            "response_time": 0.0,
+        }
+
+
+def create_tavily_client():
+    """Return a TavilyClient, or the offline stub when TAVILY_BACKEND=stub."""
+    if os.getenv("TAVILY_BACKEND", "tavily").lower() == "stub":
+        return StubTavilyClient()
+
+    from tavily import TavilyClient
+
+    if not os.getenv("TAVILY_API_KEY"):
+        raise ValueError(
+            "TAVILY_API_KEY environment variable is not set. Please add it to your .env file."
+        )
+    return TavilyClient(api_key=os.getenv("TAVILY_API_KEY"))
+
+
+class CachedTavily:
+    """
+    Tavily search and extract with caching across the research loop.
+
+    Extracted content is kept in a SQLite file keyed by URL, extract depth and
+    whether images were requested, so follow-up questions don't re-extract the
+    same pages. Uncached URLs are split into batches extracted concurrently.
+    Search results are memoized in memory by query, time range, domains and
+    number of results.
+
+    Args:
+        client: TavilyClient or StubTavilyClient
+        cache_path: SQLite file for extracted content, ":memory:" to keep it in memory
+    """
+
+    def __init__(self, client, cache_path: str = CACHE_PATH):
+        self.client = client
+        self._lock = threading.Lock()
+        self._searches = {}
+        self._db = sqlite3.connect(cache_path, check_same_thread=False)
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS extracts (
+                url TEXT,
+                extract_depth TEXT,
+                include_images INTEGER,
+                result TEXT,
+                fetched_at REAL,
+                PRIMARY KEY (url, extract_depth, include_images)
+            )
+            """
+        )
+        self._db.commit()
+        self.stats = {"search_hits": 0, "search_calls": 0, "extract_hits": 0, "extract_calls": 0}
+
+    def search(
+        self,
+        query: str,
+        max_results: Optional[int] = 10,
+        time_range: Optional[str] = None,
+        include_domains: Optional[str | List[str]] = None,
+    ) -> Dict:
+        domains = include_domains
+        if isinstance(domains, list):
+            domains = tuple(sorted(domains))
+        key = (query, max_results, time_range, domains)
+
+        with self._lock:
+            cached = self._searches.get(key)
+            if cached and time.time() - cached[0] < SEARCH_CACHE_TTL_SECONDS:
+                self.stats["search_hits"] += 1
+                return cached[1]
+
+        result = self.client.search(
+            query=query,
+            max_results=max_results,
+            time_range=time_range,
+            include_domains=include_domains,
+        )
+        with self._lock:
+            self.stats["search_calls"] += 1
+            self._searches[key] = (time.time(), result)
+        return result
+
+    def extract(self, urls: List[str], include_images: bool = False, extract_depth: str = "basic") -> Dict:
+        start = time.perf_counter()
+        # Keep the first occurrence of each URL, in order
+        urls = list(dict.fromkeys(urls))
+        cached = self._get_cached(urls, extract_depth, include_images)
+        missing = [url for url in urls if url not in cached]
+
+        fetched, failed_results = {}, []
+        if missing:
+            batches = [missing[i:i + EXTRACT_BATCH_SIZE] for i in range(0, len(missing), EXTRACT_BATCH_SIZE)]
+            with ThreadPoolExecutor(max_workers=min(EXTRACT_MAX_WORKERS, len(batches))) as executor:
+                futures = [
+                    executor.submit(self._extract_batch, batch, include_images, extract_depth)
+                    for batch in batches
+                ]
+                for batch, future in zip(batches, futures):
+                    try:
+                        response = future.result()
+                    except Exception as e:
+                        failed_results.extend({"url": url, "error": str(e)} for url in batch)
+                        continue
+                    for result in response.get("results", []):
+                        fetched[result.get("url")] = result
+                    failed_results.extend(response.get("failed_results", []))
+            self._store(fetched, extract_depth, include_images)
+            with self._lock:
+                self.stats["extract_calls"] += len(batches)
+
+        with self._lock:
+            self.stats["extract_hits"] += len(cached)
+
+        # Results keep the order of the requested URLs. Tavily may report a
+        # redirected URL, so fetched results not matching a requested URL are appended.
+        results = [cached.get(url) or fetched.pop(url) for url in urls if url in cached or url in fetched]
+        results.extend(fetched.values())
+        return {
+            "results": results,
+            "failed_results": failed_results,
+            "response_time": round(time.perf_counter() - start, 2),
+        }
+
+    def _extract_batch(self, urls: List[str], include_images: bool, extract_depth: str) -> Dict:
+        return self.client.extract(urls=urls, include_images=include_images, extract_depth=extract_depth)
+
+    def _get_cached(self, urls: List[str], extract_depth: str, include_images: bool) -> Dict[str, Dict]:
+        if not urls:
+            return {}
+        placeholders = ", ".join("?" for _ in urls)
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT url, result FROM extracts WHERE extract_depth = ? AND include_images = ? "
+                f"AND fetched_at > ? AND url IN ({placeholders})",
+                [extract_depth, int(include_images), time.time() - EXTRACT_CACHE_TTL_SECONDS, *urls],
+            ).fetchall()
+        return {url: json.loads(result) for url, result in rows}
+
+    def _store(self, results: Dict[str, Dict], extract_depth: str, include_images: bool):
+        now = time.time()
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO extracts (url, extract_depth, include_images, result, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(url, extract_depth, int(include_images), json.dumps(result), now) for url, result in results.items()],
+            )
+            self._db.commit()
@@ -18,3 +18,11 @@ class Config:
 
     # Enable authentication
     ENABLE_AUTH = False
+
+    # Streaming UI (app_streaming.py): redraw the streamed answer at most every
+    # STREAM_RENDER_INTERVAL_MS or every STREAM_RENDER_CHARS new characters
+    STREAM_RENDER_INTERVAL_MS = 50
+    STREAM_RENDER_CHARS = 200
+
+    # Show the render time of each streamed response below the answer
+    SHOW_RENDER_STATS = False
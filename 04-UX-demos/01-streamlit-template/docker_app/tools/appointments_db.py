@@ -0,0 +1,112 @@
+import os
+import sqlite3
+import threading
+import uuid
+from datetime import datetime, timedelta
+
+# Shared by the appointment tools, the schema is migrated once per process instead of
+# every tool call probing sqlite_master or re-running CREATE TABLE
+DB_PATH = os.environ.get("APPOINTMENTS_DB", "appointments.db")
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+# Applied in order, PRAGMA user_version records the last one applied.
+# Statements use IF NOT EXISTS so databases created before the migrations still upgrade.
+MIGRATIONS = [
+    """
+    CREATE TABLE IF NOT EXISTS appointments (
+        id TEXT PRIMARY KEY,
+        date TEXT,
+        location TEXT,
+        title TEXT,
+        description TEXT
+    );
+    CREATE INDEX IF NOT EXISTS idx_appointments_date ON appointments (date);
+    """,
+]
+
+# Tools can run concurrently, each thread keeps its own connection
+_local = threading.local()
+_migrate_lock = threading.Lock()
+_migrated = False
+
+
+def _migrate(conn):
+    global _migrated
+    with _migrate_lock:
+        if _migrated:
+            return
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        for number, migration in enumerate(MIGRATIONS[version:], version + 1):
+            conn.executescript(migration)
+            conn.execute(f"PRAGMA user_version = {number}")
+        conn.commit()
+        _migrated = True
+
+
+def get_connection():
+    """Return this thread's connection, opening it in WAL mode on first use."""
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(DB_PATH, timeout=10)
+        conn.row_factory = sqlite3.Row
+        # WAL lets readers run while another connection writes
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        _migrate(conn)
+        _local.conn = conn
+    return conn
+
+
+def create_appointment(date, location, title, description):
+    appointment_id = str(uuid.uuid4())
+    conn = get_connection()
+    with conn:
+        conn.execute(
+            "INSERT INTO appointments (id, date, location, title, description) VALUES (?, ?, ?, ?, ?)",
+            (appointment_id, date, location, title, description),
+        )
+    return appointment_id
+
+
+def get_appointment(appointment_id):
+    return get_connection().execute(
+        "SELECT id, date, location, title, description FROM appointments WHERE id = ?",
+        (appointment_id,),
+    ).fetchone()
+
+
+def update_appointment(appointment_id, fields):
+    """Update the given columns of an appointment, fields maps column name to new value."""
+    columns = [column for column in fields if column in ("date", "location", "title", "description")]
+    if not columns:
+        return
+    conn = get_connection()
+    with conn:
+        conn.execute(
+            f"UPDATE appointments SET {', '.join(f'{column} = ?' for column in columns)} WHERE id = ?",
+            [fields[column] for column in columns] + [appointment_id],
+        )
+
+
+def list_appointments(page=1, page_size=DEFAULT_PAGE_SIZE):
+    """Return (rows, total) for one page of appointments ordered by date."""
+    page = max(page, 1)
+    page_size = min(max(page_size, 1), MAX_PAGE_SIZE)
+    conn = get_connection()
+    total = conn.execute("SELECT COUNT(*) FROM appointments").fetchone()[0]
+    rows = conn.execute(
+        "SELECT id, date, location, title, description FROM appointments ORDER BY date, id LIMIT ? OFFSET ?",
+        (page_size, (page - 1) * page_size),
+    ).fetchall()
+    return rows, total
+
+
+def get_appointments_for_day(day):
+    """Return the appointments of a YYYY-MM-DD day, as an indexed range on date."""
+    next_day = (datetime.strptime(day, "%Y-%m-%d") + timedelta(days=1)).strftime("%Y-%m-%d")
+    return get_connection().execute(
+        "SELECT id, date, location, title, description FROM appointments "
+        "WHERE date >= ? AND date < ? ORDER BY date",
+        (day, next_day),
+    ).fetchall()
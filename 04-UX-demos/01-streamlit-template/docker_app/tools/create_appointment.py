@@ -1,8 +1,7 @@
-import sqlite3
-import uuid
 from datetime import datetime
 
 from strands import tool
+from tools import appointments_db
 
 @tool
 def create_appointment(date: str, location: str, title: str, description: str) -> str:
@@ -27,30 +26,5 @@ def create_appointment(date: str, location: str, title: str, description: str) -
     except ValueError:
         raise ValueError("Date must be in format 'YYYY-MM-DD HH:MM'")
 
-    # Generate a unique ID
-    appointment_id = str(uuid.uuid4())
-
-    conn = sqlite3.connect("appointments.db")
-    cursor = conn.cursor()
-
-    # Create the appointments table if it doesn't exist
-    cursor.execute(
-        """
-    CREATE TABLE IF NOT EXISTS appointments (
-        id TEXT PRIMARY KEY,
-        date TEXT,
-        location TEXT,
-        title TEXT,
-        description TEXT
-    )
-    """
-    )
-
-    cursor.execute(
-        "INSERT INTO appointments (id, date, location, title, description) VALUES (?, ?, ?, ?, ?)",
-        (appointment_id, date, location, title, description),
-    )
-
-    conn.commit()
-    conn.close()
+    appointment_id = appointments_db.create_appointment(date, location, title, description)
     return f"Appointment with id {appointment_id} created"
@@ -1,51 +1,38 @@
 import sqlite3
-import os
 from strands import tool
+from tools import appointments_db
 
 @tool
-def list_appointments() -> str:
+def list_appointments(page: int = 1, page_size: int = appointments_db.DEFAULT_PAGE_SIZE) -> str:
     """
-    List all available appointments from the database.
+    List available appointments from the database, one page at a time, ordered by date.
+
+    Args:
+        page (int): Page number to return, starting at 1.
+        page_size (int): Number of appointments per page (maximum 100).
     
     Returns:
-        str: the appointments available 
+        str: the appointments in the requested page
     """
-    # Check if database exists
-    if not os.path.exists('appointments.db'):
-        return "No appointment available"
-    
-    conn = sqlite3.connect('appointments.db')
-    conn.row_factory = sqlite3.Row  # This enables column access by name
-    cursor = conn.cursor()
-    
-    # Check if the appointments table exists
+    page = max(page, 1)
+    page_size = min(max(page_size, 1), appointments_db.MAX_PAGE_SIZE)
     try:
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='appointments'")
-        if not cursor.fetchone():
-            conn.close()
+        rows, total = appointments_db.list_appointments(page, page_size)
+        if not total:
             return "No appointment available"
         
-        cursor.execute("SELECT * FROM appointments ORDER BY date")
-        rows = cursor.fetchall()
-        
         # Convert rows to dictionaries
-        appointments = []
-        for row in rows:
-            appointment = {
-                'id': row['id'],
-                'date': row['date'],
-                'location': row['location'],
-                'title': row['title'],
-                'description': row['description']
-            }
-            appointments.append(appointment)
-        
-        conn.close()
-        print(appointments)
-        return str(appointments)
+        appointments = [dict(row) for row in rows]
+        total_pages = (total + page_size - 1) // page_size
+        result = {
+            'appointments': appointments,
+            'page': page,
+            'total_pages': total_pages,
+            'total_appointments': total
+        }
+        if page < total_pages:
+            result['next_page'] = page + 1
+        return str(result)
     
-    except sqlite3.Error:
-        conn.close()
-        return []
-
-
+    except sqlite3.Error as e:
+        return f"Error retrieving appointments: {str(e)}"
@@ -1,8 +1,8 @@
 import sqlite3
 from datetime import datetime
-import os
 from strands.types.tools import ToolResult, ToolUse
 from typing import Any
+from tools import appointments_db
 
 TOOL_SPEC = {
     "name": "update_appointment",
@@ -57,34 +57,10 @@ def update_appointment(tool: ToolUse, **kwargs: Any) -> ToolResult:
     else:
         description = None
         
-    # Check if database exists
-    if not os.path.exists('appointments.db'): 
-        return {
-            "toolUseId": tool_use_id,
-            "status": "error",
-            "content": [{"text": f"Appointment {appointment_id} does not exist"}]
-        } 
-    
-    # Check if appointment exists
-    conn = sqlite3.connect('appointments.db')
-    cursor = conn.cursor()
-    
-    # Check if the appointments table exists
     try:
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='appointments'")
-        if not cursor.fetchone():
-            conn.close()
-            return {
-                "toolUseId": tool_use_id,
-                "status": "error",
-                "content": [{"text": f"Appointments table does not exist"}]
-            }
-        
-        cursor.execute("SELECT * FROM appointments WHERE id = ?", (appointment_id,))
-        appointment = cursor.fetchone()
+        appointment = appointments_db.get_appointment(appointment_id)
         
         if not appointment:
-            conn.close()
             return {
                 "toolUseId": tool_use_id,
                 "status": "error",
@@ -96,49 +72,36 @@ def update_appointment(tool: ToolUse, **kwargs: Any) -> ToolResult:
             try:
                 datetime.strptime(date, '%Y-%m-%d %H:%M')
             except ValueError:
-                conn.close()
                 return {
                     "toolUseId": tool_use_id,
                     "status": "error",
                     "content": [{"text": "Date must be in format 'YYYY-MM-DD HH:MM'"}]
                 }
         
-        # Build update query
-        update_fields = []
-        params = []
+        # Build update
+        update_fields = {}
         
         if date:
-            update_fields.append("date = ?")
-            params.append(date)
+            update_fields["date"] = date
         
         if location:
-            update_fields.append("location = ?")
-            params.append(location)
+            update_fields["location"] = location
         
         if title:
-            update_fields.append("title = ?")
-            params.append(title)
+            update_fields["title"] = title
         
         if description:
-            update_fields.append("description = ?")
-            params.append(description)
+            update_fields["description"] = description
         
         # If no fields to update
         if not update_fields:
-            conn.close()
             return {
                 "toolUseId": tool_use_id,
                 "status": "success",
                 "content": [{"text": "No need to update your appointment, you are all set!"}]
             }
         
-        # Complete the query
-        query = f"UPDATE appointments SET {', '.join(update_fields)} WHERE id = ?"
-        params.append(appointment_id)
-        
-        cursor.execute(query, params)
-        conn.commit()
-        conn.close()
+        appointments_db.update_appointment(appointment_id, update_fields)
         
         return {
             "toolUseId": tool_use_id,
@@ -147,7 +110,6 @@ def update_appointment(tool: ToolUse, **kwargs: Any) -> ToolResult:
         }
     
     except sqlite3.Error as e:
-        conn.close()
         return {
             "toolUseId": tool_use_id,
             "status": "error",
@@ -0,0 +1,82 @@
+import time
+
+
+class StreamRenderer:
+    """
+    Renders streamed agent output incrementally.
+
+    Each output segment (text, tool use, reasoning) gets its own placeholder.
+    Only the active segment is redrawn, and at most once per frame budget:
+    after min_interval seconds or min_chars new characters, whichever comes
+    first. Finished segments are never redrawn.
+    """
+
+    def __init__(self, container, min_interval=0.05, min_chars=200):
+        self.container = container
+        self.min_interval = min_interval
+        self.min_chars = min_chars
+        self.segments = []
+        self.chunks = 0
+        self.redraws = 0
+        self.render_seconds = 0.0
+        self.start_time = time.perf_counter()
+        self._last_draw_time = 0.0
+        self._pending_chars = 0
+
+    def add(self, output_type, content, append=True):
+        """Add streamed content, starting a new segment when the output type changes."""
+        self.chunks += 1
+        if not self.segments or self.segments[-1]["type"] != output_type:
+            # Draw the finished segment one last time before moving on
+            self.flush()
+            self.segments.append({
+                "type": output_type,
+                "content": content,
+                "placeholder": self.container.empty(),
+            })
+            self._draw()
+            return
+
+        segment = self.segments[-1]
+        if append:
+            segment["content"] += content
+        else:
+            segment["content"] = content
+
+        self._pending_chars += len(content)
+        if (time.perf_counter() - self._last_draw_time >= self.min_interval
+                or self._pending_chars >= self.min_chars):
+            self._draw()
+
+    def flush(self):
+        """Draw pending content of the active segment, call it once the response is complete."""
+        if self._pending_chars:
+            self._draw()
+
+    def _draw(self):
+        segment = self.segments[-1]
+        start = time.perf_counter()
+        if segment["type"] == "tool_use":
+            segment["placeholder"].code(segment["content"])
+        else:
+            segment["placeholder"].markdown(segment["content"])
+        end = time.perf_counter()
+
+        self.render_seconds += end - start
+        self.redraws += 1
+        self._last_draw_time = end
+        self._pending_chars = 0
+
+    def get_output(self):
+        """Return the segments as chat history items."""
+        return [{"type": segment["type"], "content": segment["content"]} for segment in self.segments]
+
+    def get_stats(self):
+        """Return render statistics for the current response."""
+        return {
+            "chunks": self.chunks,
+            "redraws": self.redraws,
+            "chars": sum(len(segment["content"]) for segment in self.segments),
+            "render_ms": round(self.render_seconds * 1000, 1),
+            "total_ms": round((time.perf_counter() - self.start_time) * 1000, 1),
+        }
@@ -21,9 +21,7 @@ import os
 import json
 from typing import Dict, Any
 import boto3
-import sys
 from botocore.exceptions import ClientError
-from io import StringIO
 import base64
 
 from strands import Agent, tool
@@ -32,6 +30,7 @@ from strands.models import BedrockModel
 
 from tools.util import get_current_time
 from tools.site_info import  get_site_info, get_timeseries_data
+from sandbox import CodeSandbox
 
 
 
@@ -48,6 +47,14 @@ api_client = boto3.client('apigatewaymanagementapi',
                         endpoint_url= WS_REPLY_API_ENDPOINT, 
                         region_name = REGION)
 
+#Pre-forked, resource limited workers for execute_code. Created at module scope so the
+#warm workers are reused across invocations of the same Lambda container
+code_sandbox = CodeSandbox({
+    'get_site_info': get_site_info,
+    'get_timeseries_data': get_timeseries_data,
+    'get_current_time': get_current_time
+})
+
 #Model id for the FM in Bedrock. Select a model that supports tools
 MODEL_ID = "us.anthropic.claude-3-5-haiku-20241022-v1:0"
 #System prompt for the agent. Explain here what you want the agent to be.
@@ -97,38 +104,19 @@ def execute_code(code: str) -> Dict[str, str]:
 
     Note:
         - The code is executed in a restricted environment with only specific functions available
+        - The code runs in a separate worker process with CPU time, memory and wall clock limits
         - All stdout is captured and returned rather than being printed directly
     """
-    
-    stdout_buffer = StringIO()
-    stderr_buffer = StringIO()
-    
-    # Save the originals
-    original_stdout = sys.stdout
-    original_stderr = sys.stderr
-    # Redirect stdout to our buffer
-    sys.stdout = stdout_buffer
-    sys.stderr = stderr_buffer
-
-    available_functions = {
-        'get_site_info': get_site_info,
-        'get_timeseries_data': get_timeseries_data,
-        'get_current_time': get_current_time
-    }
-
-    #execute the code snippet
-    exec(code, available_functions)
 
-    # Restore the original stdout
-    sys.stdout = original_stdout
-    sys.stderr = original_stderr
+    result = code_sandbox.run(code, env={
+        'ID_TOKEN': os.environ.get('ID_TOKEN', ''),
+        'TOOL_API_ENDPOINT': os.environ.get('TOOL_API_ENDPOINT', '')
+    })
+    print(f"execute_code status={result['status']} duration_ms={result['duration_ms']}")
 
-    # Get the captured output
-    output = stdout_buffer.getvalue()
-    err = stderr_buffer.getvalue()
     return {
-            "stdout" : output , 
-            "stderr" : err
+            "stdout" : result["stdout"] , 
+            "stderr" : result["stderr"]
             }
 
 
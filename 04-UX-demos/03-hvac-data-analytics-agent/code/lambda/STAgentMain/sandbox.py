@@ -0,0 +1,275 @@
+'''
+MIT No Attribution
+
+Copyright 2024 Amazon Web Services
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of this
+software and associated documentation files (the "Software"), to deal in the Software
+without restriction, including without limitation the rights to use, copy, modify,
+merge, publish, distribute, sublicense, and/or sell copies of the Software, and to
+permit persons to whom the Software is furnished to do so.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+'''
+
+import contextlib
+import importlib
+import io
+import multiprocessing
+import os
+import queue
+import resource
+import signal
+import time
+import traceback
+from typing import Any, Callable, Dict, Optional
+
+
+#Modules imported once in the parent so every forked worker starts warm
+PRELOAD_MODULES = ("numpy", "pandas")
+
+POOL_SIZE = int(os.environ.get("CODE_SANDBOX_WORKERS", "2"))
+CPU_TIME_LIMIT_SECONDS = int(os.environ.get("CODE_SANDBOX_CPU_SECONDS", "30"))
+MEMORY_LIMIT_MB = int(os.environ.get("CODE_SANDBOX_MEMORY_MB", "256"))
+WALL_TIMEOUT_SECONDS = float(os.environ.get("CODE_SANDBOX_TIMEOUT_SECONDS", "60"))
+MAX_OUTPUT_CHARS = int(os.environ.get("CODE_SANDBOX_MAX_OUTPUT_CHARS", "20000"))
+#Recycle workers periodically so state leaked by user code doesn't accumulate
+MAX_JOBS_PER_WORKER = int(os.environ.get("CODE_SANDBOX_MAX_JOBS_PER_WORKER", "50"))
+
+#How often the parent checks the worker RSS while waiting for a result
+_WATCHDOG_INTERVAL_SECONDS = 0.05
+
+
+#BaseException like KeyboardInterrupt, so generated code with a broad `except Exception` can't swallow it
+class CpuTimeExceeded(BaseException):
+    pass
+
+
+def preload_modules():
+    for name in PRELOAD_MODULES:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            print(f"Sandbox preload skipped, module not available: {name}")
+
+
+def _read_status_kb(pid: int, field: str) -> int:
+    #read a memory field (VmRSS, VmSize) in KB from /proc, 0 if unavailable
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1])
+    except (OSError, ValueError, IndexError):
+        pass
+    return 0
+
+
+def _truncate(text: str) -> str:
+    if len(text) <= MAX_OUTPUT_CHARS:
+        return text
+    return text[:MAX_OUTPUT_CHARS] + f"\n... [truncated {len(text) - MAX_OUTPUT_CHARS} characters]"
+
+
+def _on_sigxcpu(signum, frame):
+    raise CpuTimeExceeded(f"CPU time limit of {CPU_TIME_LIMIT_SECONDS}s exceeded")
+
+
+def _apply_limits():
+    #CPU rlimit is cumulative for the process, so grant a fresh budget on top of what was used so far
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    cpu_soft = int(usage.ru_utime + usage.ru_stime) + CPU_TIME_LIMIT_SECONDS + 1
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu_soft, resource.RLIM_INFINITY))
+
+    #RLIMIT_RSS is not enforced on Linux; cap the address space growth instead and let the
+    #parent watchdog enforce the actual RSS limit
+    vm_size_kb = _read_status_kb(os.getpid(), "VmSize")
+    if vm_size_kb:
+        address_space = (vm_size_kb * 1024) + (MEMORY_LIMIT_MB * 1024 * 1024)
+        resource.setrlimit(resource.RLIMIT_AS, (address_space, resource.RLIM_INFINITY))
+
+
+def _release_limits():
+    resource.setrlimit(resource.RLIMIT_AS, (resource.RLIM_INFINITY, resource.RLIM_INFINITY))
+
+
+def _run_job(job: Dict[str, Any], functions: Dict[str, Callable]) -> Dict[str, Any]:
+    #per job credentials (eg: ID_TOKEN) so the data tools called by the code run inside
+    #this worker and their payloads never cross the pipe back to the agent
+    os.environ.update(job.get("env", {}))
+
+    stdout_buffer = io.StringIO()
+    stderr_buffer = io.StringIO()
+    namespace = dict(functions)
+    status = "ok"
+    recycle = False
+    start = time.perf_counter()
+
+    try:
+        _apply_limits()
+        with contextlib.redirect_stdout(stdout_buffer), contextlib.redirect_stderr(stderr_buffer):
+            exec(job["code"], namespace)
+    except CpuTimeExceeded as e:
+        status, recycle = "cpu_limit", True
+        stderr_buffer.write(str(e))
+    except MemoryError:
+        status, recycle = "memory_limit", True
+        stderr_buffer.write(f"Memory limit of {MEMORY_LIMIT_MB}MB exceeded")
+    except BaseException:
+        status = "error"
+        stderr_buffer.write(traceback.format_exc())
+    finally:
+        _release_limits()
+
+    return {
+        "stdout": _truncate(stdout_buffer.getvalue()),
+        "stderr": _truncate(stderr_buffer.getvalue()),
+        "status": status,
+        "duration_ms": round((time.perf_counter() - start) * 1000, 2),
+        "recycle": recycle
+    }
+
+
+def _worker_main(conn, functions: Dict[str, Callable]):
+    signal.signal(signal.SIGXCPU, _on_sigxcpu)
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            return
+        if job is None:
+            return
+        conn.send(_run_job(job, functions))
+
+
+class _Worker:
+
+    def __init__(self, ctx, functions: Dict[str, Callable]):
+        #Pipe rather than Queue/Pool: Lambda has no /dev/shm for the semaphores those need
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_main, args=(child_conn, functions), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.jobs_run = 0
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout=1)
+        if self.process.is_alive():
+            self.kill()
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+class CodeSandbox:
+    """
+    Pool of pre-forked worker processes that execute generated Python code.
+
+    Workers are forked from a parent that has already imported NumPy/pandas, so jobs start
+    warm. Every job runs with a fresh namespace, its own stdout/stderr capture, a CPU time
+    rlimit, an address space rlimit backed by an RSS watchdog, and a wall clock timeout.
+    Workers that hit a limit are killed and replaced.
+
+    Args:
+        functions: Callables exposed to the executed code as globals
+        pool_size: Number of warm worker processes kept alive
+    """
+
+    def __init__(self, functions: Dict[str, Callable], pool_size: int = POOL_SIZE):
+        preload_modules()
+        self._ctx = multiprocessing.get_context("fork")
+        self._functions = functions
+        self._idle = queue.Queue()
+        for _ in range(pool_size):
+            self._idle.put(self._spawn())
+
+    def _spawn(self) -> _Worker:
+        return _Worker(self._ctx, self._functions)
+
+    def _release(self, worker: _Worker, recycle: bool = False):
+        worker.jobs_run += 1
+        if recycle or worker.jobs_run >= MAX_JOBS_PER_WORKER:
+            worker.stop()
+            worker = self._spawn()
+        self._idle.put(worker)
+
+    def _replace(self, worker: _Worker):
+        worker.kill()
+        self._idle.put(self._spawn())
+
+    def run(self, code: str, env: Optional[Dict[str, str]] = None, timeout: float = WALL_TIMEOUT_SECONDS) -> Dict[str, Any]:
+        """
+        Execute code in an idle worker and return its captured output.
+
+        Args:
+            code: Python source to execute
+            env: Environment variables set in the worker for this job only
+            timeout: Wall clock limit in seconds
+
+        Returns:
+            dict with 'stdout', 'stderr', 'status' and 'duration_ms'
+        """
+        worker = self._idle.get()
+        start = time.perf_counter()
+
+        try:
+            worker.conn.send({"code": code, "env": env or {}})
+        except (OSError, ValueError):
+            self._replace(worker)
+            return self._failure("error", "Sandbox worker unavailable", start)
+
+        deadline = time.monotonic() + timeout
+        memory_limit_kb = MEMORY_LIMIT_MB * 1024
+        baseline_kb = _read_status_kb(worker.process.pid, "VmRSS")
+
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self._replace(worker)
+                return self._failure("timeout", f"Execution timed out after {timeout}s", start)
+
+            if worker.conn.poll(min(remaining, _WATCHDOG_INTERVAL_SECONDS)):
+                try:
+                    result = worker.conn.recv()
+                except EOFError:
+                    self._replace(worker)
+                    return self._failure("crashed", "Sandbox worker exited unexpectedly", start)
+                self._release(worker, recycle=result.pop("recycle"))
+                return result
+
+            if _read_status_kb(worker.process.pid, "VmRSS") - baseline_kb > memory_limit_kb:
+                self._replace(worker)
+                return self._failure("memory_limit", f"Memory limit of {MEMORY_LIMIT_MB}MB exceeded", start)
+
+            if not worker.process.is_alive():
+                self._replace(worker)
+                return self._failure("crashed", "Sandbox worker exited unexpectedly", start)
+
+    @staticmethod
+    def _failure(status: str, message: str, start: float) -> Dict[str, Any]:
+        return {
+            "stdout": "",
+            "stderr": message,
+            "status": status,
+            "duration_ms": round((time.perf_counter() - start) * 1000, 2)
+        }
+
+    def shutdown(self):
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            worker.stop()
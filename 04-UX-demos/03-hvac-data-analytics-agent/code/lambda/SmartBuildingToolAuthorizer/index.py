@@ -21,7 +21,9 @@ SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 from jose import jwt
 import requests
 from jose import jwk
-import json
+from jose.exceptions import JWTError
+from collections import OrderedDict
+import hashlib
 import time
 import boto3
 import os
@@ -30,7 +32,25 @@ import os
 REGION = os.environ.get('AWS_REGION', '')
 USER_POOL_ID = os.environ.get('USER_POOL_ID', '')
 CLIENT_ID = os.environ.get('CLIENT_ID', '') 
-    
+
+#How long the fetched JWKS is trusted before it is refreshed
+JWKS_CACHE_TTL_SECONDS = int(os.environ.get('JWKS_CACHE_TTL_SECONDS', '3600'))
+#Minimum gap between refreshes triggered by an unknown kid, so forged kids can't force a fetch per request
+JWKS_MIN_REFRESH_SECONDS = int(os.environ.get('JWKS_MIN_REFRESH_SECONDS', '60'))
+#How long a rejected token is remembered (0 disables negative caching)
+REJECTED_TOKEN_TTL_SECONDS = int(os.environ.get('REJECTED_TOKEN_TTL_SECONDS', '300'))
+REJECTED_TOKEN_MAX_ENTRIES = 1024
+
+#Module level caches survive across invocations of a warm Lambda container
+#kid -> parsed key object, so tokens are verified without any network call or key parsing
+_jwks_cache = {
+    'keys': {},
+    #monotonic() counts from boot, any starting value >= 0 could look fresh in a new environment
+    'fetched_at': float('-inf')
+}
+#sha256(token) -> (expires_at, error)
+_rejected_tokens = OrderedDict()
+
 
 def get_cognito_public_keys(region, user_pool_id):
     """Fetch public keys from Cognito"""
@@ -43,24 +63,63 @@ def get_cognito_public_keys(region, user_pool_id):
     except Exception as e:
         raise Exception(f"Failed to fetch public keys: {str(e)}")
 
+def refresh_public_keys(region, user_pool_id):
+    """Fetch the JWKS and replace the cached key objects"""
+    keys = get_cognito_public_keys(region, user_pool_id)
+    _jwks_cache['keys'] = {k['kid']: jwk.construct(k, k.get('alg', 'RS256')) for k in keys}
+    _jwks_cache['fetched_at'] = time.monotonic()
+
 def get_public_key(token, region, user_pool_id):
-    """Get the public key that matches the token's key ID"""
+    """Get the cached public key object that matches the token's key ID"""
     # Get the key ID from the token header
     headers = jwt.get_unverified_header(token)
     kid = headers['kid']
-    
-    # Find the matching public key
-    keys = get_cognito_public_keys(region, user_pool_id)
-    key = next((k for k in keys if k['kid'] == kid), None)
+
+    age = time.monotonic() - _jwks_cache['fetched_at']
+    if age > JWKS_CACHE_TTL_SECONDS:
+        refresh_public_keys(region, user_pool_id)
+    elif kid not in _jwks_cache['keys'] and age > JWKS_MIN_REFRESH_SECONDS:
+        # Unknown kid, Cognito may have rotated its signing keys
+        refresh_public_keys(region, user_pool_id)
+
+    key = _jwks_cache['keys'].get(kid)
     if not key:
         raise Exception('Public key not found')
-    
-    print(key)
-    # Convert the public key to PEM format
-    return json.dumps(key)
+
+    return key
+
+def _token_digest(token):
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+def get_rejected_token(token):
+    """Return the cached error for a recently rejected token, if any"""
+    if REJECTED_TOKEN_TTL_SECONDS <= 0:
+        return None
+    digest = _token_digest(token)
+    entry = _rejected_tokens.get(digest)
+    if entry is None:
+        return None
+    if entry[0] < time.monotonic():
+        del _rejected_tokens[digest]
+        return None
+    return entry[1]
+
+def remember_rejected_token(token, error):
+    if REJECTED_TOKEN_TTL_SECONDS <= 0:
+        return
+    _rejected_tokens[_token_digest(token)] = (time.monotonic() + REJECTED_TOKEN_TTL_SECONDS, error)
+    while len(_rejected_tokens) > REJECTED_TOKEN_MAX_ENTRIES:
+        _rejected_tokens.popitem(last=False)
 
 def verify_token(token, region, user_pool_id, client_id):
     """Verify the JWT token"""
+    rejected = get_rejected_token(token)
+    if rejected:
+        return {
+            'isValid': False,
+            'error': rejected
+        }
+
     try:
         # Get the public key
         public_key = get_public_key(token, region, user_pool_id)
@@ -84,7 +143,15 @@ def verify_token(token, region, user_pool_id, client_id):
             'claims': claims
         }
         
-    
+    except JWTError as e:
+        # Invalid signature, claims or expiry won't change on retry, unlike a failed JWKS fetch
+        print(e)
+        remember_rejected_token(token, str(e))
+        return {
+            'isValid': False,
+            'error': str(e)
+        }
+
     except Exception as e:
         print(e)
         return {
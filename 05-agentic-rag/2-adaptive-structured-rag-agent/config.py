@@ -33,10 +33,21 @@ def get_config() -> Dict[str, Any]:
         # Athena Configuration
         "athena_database": os.environ.get("ATHENA_DATABASE", ""),
         "athena_output_location": os.environ.get("ATHENA_OUTPUT_LOCATION", ""),
+        "athena_workgroup": os.environ.get("ATHENA_WORKGROUP", ""),
+        "athena_max_rows": int(os.environ.get("ATHENA_MAX_ROWS", "1000")),
+        "athena_max_result_bytes": int(os.environ.get("ATHENA_MAX_RESULT_BYTES", "200000")),
+        "athena_result_reuse_minutes": int(os.environ.get("ATHENA_RESULT_REUSE_MINUTES", "60")),
+        "athena_query_timeout_seconds": int(os.environ.get("ATHENA_QUERY_TIMEOUT_SECONDS", "300")),
         
         # Knowledge Base Configuration
         "knowledge_base_id": os.environ.get("KNOWLEDGE_BASE_ID", ""),
 
+        # SQLite Configuration
+        "sqlite_database_path": os.environ.get("SQLITE_DATABASE_PATH", "./data/wealthmanagement.db"),
+        "sqlite_max_rows": int(os.environ.get("SQLITE_MAX_ROWS", "200")),
+        "sqlite_max_result_bytes": int(os.environ.get("SQLITE_MAX_RESULT_BYTES", "100000")),
+        "sqlite_query_timeout_seconds": float(os.environ.get("SQLITE_QUERY_TIMEOUT_SECONDS", "10")),
+
     }
     
     return config
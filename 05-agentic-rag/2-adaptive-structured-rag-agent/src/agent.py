@@ -5,7 +5,7 @@ import os
 import logging
 from strands import Agent
 
-from src.tools.knowledge_base_tool import get_schema
+from src.tools.knowledge_base_tool import get_schema, set_schema_source
 from src.tools.athena_tool import run_athena_query
 from src.tools.sqllite_tool import run_sqlite_query
 
@@ -43,6 +43,9 @@ def create_nl2sql_agent(environment: str = "local") -> Agent:
     If you receive an error, carefully analyze it and fix your query.
     """
     
+    # Without a knowledge base, the local engine reads the schema from the SQLite database itself
+    set_schema_source("static" if environment == "athena" else "sqlite")
+
     # Create the agent with tools and system prompt
     tools = [get_schema, run_athena_query] if environment == "athena" else [get_schema, run_sqlite_query]
 
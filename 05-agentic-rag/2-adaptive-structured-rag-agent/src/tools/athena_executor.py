@@ -0,0 +1,234 @@
+"""
+Athena query executor used by the Athena tool.
+
+Keeps one Athena client per process, polls query state with exponential backoff,
+submits queries concurrently, and pages through results up to a row cap and a byte
+budget instead of stopping at the first page.
+"""
+import asyncio
+import codecs
+import csv
+import hashlib
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse
+
+import boto3
+
+logger = logging.getLogger(__name__)
+
+# get_query_results returns at most 1000 rows per page
+_PAGE_SIZE = 1000
+
+
+class AthenaExecutor:
+    """
+    Execute Athena queries with a cached client and bounded, paginated results.
+
+    Completed results are cached in memory by a hash of the query and database for
+    result_reuse_minutes. The same window is passed to Athena's query result reuse,
+    so a query repeated from another process also skips the scan.
+
+    Args:
+        region: AWS region of the Athena workgroup
+        database: Athena / Glue database queries run against
+        output_location: S3 location for query results
+        workgroup: Optional Athena workgroup
+        max_rows: Maximum number of rows returned per query
+        max_result_bytes: Approximate maximum size of the returned values
+        result_reuse_minutes: Result reuse window, 0 disables caching and reuse
+        timeout_seconds: Maximum time to wait for a query to finish
+        max_concurrency: Queries submitted at the same time by submit/run_many
+    """
+
+    def __init__(
+        self,
+        region: str,
+        database: str,
+        output_location: str,
+        workgroup: Optional[str] = None,
+        max_rows: int = 1000,
+        max_result_bytes: int = 200_000,
+        result_reuse_minutes: int = 60,
+        timeout_seconds: float = 300,
+        max_concurrency: int = 4,
+    ):
+        self.database = database
+        self.output_location = output_location
+        self.workgroup = workgroup
+        self.max_rows = max_rows
+        self.max_result_bytes = max_result_bytes
+        self.result_reuse_minutes = result_reuse_minutes
+        self.timeout_seconds = timeout_seconds
+        self.region = region
+        # boto3 clients are thread safe, one per process is enough
+        self.client = boto3.client('athena', region_name=region)
+        self._s3 = None
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency)
+        self._cache: Dict[str, Dict[str, Any]] = {}
+        self._cache_lock = threading.Lock()
+
+    @property
+    def s3(self):
+        if self._s3 is None:
+            self._s3 = boto3.client('s3', region_name=self.region)
+        return self._s3
+
+    def _cache_key(self, query: str, max_rows: int, read_from_s3: bool) -> str:
+        return hashlib.sha256(f"{self.database}\n{max_rows}\n{read_from_s3}\n{query.strip()}".encode("utf-8")).hexdigest()
+
+    def start(self, query: str) -> str:
+        """Start a query and return its execution ID without waiting for it."""
+        params = {
+            'QueryString': query,
+            'QueryExecutionContext': {'Database': self.database},
+            'ResultConfiguration': {'OutputLocation': self.output_location},
+        }
+        if self.workgroup:
+            params['WorkGroup'] = self.workgroup
+        if self.result_reuse_minutes:
+            params['ResultReuseConfiguration'] = {
+                'ResultReuseByAgeConfiguration': {'Enabled': True, 'MaxAgeInMinutes': self.result_reuse_minutes}
+            }
+        response = self.client.start_query_execution(**params)
+        return response['QueryExecutionId']
+
+    def wait(self, query_execution_id: str) -> Dict[str, Any]:
+        """Poll until the query reaches a final state, backing off from 0.2s up to 5s between calls."""
+        deadline = time.monotonic() + self.timeout_seconds
+        delay = 0.2
+        while True:
+            execution = self.client.get_query_execution(QueryExecutionId=query_execution_id)['QueryExecution']
+            state = execution['Status']['State']
+            if state in ('SUCCEEDED', 'FAILED', 'CANCELLED'):
+                return execution
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self.client.stop_query_execution(QueryExecutionId=query_execution_id)
+                execution['Status']['State'] = 'CANCELLED'
+                execution['Status']['StateChangeReason'] = f"Query timed out after {self.timeout_seconds} seconds"
+                return execution
+            logger.debug(f"Query state: {state}, checking again in {delay:.1f}s")
+            time.sleep(min(delay, remaining))
+            delay = min(delay * 2, 5.0)
+
+    def fetch(self, query_execution_id: str, max_rows: Optional[int] = None) -> Dict[str, Any]:
+        """Page through get_query_results until max_rows or the byte budget is reached."""
+        max_rows = max_rows or self.max_rows
+        paginator = self.client.get_paginator('get_query_results')
+        columns: List[str] = []
+        data: List[Dict[str, Any]] = []
+        size = 0
+        truncated = False
+        first_page = True
+
+        for page in paginator.paginate(QueryExecutionId=query_execution_id, PaginationConfig={'PageSize': _PAGE_SIZE}):
+            rows = page['ResultSet']['Rows']
+            if first_page:
+                columns = [col['Label'] for col in page['ResultSet']['ResultSetMetadata']['ColumnInfo']]
+                # The first row of a SELECT result is the header
+                if rows and [value.get('VarCharValue') for value in rows[0]['Data']] == columns:
+                    rows = rows[1:]
+                first_page = False
+
+            for row in rows:
+                values = [value.get('VarCharValue') for value in row['Data']]
+                size += sum(len(value) for value in values if value)
+                if len(data) >= max_rows or (data and size > self.max_result_bytes):
+                    truncated = True
+                    break
+                data.append(dict(zip(columns, values)))
+            if truncated:
+                break
+
+        return {"columns": columns, "data": data, "truncated": truncated}
+
+    def fetch_from_s3(self, execution: Dict[str, Any], max_rows: Optional[int] = None) -> Dict[str, Any]:
+        """Stream the CSV result object from S3, cheaper than get_query_results for large outputs."""
+        max_rows = max_rows or self.max_rows
+        location = urlparse(execution['ResultConfiguration']['OutputLocation'])
+        body = self.s3.get_object(Bucket=location.netloc, Key=location.path.lstrip('/'))['Body']
+        reader = csv.reader(codecs.getreader('utf-8')(body))
+        columns = next(reader, [])
+        data: List[Dict[str, Any]] = []
+        size = 0
+        truncated = False
+        try:
+            for values in reader:
+                size += sum(len(value) for value in values)
+                if len(data) >= max_rows or (data and size > self.max_result_bytes):
+                    truncated = True
+                    break
+                # Athena writes NULL as an empty field
+                data.append({column: (value if value != '' else None) for column, value in zip(columns, values)})
+        finally:
+            body.close()
+        return {"columns": columns, "data": data, "truncated": truncated}
+
+    def run(self, query: str, max_rows: Optional[int] = None, read_from_s3: bool = False) -> Dict[str, Any]:
+        """Run a query to completion and return the same dict shape as the Athena tool."""
+        max_rows = max_rows or self.max_rows
+        key = self._cache_key(query, max_rows, read_from_s3)
+        if self.result_reuse_minutes:
+            with self._cache_lock:
+                cached = self._cache.get(key)
+            if cached and time.monotonic() - cached['cached_at'] < self.result_reuse_minutes * 60:
+                logger.info("Returning cached Athena result")
+                return cached['result']
+
+        logger.info(f"Executing Athena query: {query}")
+        query_execution_id = self.start(query)
+        logger.info(f"Query execution ID: {query_execution_id}")
+        execution = self.wait(query_execution_id)
+        status = execution['Status']
+
+        if status['State'] != 'SUCCEEDED':
+            logger.error(f"Query failed response: {status}")
+            return {
+                "success": False,
+                "error": status.get('StateChangeReason', 'Query failed with an Unknown error'),
+                "athena_error_details": status.get('AthenaError', "Query failed with an Unknown Athena error"),
+                "query": query
+            }
+
+        if read_from_s3:
+            results = self.fetch_from_s3(execution, max_rows)
+        else:
+            results = self.fetch(query_execution_id, max_rows)
+
+        statistics = execution.get('Statistics', {})
+        reused = statistics.get('ResultReuseInformation', {}).get('ReusedPreviousResult', False)
+        logger.info(f"Query succeeded! Returned {len(results['data'])} rows, reused previous result: {reused}")
+
+        result = {
+            "success": True,
+            "data": results['data'],
+            "query": query
+        }
+        if results['truncated']:
+            result["truncated"] = True
+            result["message"] = (
+                f"Only the first {len(results['data'])} rows are returned. "
+                "Add filters, aggregations or a LIMIT to narrow the result."
+            )
+
+        if self.result_reuse_minutes:
+            with self._cache_lock:
+                self._cache[key] = {"result": result, "cached_at": time.monotonic()}
+        return result
+
+    def submit(self, query: str, **kwargs) -> Future:
+        """Run a query in the background and return a Future with its result."""
+        return self._executor.submit(self.run, query, **kwargs)
+
+    def run_many(self, queries: List[str], **kwargs) -> List[Dict[str, Any]]:
+        """Run queries concurrently, results are returned in the order of the queries."""
+        futures = [self.submit(query, **kwargs) for query in queries]
+        return [future.result() for future in futures]
+
+    async def run_async(self, query: str, **kwargs) -> Dict[str, Any]:
+        """Await a query without blocking the event loop."""
+        return await asyncio.wrap_future(self.submit(query, **kwargs))
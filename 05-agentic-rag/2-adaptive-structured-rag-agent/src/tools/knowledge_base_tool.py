@@ -4,12 +4,18 @@ Knowledge Base Tool for retrieving schema information.
 from strands import tool
 import boto3
 import logging
-import os
-import json
-from typing import Optional, Dict, Any, List
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Dict, Tuple
+
+from src.tools.schema_catalog import SchemaCatalog
 
 logger = logging.getLogger(__name__)
 
+# Above this size, get_schema without a table returns the table index instead of every table
+SCHEMA_INLINE_CHARS = 4000
+
 # Store the schema information for fallback
 WEALTH_MANAGEMENT_SCHEMA = [
     {
@@ -152,129 +158,110 @@ WEALTH_MANAGEMENT_SCHEMA = [
     }
 ]
 
+# Catalogs are loaded once per process, the schema is static for a session.
+# A static fallback used because a source failed is only kept for a short while,
+# so a transient error doesn't pin the fallback for the rest of the process.
+FALLBACK_RETRY_SECONDS = 60
+_catalogs: Dict[str, Tuple[SchemaCatalog, float]] = {}
+_catalog_lock = threading.Lock()
+_schema_source: Optional[str] = None
+
+
+def set_schema_source(source: Optional[str]) -> None:
+    """
+    Select where get_schema loads the schema from: "knowledge_base", "sqlite" or "static".
+    None picks the knowledge base when one is configured, the static schema otherwise.
+    """
+    global _schema_source
+    _schema_source = source
+
+
+def _default_source(config) -> str:
+    knowledge_base_id = config['knowledge_base_id']
+    if knowledge_base_id and knowledge_base_id != "default-kb-id":
+        return "knowledge_base"
+    return _schema_source or "static"
+
+
+def _load_catalog(source: str, config) -> SchemaCatalog:
+    if source == "knowledge_base":
+        logger.debug(f"Connecting to knowledge base: {config['knowledge_base_id']}")
+        bedrock_client = boto3.client('bedrock-agent-runtime', region_name=config['aws_region'])
+        catalog = SchemaCatalog.from_knowledge_base(bedrock_client, config['knowledge_base_id'])
+        if len(catalog) or catalog.raw_text:
+            return catalog
+        logger.warning("No schema information retrieved from knowledge base, using mock data")
+    elif source == "sqlite":
+        database_path = config.get('sqlite_database_path', './data/wealthmanagement.db')
+        if Path(database_path).exists():
+            return SchemaCatalog.from_sqlite(database_path, descriptions=WEALTH_MANAGEMENT_SCHEMA)
+        logger.warning(f"SQLite database not found at {database_path}, using mock schema data")
+    return SchemaCatalog.from_static(WEALTH_MANAGEMENT_SCHEMA)
+
+
+def get_catalog(source: Optional[str] = None) -> SchemaCatalog:
+    """Return the schema catalog for a source, loading it on first use."""
+    from config import get_config
+    config = get_config()
+    source = source or _default_source(config)
+
+    with _catalog_lock:
+        cached = _catalogs.get(source)
+        if cached and time.monotonic() < cached[1]:
+            return cached[0]
+        try:
+            catalog = _load_catalog(source, config)
+        except Exception as e:
+            logger.exception(f"Error loading schema from {source}: {e}")
+            catalog = SchemaCatalog.from_static(WEALTH_MANAGEMENT_SCHEMA)
+        logger.info(f"Loaded schema catalog from {catalog.source} with {len(catalog)} tables")
+        is_fallback = catalog.source != source
+        expires_at = time.monotonic() + FALLBACK_RETRY_SECONDS if is_fallback else float("inf")
+        _catalogs[source] = (catalog, expires_at)
+    return catalog
+
+
 @tool
-def get_schema(flag: bool = False, table_name: str = None) -> str:
+def get_schema(flag: bool = False, table_name: str = None, column_name: str = None) -> str:
     """
-    Retrieve schema information from a knowledge base.
+    Retrieve schema information for the database tables.
     
-    Uses AWS Knowledge Base to retrieve schema information.
-    Falls back to mock data if AWS connection fails.
+    The schema is loaded once from the knowledge base, the SQLite database or the
+    built-in schema, and served from memory afterwards.
     
     Args:
-        table_name: Optional name of a specific table to retrieve schema for.
-                   If None, returns all tables in the knowledge base.
+        flag: Use the built-in schema instead of the configured source.
+        table_name: Optional name of a table, or comma separated names of tables, to
+                   retrieve schema for. If None, returns all tables, or an index of the
+                   tables when the schema is large.
+        column_name: Optional column of table_name to describe.
     
     Returns:
         str: Schema information formatted for the LLM context.
     """
     try:
-        # For testing purposes, check if we should use mock data
         if flag == True:
             logger.info("get_schema called with flag=True")
-            return _format_schema_from_data(WEALTH_MANAGEMENT_SCHEMA, table_name)
-        
-        # Get knowledge base ID from environment
-        from config import get_config
-        config = get_config()
-        knowledge_base_id = config['knowledge_base_id']
-        
-        if not knowledge_base_id or knowledge_base_id == "default-kb-id":
-            logger.warning("No knowledge base ID provided, using mock schema data")
-            return _format_schema_from_data(WEALTH_MANAGEMENT_SCHEMA, table_name)
-        
-        # Create Bedrock client
-        logger.debug(f"Connecting to knowledge base: {knowledge_base_id}")
-        bedrock_client = boto3.client('bedrock-agent-runtime', region_name=config['aws_region'])
-        
-        # Prepare the query
-        query = f"Describe the schema for {table_name} table" if table_name else "Describe all tables and their schemas"
-        logger.debug(f"Querying knowledge base with: {query}")
-        
-        # Query the knowledge base
-        response = bedrock_client.retrieve(
-            knowledgeBaseId=knowledge_base_id,
-            retrievalQuery={
-                'text': query
-            },
-            retrievalConfiguration={
-                'vectorSearchConfiguration': {
-                    'numberOfResults': 5
-                }
-            }
-        )
-        
-        # Process and format the response
-        schema_info = ""
-        for result in response.get('retrievalResults', []):
-            if 'content' in result and 'text' in result['content']:
-                schema_info += result['content']['text'] + "\n\n"
-
-        if not schema_info:
-            logger.warning("No schema information retrieved from knowledge base, using mock data")
-            return _format_schema_from_data(WEALTH_MANAGEMENT_SCHEMA, table_name)
-        
-        logger.info("Successfully retrieved schema from knowledge base")
-        return schema_info
-        
-    except Exception as e:
-        logger.exception(f"Error retrieving schema from knowledge base: {e}")
-        # Fall back to the provided schema
-        return _format_schema_from_data(WEALTH_MANAGEMENT_SCHEMA, table_name)
+        catalog = get_catalog("static" if flag else None)
 
+        if table_name and column_name:
+            return catalog.describe_column(table_name, column_name)
 
-def _format_schema_from_data(schema_data: List[Dict[str, Any]], table_name: str = None) -> str:
-    """
-    Format schema information from the provided data.
-    
-    Args:
-        schema_data: List of table schema definitions
-        table_name: Optional name of a specific table
-    
-    Returns:
-        str: Formatted schema information
-    """
-    if table_name:
-        # Filter for the specific table
-        table_info = next((table for table in schema_data if table["table_name"].lower() == table_name.lower()), None)
-        if not table_info:
-            return f"No schema information found for table: {table_name}"
-        
-        return _format_table_schema(table_info)
-    else:
-        # Return all tables
-        result = "Database: wealthmanagement-db\n\n"
-        for table in schema_data:
-            result += _format_table_schema(table) + "\n\n"
-        return result
+        if table_name:
+            if not len(catalog):
+                # Unstructured knowledge base text has no per table entries
+                return catalog.raw_text
+            return catalog.describe(table_name.split(","))
 
+        if catalog.render_size() > SCHEMA_INLINE_CHARS:
+            return (
+                catalog.index()
+                + "\n\nCall get_schema with table_name (comma separated) to get the columns of the tables you need."
+            )
+        return catalog.describe()
 
-def _format_table_schema(table_info: Dict[str, Any]) -> str:
-    """
-    Format a single table's schema information.
-    
-    Args:
-        table_info: Dictionary containing table schema
-    
-    Returns:
-        str: Formatted table schema
-    """
-    result = f"Table: {table_info['table_name']}\n"
-    result += f"Description: {table_info['table_description']}\n"
-    result += "Columns:\n"
-    
-    for column in table_info["columns"]:
-        result += f"- {column['Name']} ({column['Type']}): {column['Comment']}\n"
-    
-    # Add relationship information
-    if "relationships" in table_info:
-        result += "Relationships:\n"
-        
-        if "primary_key" in table_info["relationships"]:
-            pk_cols = [pk["column_name"] for pk in table_info["relationships"]["primary_key"]]
-            result += f"- Primary Key: {', '.join(pk_cols)}\n"
-        
-        if "foreign_keys" in table_info["relationships"]:
-            for fk in table_info["relationships"]["foreign_keys"]:
-                result += f"- Foreign Key: {fk['join_on_column']} references {fk['table_name']}\n"
-    
-    return result
+    except Exception as e:
+        logger.exception(f"Error retrieving schema: {e}")
+        return SchemaCatalog.from_static(WEALTH_MANAGEMENT_SCHEMA).describe(
+            table_name.split(",") if table_name else None
+        )
@@ -0,0 +1,196 @@
+"""
+Schema catalog for the NL2SQL agent.
+
+Loads table schemas once, from a Bedrock Knowledge Base, by introspecting a
+SQLite database, or from static definitions. Keeps a pre-rendered compact
+description per table so lookups don't rebuild strings on every tool call.
+"""
+import json
+import logging
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SchemaCatalog:
+    """
+    In-memory catalog of table schemas with pre-rendered compact descriptions.
+
+    Tables use the same shape as the schema documents stored in the knowledge base:
+    table_name, table_description, columns (Name, Type, Comment) and relationships
+    (primary_key, foreign_keys).
+
+    Args:
+        database_name: Name of the database the tables belong to
+        tables: List of table schema definitions
+        source: Where the schema was loaded from, for logging
+        raw_text: Schema text that could not be parsed into tables
+    """
+
+    def __init__(self, database_name: str, tables: List[Dict[str, Any]], source: str, raw_text: str = ""):
+        self.database_name = database_name
+        self.source = source
+        self.raw_text = raw_text
+        self.tables = {table["table_name"].lower(): table for table in tables}
+        self._columns = {
+            name: {column["Name"].lower(): column for column in table.get("columns", [])}
+            for name, table in self.tables.items()
+        }
+        self._rendered = {name: _render_table(table) for name, table in self.tables.items()}
+        self._index = "\n".join(
+            f"- {table['table_name']}: {table.get('table_description', '')} "
+            f"[{', '.join(column['Name'] for column in table.get('columns', []))}]"
+            for table in self.tables.values()
+        )
+
+    def __len__(self) -> int:
+        return len(self.tables)
+
+    def table_names(self) -> List[str]:
+        return [table["table_name"] for table in self.tables.values()]
+
+    def index(self) -> str:
+        """One line per table with its description and column names."""
+        return f"Database: {self.database_name}\nTables:\n{self._index}"
+
+    def describe(self, table_names: Optional[List[str]] = None) -> str:
+        """Compact schema of the given tables, or of every table when table_names is None."""
+        if table_names is None:
+            if not self.tables:
+                return self.raw_text
+            return f"Database: {self.database_name}\n\n" + "\n\n".join(self._rendered.values())
+
+        found, missing = [], []
+        for name in table_names:
+            rendered = self._rendered.get(name.strip().lower())
+            if rendered:
+                found.append(rendered)
+            else:
+                missing.append(name.strip())
+        if missing:
+            found.append(
+                f"No schema information found for table(s): {', '.join(missing)}. "
+                f"Available tables: {', '.join(self.table_names())}"
+            )
+        return "\n\n".join(found)
+
+    def describe_column(self, table_name: str, column_name: str) -> str:
+        column = self._columns.get(table_name.lower(), {}).get(column_name.lower())
+        if not column:
+            return f"No column {column_name} found in table {table_name}"
+        return f"{self.tables[table_name.lower()]['table_name']}.{_render_column(column, set())}"
+
+    def render_size(self) -> int:
+        return sum(len(rendered) for rendered in self._rendered.values())
+
+    @classmethod
+    def from_static(cls, schema_data: List[Dict[str, Any]]) -> "SchemaCatalog":
+        database_name = schema_data[0].get("database_name", "") if schema_data else ""
+        return cls(database_name, schema_data, source="static")
+
+    @classmethod
+    def from_sqlite(cls, database_path: str, descriptions: Optional[List[Dict[str, Any]]] = None) -> "SchemaCatalog":
+        """
+        Introspect tables with sqlite_master and PRAGMA table_info/foreign_key_list.
+
+        Table descriptions and column comments are taken from descriptions when a
+        table or column with the same name exists there.
+        """
+        known = {table["table_name"].lower(): table for table in descriptions or []}
+        tables = []
+        # Read only, the catalog never writes to the database
+        with sqlite3.connect(f"{Path(database_path).resolve().as_uri()}?mode=ro", uri=True) as conn:
+            names = [row[0] for row in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name"
+            )]
+            for name in names:
+                described = known.get(name.lower(), {})
+                comments = {column["Name"].lower(): column.get("Comment", "") for column in described.get("columns", [])}
+                # cid, name, type, notnull, default, pk
+                info = conn.execute(f'PRAGMA table_info("{name}")').fetchall()
+                columns = [
+                    {"Name": column[1], "Type": column[2].lower(), "Comment": comments.get(column[1].lower(), "")}
+                    for column in info
+                ]
+                relationships = {
+                    "primary_key": [
+                        {"column_name": column[1], "constraint": "not null" if column[3] else ""}
+                        for column in sorted((c for c in info if c[5]), key=lambda c: c[5])
+                    ],
+                    "foreign_keys": [
+                        {"table_name": fk[2], "join_on_column": fk[3], "references_column": fk[4]}
+                        for fk in conn.execute(f'PRAGMA foreign_key_list("{name}")')
+                    ],
+                }
+                tables.append({
+                    "table_name": name,
+                    "table_description": described.get("table_description", ""),
+                    "columns": columns,
+                    "relationships": relationships,
+                })
+        return cls(Path(database_path).stem, tables, source="sqlite")
+
+    @classmethod
+    def from_knowledge_base(cls, bedrock_client, knowledge_base_id: str, number_of_results: int = 25) -> "SchemaCatalog":
+        """
+        Retrieve the schema documents from the knowledge base in a single call.
+
+        Documents holding JSON table definitions become catalog tables, any other
+        text is kept as is and returned when the whole schema is requested.
+        """
+        response = bedrock_client.retrieve(
+            knowledgeBaseId=knowledge_base_id,
+            retrievalQuery={"text": "Describe all tables and their schemas"},
+            retrievalConfiguration={"vectorSearchConfiguration": {"numberOfResults": number_of_results}},
+        )
+        tables, texts = {}, []
+        for result in response.get("retrievalResults", []):
+            text = result.get("content", {}).get("text")
+            if not text:
+                continue
+            parsed = _parse_tables(text)
+            if parsed:
+                for table in parsed:
+                    tables.setdefault(table["table_name"].lower(), table)
+            else:
+                texts.append(text)
+        database_name = next((t.get("database_name", "") for t in tables.values()), "")
+        return cls(database_name, list(tables.values()), source="knowledge_base", raw_text="\n\n".join(texts))
+
+
+def _parse_tables(text: str) -> List[Dict[str, Any]]:
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return []
+    if isinstance(data, dict):
+        data = [data]
+    if not isinstance(data, list):
+        return []
+    return [table for table in data if isinstance(table, dict) and "table_name" in table and "columns" in table]
+
+
+def _render_column(column: Dict[str, Any], primary_key: set) -> str:
+    line = f"{column['Name']} {column.get('Type', '')}".rstrip()
+    if column["Name"].lower() in primary_key:
+        line += " PK"
+    if column.get("Comment"):
+        line += f" -- {column['Comment']}"
+    return line
+
+
+def _render_table(table: Dict[str, Any]) -> str:
+    relationships = table.get("relationships", {})
+    primary_key = {pk["column_name"].lower() for pk in relationships.get("primary_key", [])}
+    header = f"Table {table['table_name']}"
+    if table.get("table_description"):
+        header += f": {table['table_description']}"
+    lines = [header]
+    lines.extend(f"  {_render_column(column, primary_key)}" for column in table.get("columns", []))
+    lines.extend(
+        f"  FK {fk['join_on_column']} -> {fk['table_name']}.{fk.get('references_column') or fk['join_on_column']}"
+        for fk in relationships.get("foreign_keys", [])
+    )
+    return "\n".join(lines)
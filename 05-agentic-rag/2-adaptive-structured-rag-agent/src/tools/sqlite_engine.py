@@ -0,0 +1,84 @@
+"""
+Read-only SQLite engine used by the SQLite tool.
+
+Keeps one read-only connection per process, interrupts statements that run past a
+timeout, and fetches results in batches up to a row cap and a byte budget.
+"""
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+logger = logging.getLogger(__name__)
+
+# Rows fetched from the cursor at a time
+_FETCH_SIZE = 256
+# SQLite virtual machine instructions between two timeout checks
+_PROGRESS_STEPS = 10000
+
+
+class SQLiteQueryEngine:
+    """
+    Execute queries on a shared read-only SQLite connection.
+
+    The database is opened with mode=ro and PRAGMA query_only, so generated SQL
+    cannot modify it. Queries are serialized on the connection.
+
+    Args:
+        database_path: Path of the SQLite database file
+        max_rows: Maximum number of rows returned per query
+        max_result_bytes: Approximate maximum size of the returned values
+        timeout_seconds: Statements running longer are interrupted
+    """
+
+    def __init__(self, database_path: str, max_rows: int = 200, max_result_bytes: int = 100_000,
+                 timeout_seconds: float = 10):
+        self.database_path = database_path
+        self.max_rows = max_rows
+        self.max_result_bytes = max_result_bytes
+        self.timeout_seconds = timeout_seconds
+        self._deadline = 0.0
+        self._lock = threading.Lock()
+
+        uri = f"{Path(database_path).resolve().as_uri()}?mode=ro"
+        self._conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        self._conn.execute("PRAGMA query_only = ON")
+        self._conn.set_progress_handler(self._check_timeout, _PROGRESS_STEPS)
+
+    def _check_timeout(self) -> int:
+        # A non zero return value aborts the statement with "interrupted"
+        return 1 if time.monotonic() > self._deadline else 0
+
+    def execute(self, query: str, max_rows: int = None) -> Dict[str, Any]:
+        """
+        Run a query and return its columns and rows, limited to max_rows and the byte budget.
+
+        Returns:
+            dict with 'columns', 'rows' (tuples of values) and 'truncated'
+        """
+        max_rows = min(max_rows or self.max_rows, self.max_rows)
+        rows: List[tuple] = []
+        size = 0
+        truncated = False
+
+        with self._lock:
+            self._deadline = time.monotonic() + self.timeout_seconds
+            cursor = self._conn.execute(query)
+            try:
+                columns = [description[0] for description in cursor.description] if cursor.description else []
+                while not truncated:
+                    batch = cursor.fetchmany(_FETCH_SIZE)
+                    if not batch:
+                        break
+                    for row in batch:
+                        size += sum(len(str(value)) for value in row if value is not None)
+                        if len(rows) >= max_rows or (rows and size > self.max_result_bytes):
+                            truncated = True
+                            break
+                        rows.append(row)
+            finally:
+                cursor.close()
+
+        return {"columns": columns, "rows": rows, "truncated": truncated}
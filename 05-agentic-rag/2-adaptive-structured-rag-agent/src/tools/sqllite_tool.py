@@ -4,93 +4,94 @@ SQLite Query Tool for executing SQL queries against local SQLite database.
 from strands import tool
 import sqlite3
 import logging
-import os
+import threading
 from typing import Dict, Any, Optional
 from pathlib import Path
 
+from src.tools.sqlite_engine import SQLiteQueryEngine
+
 logger = logging.getLogger(__name__)
 
+_engine: Optional[SQLiteQueryEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_engine() -> SQLiteQueryEngine:
+    """Return the process wide read-only SQLite engine, opened on first use."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            from config import get_config
+            config = get_config()
+
+            database_path = config.get('sqlite_database_path', './data/wealthmanagement.db')
+            if not Path(database_path).exists():
+                raise FileNotFoundError(f"Database file not found: {database_path}")
+
+            _engine = SQLiteQueryEngine(
+                database_path,
+                max_rows=config['sqlite_max_rows'],
+                max_result_bytes=config['sqlite_max_result_bytes'],
+                timeout_seconds=config['sqlite_query_timeout_seconds'],
+            )
+        return _engine
+
+
 @tool
-def run_sqlite_query(query: str) -> Dict[str, Any]:
+def run_sqlite_query(query: str, max_rows: Optional[int] = None, columnar: bool = False) -> Dict[str, Any]:
     """
-    Execute a SQL query on SQLite database.
+    Execute a read-only SQL query on SQLite database.
     
     Uses sqlite3 to execute the query on local SQLite database and returns the results.
+    The database is read-only, results are capped in rows and size, and "truncated"
+    is set when rows were left out.
     
     Args:
         query: SQL query string to execute
+        max_rows: Optional maximum number of rows to return
+        columnar: Return "columns" and "rows" arrays instead of one object per row
     
     Returns:
         Dict containing either query results or error information
     """
     try:
-        # Get database path from config
-        from config import get_config
-        config = get_config()
+        engine = get_engine()
         
-        database_path = config.get('sqlite_database_path', './data/wealthmanagement.db')
+        # Execute query
+        logger.info(f"Executing SQLite query: {query}")
+        results = engine.execute(query, max_rows=max_rows)
+        logger.info(f"Query succeeded! Returned {len(results['rows'])} rows")
         
-        # Validate database exists
-        db_path = Path(database_path)
-        if not db_path.exists():
-            logger.error(f"SQLite database not found at {database_path}")
-            return {
-                "success": False,
-                "error": f"Database file not found: {database_path}",
+        if columnar:
+            response = {
+                "success": True,
+                "columns": results["columns"],
+                "rows": [list(row) for row in results["rows"]],
+                "query": query
+            }
+        else:
+            columns = results["columns"]
+            response = {
+                "success": True,
+                "data": [dict(zip(columns, row)) for row in results["rows"]],
                 "query": query
             }
         
-        # Execute query
-        logger.info(f"Executing SQLite query: {query}")
-        
-        with sqlite3.connect(database_path) as conn:
-            # Enable row factory for dictionary-like access
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            
-            # Execute the query
-            cursor.execute(query)
-            
-            # Handle different query types
-            query_upper = query.strip().upper()
-            if query_upper.startswith(('SELECT', 'WITH')):
-                # For SELECT queries, fetch results
-                rows = cursor.fetchall()
-                
-                # Get column names
-                columns = [description[0] for description in cursor.description] if cursor.description else []
-                
-                # Convert rows to list of dictionaries
-                data = []
-                for row in rows:
-                    item = {}
-                    for column in columns:
-                        value = row[column]
-                        # Handle None values consistently with Athena tool
-                        item[column] = value if value is not None else None
-                    data.append(item)
-                
-                logger.info(f"Query succeeded! Returned {len(data)} rows")
-                
-                return {
-                    "success": True,
-                    "data": data,
-                    "query": query
-                }
-            else:
-                # For INSERT, UPDATE, DELETE queries
-                affected_rows = cursor.rowcount
-                conn.commit()
-                
-                logger.info(f"Query succeeded! {affected_rows} rows affected")
-                
-                return {
-                    "success": True,
-                    "data": [],
-                    "affected_rows": affected_rows,
-                    "message": f"Query executed successfully. {affected_rows} rows affected.",
-                    "query": query
-                }
+        if results["truncated"]:
+            response["truncated"] = True
+            response["message"] = (
+                f"Only the first {len(results['rows'])} rows are returned. "
+                "Add filters, aggregations or a LIMIT to narrow the result."
+            )
+        return response
+    
+    except FileNotFoundError as e:
+        logger.error(str(e))
+        return {
+            "success": False,
+            "error": str(e),
+            "query": query
+        }
     
     except sqlite3.Error as e:
         # Handle SQLite-specific errors
@@ -140,5 +141,9 @@ def _format_sqlite_error(error_message: str) -> str:
         return f"Unique constraint violation: {error_message}"
     elif 'not null constraint failed' in error_lower:
         return f"NOT NULL constraint violation: {error_message}"
+    elif 'interrupted' in error_lower:
+        return f"Query timed out, simplify it or add filters: {error_message}"
+    elif 'readonly' in error_lower or 'query_only' in error_lower:
+        return f"The database is read-only, only SELECT queries are allowed: {error_message}"
     else:
         return error_message
\ No newline at end of file